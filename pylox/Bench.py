@@ -0,0 +1,402 @@
+""" benchmarks for pylox
+
+    python Bench.py [-O] [--memory] [--backend=tree,closure,vm] [bench/file.lox ...]
+    python Bench.py --scan [--repeat=N] [file.lox ...]
+    python Bench.py --parse [--expressions] [--tokens=N]
+    python Bench.py --cache [--tokens=N]
+    python Bench.py --incremental [--lines=N]
+    python Bench.py --imports [--modules=N] [--tokens=N] [--workers=N]
+    python Bench.py --startup [--repeat=N] [pylox options] [script.lox]
+    python Bench.py --maps [--entries=N] [--backend=tree|closure|vm]
+    python Bench.py --strings [--size=MB] [--backend=tree|closure|vm]
+
+runs every benchmark with every backend in this process and prints the wall time,
+-O runs the Optimizer first like pylox -O,
+--memory prints the peak memory allocated during the run instead (tracemalloc),
+--scan only scans the files, joined and repeated N times (default 200), with every
+scanner and prints tokens per second,
+--parse scans and parses a generated program of about N tokens (default 1000000)
+into Token lists and into a TokenBuffer, printing the time and peak memory of each,
+with --expressions the program is expression statements, operator chains and nesting,
+--cache times "pylox script" on that program without __loxcache__, with an empty one
+and with the entry the previous run wrote,
+--incremental edits one line in the middle of a generated N line (default 10000) program
+and compares scanning, parsing and resolving all of it again with Incremental.update,
+--imports loads a script importing N (default 8) generated modules of about N tokens
+(default 100000) each, one module at a time and in a process pool (one process per core),
+--startup (or pylox --startup-bench) starts pylox on the script (print "hello"; by default)
+N times (default 20) and prints how long it took to run the first statement,
+--maps looks keys up in a map() and by scanning a list of keys, with N (default 100000),
+N / 10 and N / 100 entries, and prints the time per lookup,
+--strings builds a string of MB (default 10), MB / 10 and MB / 100 megabytes out of 100
+character pieces, with a StringBuilder and with +, which is left out above 1MB
+"""
+import sys
+import os
+import io
+import time
+import contextlib
+import tracemalloc
+import gc
+import shutil
+import tempfile
+import subprocess
+import statistics
+import pylox
+import Scanner
+import Parser
+import Resolver
+
+benchDir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench")
+
+
+def timeRun(source: str, backend: str) -> float:
+    pylox.interpreter = pylox.makeInterpreter(backend)
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        pylox.run(source)
+        end = time.perf_counter()
+    return end - start
+
+
+def memoryRun(source: str, backend: str) -> float:
+    # peak KiB allocated while running, slower than timeRun so it is opt in
+    pylox.interpreter = pylox.makeInterpreter(backend)
+    with contextlib.redirect_stdout(io.StringIO()):
+        tracemalloc.start()
+        try:
+            pylox.run(source)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    return peak / 1024
+
+
+def benchScanners(options, files):
+    if not files:
+        files = sorted(os.path.join(benchDir, name) for name in os.listdir(benchDir) if name.endswith(".lox"))
+    source = ""
+    for path in files:
+        with open(path) as infile:
+            source += infile.read() + "\n"
+    source *= int(options.get("repeat") or 200)
+
+    print(f"scanning {len(source) / 1e6:.1f}MB")
+    print(f"{'scanner':<20}{'tokens':>12}{'time':>12}{'tokens/s':>14}")
+    for name in pylox.scanners:
+        start = time.perf_counter()
+        tokens = pylox.makeScanner(source, name).scanTokens()
+        end = time.perf_counter()
+        print(f"{name:<20}{len(tokens):>12}{end - start:>11.3f}s{len(tokens) / (end - start):>14.0f}")
+
+
+def generatedProgram(tokens: int) -> str:
+    # functions, classes and expressions with their own names, about 100 tokens each
+    template = """
+fun f{i}(a, b) {{
+    var c = a * {i} + b / 2;
+    if (c > 10 and a != nil) {{ print "s{i}"; }}
+    while (c > 0) c = c - 1;
+    return c - f{i}(b, a);
+}}
+class C{i} < Base {{
+    init(x) {{ this.x = x; }}
+    get() {{ return this.x + super.get() * {i}.5; }}
+}}
+"""
+    count = len(pylox.makeScanner(template.format(i=0), "regex").scanTokens()) - 1
+    return "class Base { get() { return 1; } }\n" + "".join(template.format(i=i) for i in range(tokens // count))
+
+
+def generatedExpressions(tokens: int) -> str:
+    # operator chains, nesting, calls and properties, about 100 tokens each
+    template = """
+var e{i} = (a + {i}) * -b / (c - d.x) + f(a, b * 2, (c)) - g.h(i).j;
+var t{i} = a < b and !(c >= d or e == nil) or f(-g, !h) != ((i + j) * (k - l)) / m;
+e{i} = t{i} = x.y.z = a * b * c - d / e / f + -(-(-g)) * (h + (i + (j + k)));
+"""
+    count = len(pylox.makeScanner(template.format(i=0), "regex").scanTokens()) - 1
+    return "".join(template.format(i=i) for i in range(tokens // count))
+
+
+def parseRun(source: str, pipeline: str):
+    # scan and parse time
+    start = time.perf_counter()
+    if pipeline == "buffer":
+        tokens = Scanner.RegexScanner(source).scanBuffer()
+        parser = Parser.BufferParser(tokens)
+    else:
+        tokens = pylox.makeScanner(source, pipeline).scanTokens()
+        parser = Parser.Parser(tokens)
+    scanned = time.perf_counter()
+    parser.parse()
+    return scanned - start, time.perf_counter() - scanned
+
+
+def benchParsers(options):
+    generate = generatedExpressions if "expressions" in options else generatedProgram
+    source = generate(int(options.get("tokens") or 1000000))
+    tokens = len(pylox.makeScanner(source, "regex").scanTokens())
+    print(f"scan + parse of {tokens} tokens, {len(source) / 1e6:.1f}MB")
+    print(f"{'tokens':<20}{'scan':>12}{'parse':>12}{'total':>12}{'peak':>14}{'parsed/s':>12}")
+    for pipeline in ["char", "regex", "buffer"]:
+        # the garbage of the previous pipeline is not this one's to pay for
+        gc.collect()
+        scan, parse = parseRun(source, pipeline)
+        tracemalloc.start()
+        try:
+            parseRun(source, pipeline)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        print(f"{pipeline:<20}{scan:>11.3f}s{parse:>11.3f}s{scan + parse:>11.3f}s{peak / 2**20:>11.1f}MiB{tokens / parse / 1e6:>11.2f}M")
+
+
+def benchCache(options):
+    source = generatedProgram(int(options.get("tokens") or 1000000))
+    directory = tempfile.mkdtemp()
+    script = os.path.join(directory, "generated.lox")
+    with open(script, "w") as outfile:
+        outfile.write(source)
+
+    def pyloxRun(*args):
+        command = [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "pylox.py"), *args, script]
+        start = time.perf_counter()
+        subprocess.run(command, check=True)
+        return time.perf_counter() - start
+
+    try:
+        print(f"pylox startup on {len(source) / 1e6:.1f}MB of lox")
+        print(f"{'no cache':<20}{pyloxRun('--no-cache'):>11.3f}s")
+        print(f"{'cold cache':<20}{pyloxRun():>11.3f}s")
+        print(f"{'warm cache':<20}{pyloxRun():>11.3f}s")
+    finally:
+        shutil.rmtree(directory)
+
+
+def benchIncremental(options):
+    import Incremental
+    lines = int(options.get("lines") or 10000)
+    source = generatedProgram(lines * 9)
+    middle = source.index("var c = a *", len(source) // 2)
+    edits = {
+        "change a line": source[:middle] + "var c = a * 7 +" + source[middle + len("var c = a *"):],
+        "add a line": source[:middle] + "\n" + source[middle:],
+    }
+
+    def full(source: str):
+        stmt_list = pylox.makeParser(source).parse()
+        Resolver.Resolver(pylox.interpreter).firstResolve(stmt_list)
+
+    print(f"{source.count(chr(10))} lines")
+    print(f"{'edit':<20}{'full':>12}{'incremental':>14}{'reparsed':>10}")
+    for name, edited in edits.items():
+        pylox.interpreter = pylox.makeInterpreter("tree")
+        session = Incremental.Incremental(pylox.interpreter)
+        session.update(source)
+        start = time.perf_counter()
+        session.update(edited)
+        incremental = time.perf_counter() - start
+        start = time.perf_counter()
+        full(edited)
+        print(f"{name:<20}{time.perf_counter() - start:>11.3f}s{incremental:>13.4f}s{session.reparsed:>10}")
+
+
+def benchImports(options):
+    import Modules
+    count = int(options.get("modules") or 8)
+    source = generatedProgram(int(options.get("tokens") or 100000))
+    directory = tempfile.mkdtemp()
+    try:
+        files = []
+        for i in range(count):
+            files.append(os.path.join(directory, f"module{i}.lox"))
+            with open(files[-1], "w") as outfile:
+                outfile.write(source)
+
+        print(f"loading {count} modules of {len(source) / 1e6:.1f}MB")
+        for name, workers in [("one at a time", 1), ("process pool", int(options.get("workers") or 0) or None)]:
+            loader = Modules.ModuleLoader()
+            # scanned, parsed and resolved every time, not read from __loxcache__
+            loader.options = (False, "regex", False)
+            loader.workers = workers
+            start = time.perf_counter()
+            loader.preload(files)
+            print(f"{name:<20}{time.perf_counter() - start:>11.3f}s")
+    finally:
+        shutil.rmtree(directory)
+
+
+def benchStartup(args: 'list[str]', options: dict):
+    repeat = int(options.get("repeat") or 20)
+    # the pylox options to start the script with
+    passed = []
+    for name, value in options.items():
+        if name not in ("startup-bench", "startup", "repeat"):
+            passed.append(f"--{name}={value}" if value else "-" + name if len(name) == 1 else "--" + name)
+
+    directory = tempfile.mkdtemp()
+    script = args[0] if args else os.path.join(directory, "hello.lox")
+    if not args:
+        with open(script, "w") as outfile:
+            outfile.write('print "hello";\n')
+
+    def startup(command: 'list[str]'):
+        # (ms to the first statement, ms for the whole process), pylox.startupMark reports the first
+        env = dict(os.environ, PYLOX_STARTUP_NS=str(time.time_ns()))
+        start = time.perf_counter()
+        done = subprocess.run(command, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+        total = (time.perf_counter() - start) * 1000
+        for line in done.stderr.splitlines():
+            if line.startswith("first statement after "):
+                return float(line[len("first statement after "):-2]), total
+        return None, total
+
+    try:
+        pyloxCommand = [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "pylox.py"), *passed, script]
+        # the first run writes __loxcache__, the rest start from it
+        startup(pyloxCommand)
+        print(f"start to first statement of {script}, median of {repeat} runs")
+        print(f"{'':<20}{'first statement':>16}{'process':>12}")
+        for name, command in [("python -c pass", [sys.executable, "-c", "pass"]), ("pylox", pyloxCommand)]:
+            runs = [startup(command) for _ in range(repeat)]
+            firsts = [first for first, _ in runs if first is not None]
+            first = f"{statistics.median(firsts):.1f}ms" if firsts else "-"
+            print(f"{name:<20}{first:>16}{statistics.median(total for _, total in runs):>10.1f}ms")
+    finally:
+        shutil.rmtree(directory)
+
+
+def mapLookups(entries: int, lookups: int) -> str:
+    # lox timing lookups of spread out keys in a map and with a scan of parallel key and
+    # value lists, the way it was done before map(). prints microseconds per lookup of each
+    step = entries // lookups
+    return f"""
+var n = {entries};
+var m = map();
+var keys = list();
+var values = list();
+for (var i = 0; i < n; i = i + 1) {{
+    m.set(i, i * 2);
+    keys.append(i);
+    values.append(i * 2);
+}}
+
+fun find(key) {{
+    for (var i = 0; i < n; i = i + 1) {{
+        if (keys[i] == key) return values[i];
+    }}
+    return nil;
+}}
+
+var start = clock();
+for (var i = 0; i < n; i = i + 1) m.get(i);
+print (clock() - start) / n * 1000000;
+
+start = clock();
+for (var i = 0; i < {lookups}; i = i + 1) find(i * {step} + {step // 2});
+print (clock() - start) / {lookups} * 1000000;
+"""
+
+
+def benchMaps(options):
+    entries = int(options.get("entries") or 100000)
+    backend = options.get("backend", "tree")
+    print(f"lookups with {backend}, time per lookup")
+    print(f"{'entries':<20}{'map':>12}{'list scan':>14}")
+    for size in (entries // 100, entries // 10, entries):
+        pylox.interpreter = pylox.makeInterpreter(backend)
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            # 20 scans, each goes through half the list on average
+            pylox.run(mapLookups(size, 20))
+        mapTime, scanTime = (float(line) for line in output.getvalue().split())
+        print(f"{size:<20}{mapTime:>10.2f}us{scanTime:>12.0f}us")
+
+
+def stringBuilding(size: int, builder: bool) -> str:
+    # lox building a string of size characters, printing the seconds it took
+    pieces = size // 100
+    if builder:
+        build = f"""
+var sb = StringBuilder();
+for (var i = 0; i < {pieces}; i = i + 1) sb.append(piece);
+var s = sb.toString();
+"""
+    else:
+        build = f"""
+var s = "";
+for (var i = 0; i < {pieces}; i = i + 1) s = s + piece;
+"""
+    return f'var piece = "{"x" * 100}";\nvar start = clock();\n{build}print clock() - start;\n'
+
+
+def benchStrings(options):
+    size = float(options.get("size") or 10)
+    backend = options.get("backend", "tree")
+    print(f"building strings with {backend}")
+    print(f"{'size':<20}{'StringBuilder':>14}{'+':>12}")
+    for megabytes in (size / 100, size / 10, size):
+        times = []
+        for builder in (True, False):
+            if not builder and megabytes > 1:
+                # quadratic, minutes at 10MB
+                times.append("-")
+                continue
+            pylox.interpreter = pylox.makeInterpreter(backend)
+            output = io.StringIO()
+            with contextlib.redirect_stdout(output):
+                pylox.run(stringBuilding(int(megabytes * 1e6), builder))
+            times.append(f"{float(output.getvalue()):.3f}s")
+        print(f"{f'{megabytes:g}MB':<20}{times[0]:>14}{times[1]:>12}")
+
+
+def benchBackends(options, files):
+    backends = options.get("backend", ",".join(pylox.backends)).split(",")
+    if not files:
+        files = sorted(os.path.join(benchDir, name) for name in os.listdir(benchDir) if name.endswith(".lox"))
+
+    print(f"{'benchmark':<20}" + "".join(f"{backend:>12}" for backend in backends))
+    for path in files:
+        with open(path) as infile:
+            source = infile.read()
+        if "memory" in options:
+            peaks = [memoryRun(source, backend) for backend in backends]
+            print(f"{os.path.basename(path):<20}" + "".join(f"{kib:>9.0f}KiB" for kib in peaks))
+            continue
+        times = [timeRun(source, backend) for backend in backends]
+        print(f"{os.path.basename(path):<20}" + "".join(f"{t:>11.3f}s" for t in times))
+
+
+def main():
+    options, args = pylox.parseArgs(sys.argv[1:])
+    pylox.Flags.optimize = "O" in options
+    if "scan" in options:
+        benchScanners(options, args)
+        return
+    if "parse" in options:
+        benchParsers(options)
+        return
+    if "cache" in options:
+        benchCache(options)
+        return
+    if "incremental" in options:
+        benchIncremental(options)
+        return
+    if "imports" in options:
+        benchImports(options)
+        return
+    if "startup" in options:
+        benchStartup(args, options)
+        return
+    if "maps" in options:
+        benchMaps(options)
+        return
+    if "strings" in options:
+        benchStrings(options)
+        return
+    benchBackends(options, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+from array import array
+
+# opcodes, same order as Op_Code in clox/chunk.h,
+# followed by the ones the book adds for closures and classes
+# and a few pylox specific ones.
+# plain ints so the VM loop compares them without enum lookups
+OP_CONSTANT = 0
+OP_NIL = 1
+OP_TRUE = 2
+OP_FALSE = 3
+OP_POP = 4
+OP_GET_LOCAL = 5
+OP_SET_LOCAL = 6
+OP_GET_GLOBAL = 7
+OP_DEFINE_GLOBAL = 8
+OP_SET_GLOBAL = 9
+OP_EQUAL = 10
+OP_GREATER = 11
+OP_LESS = 12
+OP_ADD = 13
+OP_SUBTRACT = 14
+OP_MULTIPLY = 15
+OP_DIVIDE = 16
+OP_NOT = 17
+OP_NEGATE = 18
+OP_PRINT = 19
+OP_JUMP = 20
+OP_JUMP_IF_FALSE = 21
+OP_LOOP = 22
+OP_CALL = 23
+OP_RETURN = 24
+# closures
+OP_GET_UPVALUE = 25
+OP_SET_UPVALUE = 26
+OP_CLOSURE = 27
+OP_CLOSE_UPVALUE = 28
+# classes
+OP_GET_PROPERTY = 29
+OP_SET_PROPERTY = 30
+OP_GET_SUPER = 31
+OP_INVOKE = 32
+OP_SUPER_INVOKE = 33
+OP_CLASS = 34
+OP_INHERIT = 35
+OP_METHOD = 36
+# custom
+OP_NOT_EQUAL = 37
+OP_GREATER_EQUAL = 38
+OP_LESS_EQUAL = 39
+OP_RUNTIME_ERROR = 40
+OP_GET_INDEX = 41
+OP_SET_INDEX = 42
+
+opNames = {value: name for name, value in globals().items() if name.startswith("OP_")}
+
+
+class Chunk:
+    def __init__(self) -> None:
+        self.code = array('B')
+        # line of every byte in code, like the lines array in clox
+        self.lines = array('i')
+        self.constants = []
+        # identical strings and numbers share a constant slot
+        # keyed by (type, value) so 1.0 and true dont collapse
+        self.constantIndex = {}
+        # GlobalCell of the name in constants[i], kept by the first
+        # OP_GET_GLOBAL / OP_SET_GLOBAL that looks it up, like the tree walker's nodes
+        self.globalCells = []
+
+    def write(self, byte: int, line: int):
+        self.code.append(byte)
+        self.lines.append(line)
+
+    def addConstant(self, value) -> int:
+        if isinstance(value, (str, float)):
+            key = (type(value), value)
+            index = self.constantIndex.get(key)
+            if index is None:
+                index = self.constantIndex[key] = len(self.constants)
+                self.constants.append(value)
+            return index
+
+        self.constants.append(value)
+        return len(self.constants) - 1
+
+    def count(self) -> int:
+        return len(self.code)
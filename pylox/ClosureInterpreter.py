@@ -0,0 +1,645 @@
+from Expr import ExprVisitor, Expr, Binary, Grouping, Set, Super, This, Unary, Literal, Variable, Assign, Logical, Call, Lambda, Get, Index, SetIndex
+from Token import TokenType, Token
+from Stmt import StmtVisitor, Stmt, Expression, Print,  Var, Block, If, While, StopIter, Function, Return, Class, Import
+import LoxCallable
+from Environment import Environment
+import Interpreter
+from Interpreter import stringify, TailCall, INTERN_LIMIT
+from sys import intern
+import pylox
+import Modules
+
+# closure compilation backend
+# the resolved tree is compiled once into nested python closures, every closure
+# takes the current Environment as its only argument. Expression closures return
+# a value, statement closures return a completion:
+#   None          - normal completion
+#   Token         - the 'break' / 'continue' keyword that stopped the statement
+#   (value,)      - a 'return' with its value
+#   TailCall      - 'return f(x);' with a lox function f, run by CompiledFunction.callIn
+# the same completions the tree Interpreter uses, so no python exceptions are
+# raised for control flow unless a break / continue escapes its function
+
+
+def callValue(interpreter: 'ClosureInterpreter', paren: Token, function, args: list):
+    if not isinstance(function, LoxCallable.LoxCallable):
+        raise pylox.LoxRuntimeError(paren, "Can only call functions and classes.")
+    if len(args) != function.arity():
+        raise pylox.LoxRuntimeError(paren, f"Exprcted {function.arity()} arguments but got {len(args)}.")
+    if interpreter.callDepth >= interpreter.maxCallDepth:
+        raise pylox.LoxRuntimeError(paren, "Stack overflow.")
+
+    # for native functions throwing errors
+    try:
+        return function.call(interpreter, args)
+    except pylox.NativeFuncError as err:
+        raise pylox.LoxRuntimeError(paren, err.mess)
+
+
+class CompiledFunction(LoxCallable.LoxCallable):
+    def __init__(self, name: str, params: 'list[str]', body, closure: Environment, isInitializer: bool = False) -> None:
+        self.name = name
+        self.params = params
+        self.body = body
+        self.closure = closure
+        self.isInitializer = isInitializer
+
+    def call(self, interpreter, arguments):
+        return self.callIn(interpreter, self.closure, arguments)
+
+    def invoke(self, interpreter, instance: 'LoxCallable.LoxInstance', arguments):
+        # bind(instance).call(...) without creating the bound function
+        this = Environment(self.closure)
+        this.values.append(instance)
+        return self.callIn(interpreter, this, arguments)
+
+    def callIn(self, interpreter, closure: Environment, arguments):
+        function = self
+        interpreter.callDepth += 1
+        try:
+            # trampoline, a tail call replaces the function running in this python frame
+            while True:
+                enviorment = Environment(closure)
+                # parameters are the first slots, the argument list is built fresh by every call site
+                enviorment.values = arguments
+
+                completion = function.body(enviorment)
+                if completion.__class__ is not TailCall:
+                    break
+                function = completion.function
+                closure = completion.closure
+                arguments = completion.arguments
+        finally:
+            interpreter.callDepth -= 1
+
+        if function.isInitializer:
+            return closure.values[0]
+        if completion is None:
+            return None
+        return completion[0]
+
+    def arity(self) -> int:
+        return len(self.params)
+
+    def bind(self, instance: 'LoxCallable.LoxInstance'):
+        enviorment = Environment(self.closure)
+        enviorment.define("this", instance)
+        return CompiledFunction(self.name, self.params, self.body, enviorment, self.isInitializer)
+
+    def __str__(self) -> str:
+        if self.name is None:
+            return "anmoymous lambda expression"
+        return f"<fn {self.name}>"
+
+
+class ClosureCompiler(ExprVisitor, StmtVisitor):
+    def __init__(self, interpreter: 'ClosureInterpreter') -> None:
+        self.interpreter = interpreter
+        self.locals = interpreter.locals
+        self.globals = interpreter.globals
+        # 0 while compiling top level code, declarations there go to the globals dict
+        self.scopeDepth = 0
+
+    def compile(self, node):
+        return node.accept(self)
+
+    def compileSequence(self, statements: 'list[Stmt]'):
+        compiled = [self.compile(stmt) for stmt in statements]
+        if len(compiled) == 1:
+            return compiled[0]
+
+        def sequence(env):
+            for stmt in compiled:
+                completion = stmt(env)
+                if completion is not None:
+                    return completion
+            return None
+        return sequence
+
+    def compileScope(self, statements: 'list[Stmt]'):
+        self.scopeDepth += 1
+        body = self.compileSequence(statements)
+        self.scopeDepth -= 1
+        return body
+
+    def compileFunction(self, params: 'list[Token]', body: 'list[Stmt]'):
+        return [param.lexeme for param in params], self.compileScope(body)
+
+    def compileDefine(self, name: str):
+        # returns define(env, value), a global's cell for globals, the next slot for locals
+        if self.scopeDepth == 0:
+            def defineGlobal(env, value):
+                env.define(name, value)
+            return defineGlobal
+
+        def defineLocal(env, value):
+            env.values.append(value)
+        return defineLocal
+
+# ----------- compiling statements -------------
+
+    def visitBlockStmt(self, stmt: Block):
+        body = self.compileScope(stmt.statements)
+        def block(env):
+            return body(Environment(env))
+        return block
+
+    def visitClassStmt(self, stmt: Class):
+        name = stmt.name.lexeme
+        superclassF = None
+        if stmt.superclass != None:
+            superclassF = self.compile(stmt.superclass)
+        superToken = stmt.superclass.name if stmt.superclass != None else None
+
+        define = self.compileDefine(name)
+        methods = []
+        for method in stmt.methods:
+            params, body = self.compileFunction(method.params, method.body)
+            methods.append( (method.name.lexeme, params, body) )
+
+        def klass(env):
+            superclass = None
+            if superclassF != None:
+                superclass = superclassF(env)
+                if not isinstance(superclass, LoxCallable.LoxClass):
+                    raise pylox.LoxRuntimeError(superToken, "Superclass must be a class")
+
+            methodEnv = env
+            if superclassF != None:
+                methodEnv = Environment(env)
+                methodEnv.values.append(superclass)
+
+            functions = {}
+            for methodName, params, body in methods:
+                functions[methodName] = CompiledFunction(methodName, params, body, methodEnv, methodName == "init")
+
+            define(env, LoxCallable.LoxClass(name, superclass, functions))
+            return None
+        return klass
+
+    def visitVarStmt(self, stmt: Var):
+        define = self.compileDefine(stmt.name.lexeme)
+        if stmt.initializer == None:
+            def var(env):
+                define(env, None)
+            return var
+
+        initializer = self.compile(stmt.initializer)
+        def var(env):
+            define(env, initializer(env))
+        return var
+
+    def visitExpressionStmt(self, stmt: Expression):
+        expression = self.compile(stmt.expression)
+        def expressionStmt(env):
+            expression(env)
+        return expressionStmt
+
+    def visitIfStmt(self, stmt: If):
+        condition = self.compile(stmt.condition)
+        thenBranch = self.compile(stmt.thenBranch)
+        if stmt.elseBranch == None:
+            def ifStmt(env):
+                value = condition(env)
+                if value is None or value is False:
+                    return None
+                return thenBranch(env)
+            return ifStmt
+
+        elseBranch = self.compile(stmt.elseBranch)
+        def ifElseStmt(env):
+            value = condition(env)
+            if value is None or value is False:
+                return elseBranch(env)
+            return thenBranch(env)
+        return ifElseStmt
+
+    def visitWhileStmt(self, stmt: While):
+        condition = self.compile(stmt.condition)
+        body = self.compile(stmt.body)
+        increment = None
+        if stmt.increment != None:
+            increment = self.compile(stmt.increment)
+
+        def whileStmt(env):
+            while True:
+                value = condition(env)
+                if value is None or value is False:
+                    return None
+                completion = body(env)
+                if completion is not None:
+                    if completion.__class__ is not Token:
+                        return completion
+                    if completion.type == TokenType.BREAK:
+                        return None
+                if increment is not None:
+                    increment(env)
+        return whileStmt
+
+    def visitStopiterStmt(self, stmt: StopIter):
+        token = stmt.name
+        def stopIter(env):
+            return token
+        return stopIter
+
+    def visitImportStmt(self, stmt: Import):
+        interpreter = self.interpreter
+        def importModule(env):
+            # compiled when it runs, the module is only known by then
+            module = Modules.loader.enter(stmt)
+            if module is None:
+                return None
+            for expr, depth, slot in module.resolved:
+                interpreter.resolve(expr, depth, slot)
+            compiler = ClosureCompiler(interpreter)
+            for compiled in [compiler.compile(statement) for statement in module.statements]:
+                completion = compiled(env)
+                if completion is not None:
+                    return completion
+            return None
+        return importModule
+
+    def visitPrintStmt(self, stmt: Print):
+        expression = self.compile(stmt.expression)
+        def printStmt(env):
+            print(stringify(expression(env)))
+        return printStmt
+
+    def visitFunctionStmt(self, stmt: Function):
+        name = stmt.name.lexeme
+        define = self.compileDefine(name)
+        params, body = self.compileFunction(stmt.params, stmt.body)
+        def function(env):
+            define(env, CompiledFunction(name, params, body, env))
+        return function
+
+    def visitReturnStmt(self, stmt: Return):
+        if stmt.value == None:
+            def returnNil(env):
+                return (None,)
+            return returnNil
+
+        if stmt.value.__class__ is Call:
+            return self.compileTailCall(stmt.value)
+
+        value = self.compile(stmt.value)
+        def returnStmt(env):
+            return (value(env),)
+        return returnStmt
+
+    def compileTailCall(self, expr: Call):
+        callee = self.compile(expr.callee)
+        arguments = [self.compile(arg) for arg in expr.arguments]
+        paren = expr.paren
+        interpreter = self.interpreter
+
+        def tailCall(env):
+            function = callee(env)
+            args = [arg(env) for arg in arguments]
+            if function.__class__ is CompiledFunction:
+                if len(args) != len(function.params):
+                    raise pylox.LoxRuntimeError(paren, f"Exprcted {len(function.params)} arguments but got {len(args)}.")
+                return TailCall(function, function.closure, args)
+            return (callValue(interpreter, paren, function, args),)
+        return tailCall
+
+# ----------- compiling expressions ------------
+
+    def visitAssignExpr(self, expr: Assign):
+        value = self.compile(expr.value)
+        name = expr.name
+        local = self.locals.get(expr, None)
+
+        if local == None:
+            globals = self.globals
+            cell = None
+            def assignGlobal(env):
+                nonlocal cell
+                result = value(env)
+                if cell is None:
+                    cell = globals.cell(name)
+                cell.value = result
+                return result
+            return assignGlobal
+
+        distance, slot = local
+        if distance == 0:
+            def assignLocal(env):
+                result = value(env)
+                env.values[slot] = result
+                return result
+            return assignLocal
+
+        def assignAt(env):
+            result = value(env)
+            env.ancestor(distance).values[slot] = result
+            return result
+        return assignAt
+
+    def visitVariableExpr(self, expr: Variable):
+        return self.compileLookUp(expr.name, expr)
+
+    def visitThisExpr(self, expr: This):
+        return self.compileLookUp(expr.keyword, expr)
+
+    def compileLookUp(self, name: Token, expr: Expr):
+        local = self.locals.get(expr, None)
+
+        if local == None:
+            # the global's cell, kept after the first lookup
+            globals = self.globals
+            cell = None
+            def getGlobal(env):
+                nonlocal cell
+                if cell is None:
+                    cell = globals.cell(name)
+                return cell.value
+            return getGlobal
+
+        distance, slot = local
+        if distance == 0:
+            def getLocal(env):
+                return env.values[slot]
+            return getLocal
+        if distance == 1:
+            def getEnclosing(env):
+                return env.enclosing.values[slot]
+            return getEnclosing
+
+        def getAt(env):
+            return env.ancestor(distance).values[slot]
+        return getAt
+
+    def visitLiteralExpr(self, expr: Literal):
+        value = expr.value
+        def literal(env):
+            return value
+        return literal
+
+    def visitLogicalExpr(self, expr: Logical):
+        left = self.compile(expr.left)
+        right = self.compile(expr.right)
+
+        if expr.operator.type == TokenType.OR:
+            def logicalOr(env):
+                value = left(env)
+                if value is None or value is False:
+                    return right(env)
+                return value
+            return logicalOr
+
+        def logicalAnd(env):
+            value = left(env)
+            if value is None or value is False:
+                return value
+            return right(env)
+        return logicalAnd
+
+    def visitSetExpr(self, expr: Set):
+        obj = self.compile(expr.obj)
+        value = self.compile(expr.value)
+        name = expr.name
+
+        def setExpr(env):
+            instance = obj(env)
+            if not isinstance(instance, LoxCallable.LoxInstance):
+                raise pylox.LoxRuntimeError(name, "Only instances have fields")
+            result = value(env)
+            instance.set(name, result)
+            return result
+        return setExpr
+
+    def visitSuperExpr(self, expr: Super):
+        distance, slot = self.locals[expr]
+        method = expr.method
+        lexeme = method.lexeme
+
+        def superExpr(env):
+            superclass: LoxCallable.LoxClass = env.ancestor(distance).values[slot]
+            obj = env.ancestor(distance - 1).values[0]
+            function = superclass.findMethod(lexeme)
+            if function == None:
+                raise pylox.LoxRuntimeError(method, f"Undefined property '{lexeme}.")
+            return function.bind(obj)
+        return superExpr
+
+    def visitGroupingExpr(self, expr: Grouping):
+        return self.compile(expr.expression)
+
+    def visitUnaryExpr(self, expr: Unary):
+        right = self.compile(expr.right)
+        operator = expr.operator
+
+        if operator.type == TokenType.MINUS:
+            def negate(env):
+                value = right(env)
+                if value.__class__ is float:
+                    return -value
+                raise pylox.LoxRuntimeError(operator, "Operand must be a number")
+            return negate
+
+        if operator.type == TokenType.BANG:
+            def bang(env):
+                value = right(env)
+                return value is None or value is False
+            return bang
+
+        # else - unreachable
+        def unary(env):
+            right(env)
+            return None
+        return unary
+
+    def visitBinaryExpr(self, expr: Binary):
+        left = self.compile(expr.left)
+        right = self.compile(expr.right)
+        operator = expr.operator
+        optype = operator.type
+
+        # operator dispatch is decided here, once, instead of on every evaluation
+        if optype == TokenType.PLUS:
+            def add(env):
+                a = left(env)
+                b = right(env)
+                if a.__class__ is float and b.__class__ is float:
+                    return a + b
+                if a.__class__ is str and b.__class__ is str:
+                    text = a + b
+                    return intern(text) if len(text) <= INTERN_LIMIT else text
+                raise pylox.LoxRuntimeError(operator, "Operands must be two number or two strings")
+            return add
+
+        if optype == TokenType.EQUAL_EQUAL:
+            def equal(env):
+                a = left(env)
+                return right(env) == a
+            return equal
+        if optype == TokenType.BANG_EQUAL:
+            def notEqual(env):
+                a = left(env)
+                return not (right(env) == a)
+            return notEqual
+
+        if optype == TokenType.MINUS:
+            def subtract(env):
+                a = left(env)
+                b = right(env)
+                if a.__class__ is float and b.__class__ is float:
+                    return a - b
+                raise pylox.LoxRuntimeError(operator, "Operands must be numbers")
+            return subtract
+        if optype == TokenType.STAR:
+            def multiply(env):
+                a = left(env)
+                b = right(env)
+                if a.__class__ is float and b.__class__ is float:
+                    return a * b
+                raise pylox.LoxRuntimeError(operator, "Operands must be numbers")
+            return multiply
+        if optype == TokenType.SLASH:
+            def divide(env):
+                a = left(env)
+                b = right(env)
+                if a.__class__ is float and b.__class__ is float:
+                    return a / b
+                raise pylox.LoxRuntimeError(operator, "Operands must be numbers")
+            return divide
+        if optype == TokenType.GREATER:
+            def greater(env):
+                a = left(env)
+                b = right(env)
+                if a.__class__ is float and b.__class__ is float:
+                    return a > b
+                raise pylox.LoxRuntimeError(operator, "Operands must be numbers")
+            return greater
+        if optype == TokenType.GREATER_EQUAL:
+            def greaterEqual(env):
+                a = left(env)
+                b = right(env)
+                if a.__class__ is float and b.__class__ is float:
+                    return a >= b
+                raise pylox.LoxRuntimeError(operator, "Operands must be numbers")
+            return greaterEqual
+        if optype == TokenType.LESS:
+            def less(env):
+                a = left(env)
+                b = right(env)
+                if a.__class__ is float and b.__class__ is float:
+                    return a < b
+                raise pylox.LoxRuntimeError(operator, "Operands must be numbers")
+            return less
+        if optype == TokenType.LESS_EQUAL:
+            def lessEqual(env):
+                a = left(env)
+                b = right(env)
+                if a.__class__ is float and b.__class__ is float:
+                    return a <= b
+                raise pylox.LoxRuntimeError(operator, "Operands must be numbers")
+            return lessEqual
+
+        # else - unreachable
+        def unknown(env):
+            left(env)
+            right(env)
+            return None
+        return unknown
+
+    def visitCallExpr(self, expr: Call):
+        callee = self.compile(expr.callee)
+        arguments = [self.compile(arg) for arg in expr.arguments]
+        paren = expr.paren
+        interpreter = self.interpreter
+
+        # callValue inlined, this is the hottest closure
+        def call(env):
+            function = callee(env)
+            args = [arg(env) for arg in arguments]
+
+            if not isinstance(function, LoxCallable.LoxCallable):
+                raise pylox.LoxRuntimeError(paren, "Can only call functions and classes.")
+            if len(args) != function.arity():
+                raise pylox.LoxRuntimeError(paren, f"Exprcted {function.arity()} arguments but got {len(args)}.")
+            if interpreter.callDepth >= interpreter.maxCallDepth:
+                raise pylox.LoxRuntimeError(paren, "Stack overflow.")
+
+            # for native functions throwing errors
+            try:
+                return function.call(interpreter, args)
+            except pylox.NativeFuncError as err:
+                raise pylox.LoxRuntimeError(paren, err.mess)
+        return call
+
+    def visitGetExpr(self, expr: Get):
+        obj = self.compile(expr.object)
+        name = expr.name
+
+        def get(env):
+            instance = obj(env)
+            if isinstance(instance, LoxCallable.LoxInstance):
+                return instance.get(name)
+            raise pylox.LoxRuntimeError(name, "Only instances have properties.")
+        return get
+
+    def visitIndexExpr(self, expr: Index):
+        obj = self.compile(expr.object)
+        index = self.compile(expr.index)
+        bracket = expr.bracket
+        LoxListInstance = LoxCallable.LoxListInstance
+
+        def indexExpr(env):
+            instance = obj(env)
+            position = index(env)
+            if instance.__class__ is LoxListInstance:
+                items = instance.list
+                if position.__class__ is float and position.is_integer() and -len(items) <= position < len(items):
+                    return items[int(position)]
+            # f64arrays, and the errors
+            try:
+                return LoxCallable.getIndex(instance, position)
+            except pylox.NativeFuncError as err:
+                raise pylox.LoxRuntimeError(bracket, err.mess)
+        return indexExpr
+
+    def visitSetindexExpr(self, expr: SetIndex):
+        obj = self.compile(expr.object)
+        index = self.compile(expr.index)
+        value = self.compile(expr.value)
+        bracket = expr.bracket
+        LoxListInstance = LoxCallable.LoxListInstance
+
+        def setIndexExpr(env):
+            instance = obj(env)
+            position = index(env)
+            result = value(env)
+            if instance.__class__ is LoxListInstance:
+                items = instance.list
+                if position.__class__ is float and position.is_integer() and -len(items) <= position < len(items):
+                    items[int(position)] = result
+                    return result
+            try:
+                return LoxCallable.setIndex(instance, position, result)
+            except pylox.NativeFuncError as err:
+                raise pylox.LoxRuntimeError(bracket, err.mess)
+        return setIndexExpr
+
+    def visitLambdaExpr(self, expr: Lambda):
+        params, body = self.compileFunction(expr.params, expr.body)
+        def lambdaExpr(env):
+            return CompiledFunction(None, params, body, env)
+        return lambdaExpr
+
+
+class ClosureInterpreter(Interpreter.Interpreter):
+    """ drop-in replacement for Interpreter.Interpreter,
+        shares the globals and the Resolver's locals table with it """
+
+    def interpret(self, statements: 'list[Stmt]'):
+        self.raiseRecursionLimit()
+        compiler = ClosureCompiler(self)
+        compiled = [compiler.compile(stmt) for stmt in statements]
+        try:
+            for stmt in compiled:
+                stmt(self.globals)
+        except pylox.LoxRuntimeError as error:
+            pylox.runtimeError(error)
+            return None
@@ -0,0 +1,536 @@
+from enum import Enum
+from Expr import ExprVisitor, Expr, Binary, Grouping, Set, Super, This, Unary, Literal, Variable, Assign, Logical, Call, Lambda, Get, Index, SetIndex
+from Token import TokenType, Token
+from Stmt import StmtVisitor, Stmt, Expression, Print,  Var, Block, If, While, StopIter, Function, Return, Class, Import
+from Chunk import *
+from Object import ObjFunction
+import pylox
+import Modules
+
+# single pass bytecode compiler for the parsed AST,
+# follows clox/compiler.c but walks the tree instead of the token stream.
+# locals and upvalues are resolved here, the Resolver's locals table is not needed
+
+UINT8_COUNT = 256
+UINT16_MAX = 65535
+
+class FunctionType(Enum):
+    FUNCTION = 0,
+    INITIALIZER = 1,
+    METHOD = 2,
+    SCRIPT = 3
+
+class Local:
+    def __init__(self, name: str, depth: int) -> None:
+        self.name = name
+        # -1 while declared but not yet initialized
+        self.depth = depth
+        self.isCaptured = False
+
+class Upvalue:
+    def __init__(self, index: int, isLocal: bool) -> None:
+        self.index = index
+        self.isLocal = isLocal
+
+class Loop:
+    def __init__(self, start: int, scopeDepth: int) -> None:
+        self.start = start
+        self.scopeDepth = scopeDepth
+        self.breakJumps = []
+        # continue jumps forward to the increment of a for loop
+        self.continueJumps = []
+        self.hasIncrement = False
+
+# per function state, the "Compiler" struct of clox
+class FunctionState:
+    def __init__(self, enclosing: 'FunctionState', function: ObjFunction, type: FunctionType) -> None:
+        self.enclosing = enclosing
+        self.function = function
+        self.type = type
+        self.upvalues: 'list[Upvalue]' = []
+        self.scopeDepth = 0
+        self.loops: 'list[Loop]' = []
+
+        # slot zero holds the callee, or the receiver in methods
+        slotZero = "this" if type in (FunctionType.METHOD, FunctionType.INITIALIZER) else ""
+        self.locals: 'list[Local]' = [Local(slotZero, 0)]
+
+class ClassState:
+    def __init__(self, enclosing: 'ClassState') -> None:
+        self.enclosing = enclosing
+        self.hasSuperclass = False
+
+
+class CompileError(RuntimeError):
+    pass
+
+
+class Compiler(ExprVisitor, StmtVisitor):
+    def __init__(self) -> None:
+        self.current: FunctionState = None
+        self.currentClass: ClassState = None
+        self.line = 1
+        self.hadError = False
+
+    def compile(self, statements: 'list[Stmt]'):
+        self.current = FunctionState(None, ObjFunction(), FunctionType.SCRIPT)
+        try:
+            for stmt in statements:
+                self.statement(stmt)
+        except CompileError:
+            return None
+
+        function = self.endFunction()
+        if self.hadError:
+            return None
+        return function
+
+# ----------- emitting ------------------
+
+    def chunk(self) -> Chunk:
+        return self.current.function.chunk
+
+    def mark(self, token: Token):
+        self.line = token.line
+
+    def emitByte(self, byte: int):
+        self.chunk().write(byte, self.line)
+
+    def emitBytes(self, byte1: int, byte2: int):
+        self.emitByte(byte1)
+        self.emitByte(byte2)
+
+    def emitShort(self, op: int, operand: int):
+        self.emitByte(op)
+        self.emitByte((operand >> 8) & 0xff)
+        self.emitByte(operand & 0xff)
+
+    def emitLoop(self, loopStart: int):
+        self.emitByte(OP_LOOP)
+        offset = self.chunk().count() - loopStart + 2
+        if offset > UINT16_MAX:
+            self.error("Loop body too large.")
+        self.emitByte((offset >> 8) & 0xff)
+        self.emitByte(offset & 0xff)
+
+    def emitJump(self, instruction: int) -> int:
+        self.emitByte(instruction)
+        self.emitByte(0xff)
+        self.emitByte(0xff)
+        return self.chunk().count() - 2
+
+    def patchJump(self, offset: int):
+        # -2 to adjust for the bytecode for the jump offset itself
+        jump = self.chunk().count() - offset - 2
+        if jump > UINT16_MAX:
+            self.error("Too much code to jump over.")
+        self.chunk().code[offset] = (jump >> 8) & 0xff
+        self.chunk().code[offset + 1] = jump & 0xff
+
+    def emitReturn(self):
+        if self.current.type == FunctionType.INITIALIZER:
+            self.emitBytes(OP_GET_LOCAL, 0)
+        else:
+            self.emitByte(OP_NIL)
+        self.emitByte(OP_RETURN)
+
+    def makeConstant(self, value) -> int:
+        constant = self.chunk().addConstant(value)
+        if constant > UINT16_MAX:
+            self.error("Too many constants in one chunk.")
+        return constant
+
+    def emitConstant(self, value):
+        self.emitShort(OP_CONSTANT, self.makeConstant(value))
+
+    def endFunction(self) -> ObjFunction:
+        self.emitReturn()
+        function = self.current.function
+        function.chunk.globalCells = [None] * len(function.chunk.constants)
+        self.current = self.current.enclosing
+        return function
+
+    def error(self, mess: str):
+        self.hadError = True
+        pylox.report(self.line, "", mess)
+        raise CompileError()
+
+# ----------- scopes and variables ------------
+
+    def beginScope(self):
+        self.current.scopeDepth += 1
+
+    def endScope(self):
+        state = self.current
+        state.scopeDepth -= 1
+        while state.locals and state.locals[-1].depth > state.scopeDepth:
+            self.emitByte(OP_CLOSE_UPVALUE if state.locals[-1].isCaptured else OP_POP)
+            state.locals.pop()
+
+    def discardLocals(self, depth: int):
+        # pops the locals deeper than depth without forgetting them,
+        # used when break/continue jump out of scopes that are still being compiled
+        for local in reversed(self.current.locals):
+            if local.depth <= depth:
+                break
+            self.emitByte(OP_CLOSE_UPVALUE if local.isCaptured else OP_POP)
+
+    def addLocal(self, name: str):
+        if len(self.current.locals) == UINT8_COUNT:
+            self.error("Too many local variables in function.")
+        self.current.locals.append(Local(name, -1))
+
+    def markInitialized(self):
+        if self.current.scopeDepth == 0:
+            return
+        self.current.locals[-1].depth = self.current.scopeDepth
+
+    def declareVariable(self, name: Token):
+        # globals are late bound
+        if self.current.scopeDepth == 0:
+            return
+        self.addLocal(name.lexeme)
+
+    def defineVariable(self, name: Token):
+        if self.current.scopeDepth > 0:
+            self.markInitialized()
+            return
+        self.mark(name)
+        self.emitShort(OP_DEFINE_GLOBAL, self.makeConstant(name.lexeme))
+
+    def resolveLocal(self, state: FunctionState, name: str) -> int:
+        for i in range(len(state.locals) - 1, -1, -1):
+            local = state.locals[i]
+            if local.name == name and local.depth != -1:
+                return i
+        return -1
+
+    def addUpvalue(self, state: FunctionState, index: int, isLocal: bool) -> int:
+        for i, upvalue in enumerate(state.upvalues):
+            if upvalue.index == index and upvalue.isLocal == isLocal:
+                return i
+        if len(state.upvalues) == UINT8_COUNT:
+            self.error("Too many closure variables in function.")
+        state.upvalues.append(Upvalue(index, isLocal))
+        state.function.upvalueCount = len(state.upvalues)
+        return len(state.upvalues) - 1
+
+    def resolveUpvalue(self, state: FunctionState, name: str) -> int:
+        if state.enclosing is None:
+            return -1
+        local = self.resolveLocal(state.enclosing, name)
+        if local != -1:
+            state.enclosing.locals[local].isCaptured = True
+            return self.addUpvalue(state, local, True)
+
+        upvalue = self.resolveUpvalue(state.enclosing, name)
+        if upvalue != -1:
+            return self.addUpvalue(state, upvalue, False)
+        return -1
+
+    def namedVariable(self, name: str, canAssign: bool = False):
+        arg = self.resolveLocal(self.current, name)
+        if arg != -1:
+            self.emitBytes(OP_SET_LOCAL if canAssign else OP_GET_LOCAL, arg)
+            return
+        arg = self.resolveUpvalue(self.current, name)
+        if arg != -1:
+            self.emitBytes(OP_SET_UPVALUE if canAssign else OP_GET_UPVALUE, arg)
+            return
+        self.emitShort(OP_SET_GLOBAL if canAssign else OP_GET_GLOBAL, self.makeConstant(name))
+
+# ----------- statements -------------
+
+    def statement(self, stmt: Stmt):
+        stmt.accept(self)
+
+    def expression(self, expr: Expr):
+        expr.accept(self)
+
+    def visitBlockStmt(self, stmt: Block):
+        self.beginScope()
+        for statement in stmt.statements:
+            self.statement(statement)
+        self.endScope()
+
+    def visitClassStmt(self, stmt: Class):
+        self.mark(stmt.name)
+        nameConstant = self.makeConstant(stmt.name.lexeme)
+        self.declareVariable(stmt.name)
+
+        self.emitShort(OP_CLASS, nameConstant)
+        self.defineVariable(stmt.name)
+
+        classState = ClassState(self.currentClass)
+        self.currentClass = classState
+
+        if stmt.superclass != None:
+            self.expression(stmt.superclass)
+            self.beginScope()
+            self.addLocal("super")
+            self.markInitialized()
+
+            self.namedVariable(stmt.name.lexeme)
+            self.mark(stmt.superclass.name)
+            self.emitByte(OP_INHERIT)
+            classState.hasSuperclass = True
+
+        self.namedVariable(stmt.name.lexeme)
+        for method in stmt.methods:
+            self.mark(method.name)
+            constant = self.makeConstant(method.name.lexeme)
+            ftype = FunctionType.INITIALIZER if method.name.lexeme == "init" else FunctionType.METHOD
+            self.function(method.name.lexeme, method.params, method.body, ftype)
+            self.emitShort(OP_METHOD, constant)
+        self.emitByte(OP_POP)
+
+        if classState.hasSuperclass:
+            self.endScope()
+        self.currentClass = classState.enclosing
+
+    def visitVarStmt(self, stmt: Var):
+        self.declareVariable(stmt.name)
+        if stmt.initializer != None:
+            self.expression(stmt.initializer)
+        else:
+            self.emitByte(OP_NIL)
+        self.defineVariable(stmt.name)
+
+    def visitExpressionStmt(self, stmt: Expression):
+        self.expression(stmt.expression)
+        self.emitByte(OP_POP)
+
+    def visitIfStmt(self, stmt: If):
+        self.expression(stmt.condition)
+        thenJump = self.emitJump(OP_JUMP_IF_FALSE)
+        self.emitByte(OP_POP)
+        self.statement(stmt.thenBranch)
+
+        elseJump = self.emitJump(OP_JUMP)
+        self.patchJump(thenJump)
+        self.emitByte(OP_POP)
+        if stmt.elseBranch != None:
+            self.statement(stmt.elseBranch)
+        self.patchJump(elseJump)
+
+    def visitWhileStmt(self, stmt: While):
+        loop = Loop(self.chunk().count(), self.current.scopeDepth)
+        self.current.loops.append(loop)
+
+        self.expression(stmt.condition)
+        exitJump = self.emitJump(OP_JUMP_IF_FALSE)
+        self.emitByte(OP_POP)
+        loop.hasIncrement = stmt.increment != None
+        self.statement(stmt.body)
+        if loop.hasIncrement:
+            for jump in loop.continueJumps:
+                self.patchJump(jump)
+            self.expression(stmt.increment)
+            self.emitByte(OP_POP)
+        self.emitLoop(loop.start)
+
+        self.patchJump(exitJump)
+        self.emitByte(OP_POP)
+        # break jumps land after the condition is popped
+        for jump in loop.breakJumps:
+            self.patchJump(jump)
+        self.current.loops.pop()
+
+    def visitStopiterStmt(self, stmt: StopIter):
+        self.mark(stmt.name)
+        # the Resolver only lets break / continue into a loop of their own function
+        loop = self.current.loops[-1]
+        self.discardLocals(loop.scopeDepth)
+        if stmt.name.type == TokenType.BREAK:
+            loop.breakJumps.append(self.emitJump(OP_JUMP))
+        elif loop.hasIncrement:
+            loop.continueJumps.append(self.emitJump(OP_JUMP))
+        else:
+            self.emitLoop(loop.start)
+
+    def visitImportStmt(self, stmt: Import):
+        # imports are top level code, which runs once, so the module's statements are
+        # compiled in place of its first import and later imports of it are nothing
+        self.mark(stmt.keyword)
+        try:
+            module = Modules.loader.enter(stmt)
+        except pylox.LoxRuntimeError as error:
+            self.emitShort(OP_RUNTIME_ERROR, self.makeConstant(error.mess))
+            return
+        if module is not None:
+            for statement in module.statements:
+                self.statement(statement)
+
+    def visitPrintStmt(self, stmt: Print):
+        self.expression(stmt.expression)
+        self.emitByte(OP_PRINT)
+
+    def visitFunctionStmt(self, stmt: Function):
+        self.declareVariable(stmt.name)
+        # a local function can refer to itself
+        self.markInitialized()
+        self.function(stmt.name.lexeme, stmt.params, stmt.body, FunctionType.FUNCTION)
+        self.defineVariable(stmt.name)
+
+    def visitReturnStmt(self, stmt: Return):
+        self.mark(stmt.keyword)
+        if stmt.value == None:
+            self.emitReturn()
+            return
+        self.expression(stmt.value)
+        self.emitByte(OP_RETURN)
+
+    def function(self, name: str, params: 'list[Token]', body: 'list[Stmt]', ftype: FunctionType):
+        state = FunctionState(self.current, ObjFunction(name), ftype)
+        self.current = state
+        self.beginScope()
+
+        for param in params:
+            state.function.arity += 1
+            self.addLocal(param.lexeme)
+            self.markInitialized()
+        for stmt in body:
+            self.statement(stmt)
+
+        function = self.endFunction()
+        self.emitShort(OP_CLOSURE, self.makeConstant(function))
+        for upvalue in state.upvalues:
+            self.emitByte(1 if upvalue.isLocal else 0)
+            self.emitByte(upvalue.index)
+
+# ----------- expressions ------------
+
+    def visitAssignExpr(self, expr: Assign):
+        self.expression(expr.value)
+        self.mark(expr.name)
+        self.namedVariable(expr.name.lexeme, True)
+
+    def visitVariableExpr(self, expr: Variable):
+        self.mark(expr.name)
+        self.namedVariable(expr.name.lexeme)
+
+    def visitThisExpr(self, expr: This):
+        self.mark(expr.keyword)
+        self.namedVariable("this")
+
+    def visitLiteralExpr(self, expr: Literal):
+        if expr.value is None:
+            self.emitByte(OP_NIL)
+        elif expr.value is True:
+            self.emitByte(OP_TRUE)
+        elif expr.value is False:
+            self.emitByte(OP_FALSE)
+        else:
+            self.emitConstant(expr.value)
+
+    def visitLogicalExpr(self, expr: Logical):
+        self.expression(expr.left)
+        if expr.operator.type == TokenType.OR:
+            elseJump = self.emitJump(OP_JUMP_IF_FALSE)
+            endJump = self.emitJump(OP_JUMP)
+            self.patchJump(elseJump)
+            self.emitByte(OP_POP)
+            self.expression(expr.right)
+            self.patchJump(endJump)
+            return
+
+        endJump = self.emitJump(OP_JUMP_IF_FALSE)
+        self.emitByte(OP_POP)
+        self.expression(expr.right)
+        self.patchJump(endJump)
+
+    def visitSetExpr(self, expr: Set):
+        self.expression(expr.obj)
+        self.expression(expr.value)
+        self.mark(expr.name)
+        self.emitShort(OP_SET_PROPERTY, self.makeConstant(expr.name))
+
+    def visitSuperExpr(self, expr: Super):
+        self.mark(expr.keyword)
+        self.namedVariable("this")
+        self.namedVariable("super")
+        self.mark(expr.method)
+        self.emitShort(OP_GET_SUPER, self.makeConstant(expr.method))
+
+    def visitGroupingExpr(self, expr: Grouping):
+        self.expression(expr.expression)
+
+    def visitUnaryExpr(self, expr: Unary):
+        self.expression(expr.right)
+        self.mark(expr.operator)
+        if expr.operator.type == TokenType.MINUS:
+            self.emitByte(OP_NEGATE)
+        elif expr.operator.type == TokenType.BANG:
+            self.emitByte(OP_NOT)
+
+    binaryOps = {
+        TokenType.BANG_EQUAL: OP_NOT_EQUAL,
+        TokenType.EQUAL_EQUAL: OP_EQUAL,
+        TokenType.GREATER: OP_GREATER,
+        TokenType.GREATER_EQUAL: OP_GREATER_EQUAL,
+        TokenType.LESS: OP_LESS,
+        TokenType.LESS_EQUAL: OP_LESS_EQUAL,
+        TokenType.PLUS: OP_ADD,
+        TokenType.MINUS: OP_SUBTRACT,
+        TokenType.STAR: OP_MULTIPLY,
+        TokenType.SLASH: OP_DIVIDE,
+    }
+
+    def visitBinaryExpr(self, expr: Binary):
+        self.expression(expr.left)
+        self.expression(expr.right)
+        self.mark(expr.operator)
+        self.emitByte(self.binaryOps[expr.operator.type])
+
+    def visitCallExpr(self, expr: Call):
+        if len(expr.arguments) >= UINT8_COUNT:
+            self.mark(expr.paren)
+            self.error("Can't have more than 255 arguments")
+
+        # method calls skip creating a bound method
+        if isinstance(expr.callee, Get):
+            self.expression(expr.callee.object)
+            for arg in expr.arguments:
+                self.expression(arg)
+            self.mark(expr.paren)
+            self.emitShort(OP_INVOKE, self.makeConstant(expr.callee.name))
+            self.emitByte(len(expr.arguments))
+            return
+
+        if isinstance(expr.callee, Super):
+            self.mark(expr.callee.keyword)
+            self.namedVariable("this")
+            for arg in expr.arguments:
+                self.expression(arg)
+            self.namedVariable("super")
+            self.mark(expr.paren)
+            self.emitShort(OP_SUPER_INVOKE, self.makeConstant(expr.callee.method))
+            self.emitByte(len(expr.arguments))
+            return
+
+        self.expression(expr.callee)
+        for arg in expr.arguments:
+            self.expression(arg)
+        self.mark(expr.paren)
+        self.emitBytes(OP_CALL, len(expr.arguments))
+
+    def visitGetExpr(self, expr: Get):
+        self.expression(expr.object)
+        self.mark(expr.name)
+        self.emitShort(OP_GET_PROPERTY, self.makeConstant(expr.name))
+
+    def visitIndexExpr(self, expr: Index):
+        self.expression(expr.object)
+        self.expression(expr.index)
+        self.mark(expr.bracket)
+        self.emitByte(OP_GET_INDEX)
+
+    def visitSetindexExpr(self, expr: SetIndex):
+        self.expression(expr.object)
+        self.expression(expr.index)
+        self.expression(expr.value)
+        self.mark(expr.bracket)
+        self.emitByte(OP_SET_INDEX)
+
+    def visitLambdaExpr(self, expr: Lambda):
+        self.function(None, expr.params, expr.body, FunctionType.FUNCTION)
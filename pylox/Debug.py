@@ -0,0 +1,70 @@
+from Chunk import *
+from Interpreter import stringify
+
+# disassembler, python version of clox/debug.c
+
+constantOps = {OP_CONSTANT, OP_GET_GLOBAL, OP_DEFINE_GLOBAL, OP_SET_GLOBAL, OP_GET_PROPERTY,
+               OP_SET_PROPERTY, OP_GET_SUPER, OP_CLASS, OP_METHOD, OP_RUNTIME_ERROR}
+byteOps = {OP_GET_LOCAL, OP_SET_LOCAL, OP_GET_UPVALUE, OP_SET_UPVALUE, OP_CALL}
+invokeOps = {OP_INVOKE, OP_SUPER_INVOKE}
+
+
+def disassembleChunk(chunk: Chunk, name: str):
+    print(f"== {name} ==")
+    offset = 0
+    while offset < chunk.count():
+        offset = disassembleInstruction(chunk, offset)
+
+
+def readShort(chunk: Chunk, offset: int) -> int:
+    return (chunk.code[offset] << 8) | chunk.code[offset + 1]
+
+
+def disassembleInstruction(chunk: Chunk, offset: int) -> int:
+    if offset > 0 and chunk.lines[offset] == chunk.lines[offset - 1]:
+        line = "   |"
+    else:
+        line = f"{chunk.lines[offset]:4d}"
+    prefix = f"{offset:04d} {line} "
+
+    instruction = chunk.code[offset]
+    name = opNames.get(instruction)
+    if name is None:
+        print(f"{prefix}Unknown opcode {instruction}")
+        return offset + 1
+
+    if instruction in constantOps:
+        constant = readShort(chunk, offset + 1)
+        print(f"{prefix}{name:<16} {constant:4d} '{stringify(chunk.constants[constant])}'")
+        return offset + 3
+
+    if instruction in byteOps:
+        print(f"{prefix}{name:<16} {chunk.code[offset + 1]:4d}")
+        return offset + 2
+
+    if instruction in (OP_JUMP, OP_JUMP_IF_FALSE, OP_LOOP):
+        sign = -1 if instruction == OP_LOOP else 1
+        jump = readShort(chunk, offset + 1)
+        print(f"{prefix}{name:<16} {offset:4d} -> {offset + 3 + sign * jump}")
+        return offset + 3
+
+    if instruction in invokeOps:
+        constant = readShort(chunk, offset + 1)
+        argCount = chunk.code[offset + 3]
+        print(f"{prefix}{name:<16} ({argCount} args) {constant:4d} '{stringify(chunk.constants[constant])}'")
+        return offset + 4
+
+    if instruction == OP_CLOSURE:
+        constant = readShort(chunk, offset + 1)
+        function = chunk.constants[constant]
+        print(f"{prefix}{name:<16} {constant:4d} {function}")
+        offset += 3
+        for _ in range(function.upvalueCount):
+            isLocal = chunk.code[offset]
+            index = chunk.code[offset + 1]
+            print(f"{offset:04d}    |                     {'local' if isLocal else 'upvalue'} {index}")
+            offset += 2
+        return offset
+
+    print(f"{prefix}{name}")
+    return offset + 1
@@ -2,24 +2,19 @@ from Token import Token, TokenType
 import pylox
 
 class Environment():
+    # local scope, the Resolver gives every local a slot in declaration order
+    # and declarations run in that same order, so define just appends
+    __slots__ = ("values", "enclosing")
+
     def __init__(self, enclosing = None) -> None:
-        self.values:dict = {}
+        self.values:list = []
         self.enclosing = enclosing
 
     def define(self, name: str, value):
-        self.values[name] = value
-
-    def get(self, name:Token):
-        if name.lexeme in self.values:
-            return self.values.get(name.lexeme)
-        
-        if self.enclosing != None:
-            return self.enclosing.get(name)
-        
-        raise pylox.LoxRuntimeError(name, f"Undefined variable '{name.lexeme}'.")
+        self.values.append(value)
 
-    def getAt(self, distance, name):
-        return self.ancestor(distance).values.get(name)
+    def getAt(self, distance, slot):
+        return self.ancestor(distance).values[slot]
 
     def ancestor(self, distance):
         enviorment = self
@@ -27,16 +22,49 @@ class Environment():
             enviorment = enviorment.enclosing
         return enviorment
 
-    def assign(self, name:Token, value):
-        if name.lexeme in self.values:
-            self.values[name.lexeme] = value
-            return
+    def assignAt(self, distance, slot, value):
+        self.ancestor(distance).values[slot] = value
+
+
+class GlobalCell():
+    # where a global's value lives, the same cell for as long as the program runs
+    __slots__ = ("value",)
+
+    def __init__(self, value) -> None:
+        self.value = value
+
 
-        if self.enclosing != None:
-            self.enclosing.assign(name, value)
-            return
+class GlobalEnvironment():
+    # globals are late bound, looked up by name the first time a Variable / Assign
+    # node runs, which then keeps the cell. a cell is made by the first define of
+    # its name and redefining only changes its value, so a kept cell never goes stale
+    __slots__ = ("cells", "enclosing")
 
-        raise pylox.LoxRuntimeError(name, f"Undefined variable '{name.lexeme}'.")
+    def __init__(self) -> None:
+        self.cells: 'dict[str, GlobalCell]' = {}
+        self.enclosing = None
 
-    def assignAt(self, distance, name:Token, value):
-        self.ancestor(distance).values[name.lexeme] = value
\ No newline at end of file
+    def copy(self) -> 'GlobalEnvironment':
+        # same names and values, cells of its own
+        environment = GlobalEnvironment()
+        environment.cells = {name: GlobalCell(cell.value) for name, cell in self.cells.items()}
+        return environment
+
+    def define(self, name: str, value):
+        cell = self.cells.get(name)
+        if cell is None:
+            self.cells[name] = GlobalCell(value)
+        else:
+            cell.value = value
+
+    def cell(self, name:Token) -> GlobalCell:
+        cell = self.cells.get(name.lexeme)
+        if cell is None:
+            raise pylox.LoxRuntimeError(name, f"Undefined variable '{name.lexeme}'.")
+        return cell
+
+    def get(self, name:Token):
+        return self.cell(name).value
+
+    def assign(self, name:Token, value):
+        self.cell(name).value = value
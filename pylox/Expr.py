@@ -1,41 +1,41 @@
-from abc import ABC
 from Token import Token
 
 
-class Expr (ABC):
-    def __init__(self) -> None:
-       super().__init__()
-       pass
+class Expr:
+    __slots__ = ()
+
     def accept(self, visitor: any):
         pass
-    def __eq__(self, __o: object) -> bool:
-        return self is __o
-    def __hash__(self):
-        return hash(id(self))
 
 
 
 
 class Assign(Expr):
+    __slots__ = ('name', 'value', 'cell',)
+
     def __init__(self, name:Token, value:Expr, ):
-        super().__init__()
         self.name = name
         self.value = value
+        self.cell = None
     def accept(self, visitor: any):
         return visitor.visitAssignExpr(self)
 
 class Binary(Expr):
+    __slots__ = ('left', 'operator', 'right', 'op', 'deoptimized',)
+
     def __init__(self, left:Expr, operator:Token, right:Expr, ):
-        super().__init__()
         self.left = left
         self.operator = operator
         self.right = right
+        self.op = None
+        self.deoptimized = None
     def accept(self, visitor: any):
         return visitor.visitBinaryExpr(self)
 
 class Call(Expr):
+    __slots__ = ('callee', 'paren', 'arguments',)
+
     def __init__(self, callee:Expr, paren:Token, arguments:'list[Expr]', ):
-        super().__init__()
         self.callee = callee
         self.paren = paren
         self.arguments = arguments
@@ -43,30 +43,35 @@ class Call(Expr):
         return visitor.visitCallExpr(self)
 
 class Get(Expr):
+    __slots__ = ('object', 'name', 'cache',)
+
     def __init__(self, object:Expr, name:Token, ):
-        super().__init__()
         self.object = object
         self.name = name
+        self.cache = None
     def accept(self, visitor: any):
         return visitor.visitGetExpr(self)
 
 class Grouping(Expr):
+    __slots__ = ('expression',)
+
     def __init__(self, expression:Expr, ):
-        super().__init__()
         self.expression = expression
     def accept(self, visitor: any):
         return visitor.visitGroupingExpr(self)
 
 class Literal(Expr):
+    __slots__ = ('value',)
+
     def __init__(self, value:any, ):
-        super().__init__()
         self.value = value
     def accept(self, visitor: any):
         return visitor.visitLiteralExpr(self)
 
 class Logical(Expr):
+    __slots__ = ('left', 'operator', 'right',)
+
     def __init__(self, left:Expr, operator:Token, right:Expr, ):
-        super().__init__()
         self.left = left
         self.operator = operator
         self.right = right
@@ -74,52 +79,83 @@ class Logical(Expr):
         return visitor.visitLogicalExpr(self)
 
 class Set(Expr):
+    __slots__ = ('obj', 'name', 'value', 'cache',)
+
     def __init__(self, obj:Expr, name:Token, value:Expr, ):
-        super().__init__()
         self.obj = obj
         self.name = name
         self.value = value
+        self.cache = None
     def accept(self, visitor: any):
         return visitor.visitSetExpr(self)
 
 class Super(Expr):
+    __slots__ = ('keyword', 'method', 'cache',)
+
     def __init__(self, keyword:Token, method:Token, ):
-        super().__init__()
         self.keyword = keyword
         self.method = method
+        self.cache = None
     def accept(self, visitor: any):
         return visitor.visitSuperExpr(self)
 
 class This(Expr):
+    __slots__ = ('keyword',)
+
     def __init__(self, keyword:Token, ):
-        super().__init__()
         self.keyword = keyword
     def accept(self, visitor: any):
         return visitor.visitThisExpr(self)
 
 class Unary(Expr):
+    __slots__ = ('operator', 'right', 'deoptimized',)
+
     def __init__(self, operator:Token, right:Expr, ):
-        super().__init__()
         self.operator = operator
         self.right = right
+        self.deoptimized = None
     def accept(self, visitor: any):
         return visitor.visitUnaryExpr(self)
 
 class Variable(Expr):
+    __slots__ = ('name', 'cell',)
+
     def __init__(self, name:Token, ):
-        super().__init__()
         self.name = name
+        self.cell = None
     def accept(self, visitor: any):
         return visitor.visitVariableExpr(self)
 
 class Lambda(Expr):
+    __slots__ = ('params', 'body',)
+
     def __init__(self, params:'list[Token]', body:any, ):
-        super().__init__()
         self.params = params
         self.body = body
     def accept(self, visitor: any):
         return visitor.visitLambdaExpr(self)
 
+class Index(Expr):
+    __slots__ = ('object', 'bracket', 'index',)
+
+    def __init__(self, object:Expr, bracket:Token, index:Expr, ):
+        self.object = object
+        self.bracket = bracket
+        self.index = index
+    def accept(self, visitor: any):
+        return visitor.visitIndexExpr(self)
+
+class SetIndex(Expr):
+    __slots__ = ('object', 'bracket', 'index', 'value',)
+
+    def __init__(self, object:Expr, bracket:Token, index:Expr, value:Expr, ):
+        self.object = object
+        self.bracket = bracket
+        self.index = index
+        self.value = value
+    def accept(self, visitor: any):
+        return visitor.visitSetindexExpr(self)
+
 class ExprVisitor:
     def __str__(self):
         return self.__class__.__name__
@@ -149,3 +185,15 @@ class ExprVisitor:
         pass
     def visitLambdaExpr(self, expr:Lambda):
         pass
+    def visitIndexExpr(self, expr:Index):
+        pass
+    def visitSetindexExpr(self, expr:SetIndex):
+        pass
+    def visitNumberBinaryExpr(self, expr:Binary):
+        return self.visitBinaryExpr(expr)
+    def visitStringBinaryExpr(self, expr:Binary):
+        return self.visitBinaryExpr(expr)
+    def visitNegateUnaryExpr(self, expr:Unary):
+        return self.visitUnaryExpr(expr)
+    def visitNotUnaryExpr(self, expr:Unary):
+        return self.visitUnaryExpr(expr)
@@ -1,3 +1,9 @@
 class Flags:
     hadError : bool = False
-    hadRuntimeError : bool = False
\ No newline at end of file
+    hadRuntimeError : bool = False
+    # -O, run the Optimizer on the resolved tree
+    optimize : bool = False
+    # --scanner=regex|char, char is the original one character at a time Scanner
+    scanner : str = "regex"
+    # --no-cache, parse and resolve scripts every time instead of using __loxcache__
+    cache : bool = True
@@ -1,75 +1,95 @@
-""" helper file for generating classes for ast """
+""" helper file for generating classes for ast
 
+    python GeneratingAst.py [Expr] [Stmt]
 
-expr_strs = ["Assign : Token name, Expr value","Binary : Expr left, Token operator, Expr right", "Call : Expr callee, Token paren, 'list[Expr]' arguments", 
-            "Get : Expr object, Token name", "Grouping : Expr expression", "Literal : any value", "Logical : Expr left, Token operator, Expr right",
-            "Set : Expr obj, Token name, Expr value", "Super : Token keyword, Token method", "This : Token keyword", "Unary: Token operator, Expr right", "Variable : Token name", "Lambda : 'list[Token]' params, any body"]
+regenerates Expr.py and Stmt.py next to this file (both when no name is given)
+"""
+import os
+import sys
+
+# "Name : fields | state", state are extra slots the interpreter fills in while running
+# (the GlobalCell of a global Variable / Assign, a Get / Set inline cache, ...)
+expr_strs = ["Assign : Token name, Expr value | cell","Binary : Expr left, Token operator, Expr right | op, deoptimized", "Call : Expr callee, Token paren, 'list[Expr]' arguments",
+            "Get : Expr object, Token name | cache", "Grouping : Expr expression", "Literal : any value", "Logical : Expr left, Token operator, Expr right",
+            "Set : Expr obj, Token name, Expr value | cache", "Super : Token keyword, Token method | cache", "This : Token keyword", "Unary: Token operator, Expr right | deoptimized", "Variable : Token name | cell", "Lambda : 'list[Token]' params, any body",
+            "Index : Expr object, Token bracket, Expr index", "SetIndex : Expr object, Token bracket, Expr index, Expr value"]
 
 stmt_strs = ["Block : 'list[Stmt]' statements", "Class : Token name, 'Expr.Variable' superclass, 'list[Function]' methods", "Expression : Expr expression", "Function : Token name, 'list[Token]' params, list[Stmt] body",
-            "If : Expr condition, Stmt thenBranch, Stmt elseBranch", "Return : Token keyword, Expr value", "Print : Expr expression", 
-            "Var : Token name, Expr initializer", "While : Expr condition, Stmt body", "StopIter: Token name"]
-
-l = [expr_strs, stmt_strs]
-
-base_class_name = input("Base class name: ")
-
-a = input("expr:0, stms:1\n : ")
-
-in_strs = l[int(a)]
-
-
-with open(base_class_name+".py", "w") as f:
-    f.writelines([
-        # import 
-        "from abc import ABC\n",
-        "from Token import Token\n",
-        f"{'from Expr import Expr' if base_class_name == 'Stmt' else ''}",
-        "\n\n",
-        # ABC        
-        f"class {base_class_name} (ABC):\n",    
-        "    def __init__(self) -> None:\n"
-        "       super().__init__()\n",
-        "       pass\n"
-        "    def accept(self, visitor: any):\n",
-        "        pass\n",
-        "    def __eq__(self, __o: object) -> bool:\n",
-        "        return self is __o\n",
-        "    def __hash__(self):\n",
-        "        return hash(id(self))\n\n",
-        "\n",
-    ])
-
-    for production in in_strs:
-        l1 = production.split(":")
-        class_name = l1[0].strip()
-        f.write(f"\n\nclass {class_name}({base_class_name}):")
-
-        children = l1[1].split(",")
-        child_tups = [] # list of tuples (type, arg_name)
-        for child in children:
-            # creates a tuple from list
-            child_tups.append( tuple(child.strip().split()) )
-
-        f.write("\n    def __init__(self, ")
-        for tok_type, tok in child_tups:
-            f.write(f"{tok}:{tok_type}, ")
-        f.write("):\n")
-
-        f.write("        super().__init__()\n")
-        for tok_type, tok in child_tups:
-            f.write(f"        self.{tok} = {tok}\n")
-
-        f.write("    def accept(self, visitor: any):\n")
-        f.write(f"        return visitor.visit{class_name.capitalize()}{base_class_name.capitalize()}(self)") 
-        
-    f.writelines([
-            f"\n\nclass {base_class_name.capitalize()}Visitor:\n",
-            "    def __str__(self):\n",
-            "        return self.__class__.__name__\n"
+            "If : Expr condition, Stmt thenBranch, Stmt elseBranch", "Return : Token keyword, Expr value", "Print : Expr expression",
+            "Var : Token name, Expr initializer", "While : Expr condition, Stmt body, Expr increment", "StopIter: Token name",
+            "Import : Token keyword, Token path | file"]
+
+productions = {"Expr": expr_strs, "Stmt": stmt_strs}
+
+# the nodes Interpreter quickens Binary / Unary into (see Interpreter.py) -> the node they
+# quickened from. every other visitor (Resolver, Optimizer, the compilers, pylox build) can
+# be handed a tree the tree walker already ran, it visits them as the generic node
+quickened = {"Expr": {"NumberBinary": "Binary", "StringBinary": "Binary", "NegateUnary": "Unary", "NotUnary": "Unary"}}
+
+
+def defineAst(base_class_name: str, in_strs: 'list[str]'):
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), base_class_name + ".py")
+    with open(path, "w") as f:
+        f.writelines([
+            # import
+            "from Token import Token\n",
+            f"{'from Expr import Expr' if base_class_name == 'Stmt' else ''}",
+            "\n\n",
+            # nodes are slotted, no __dict__ per node. equality and hashing are
+            # object's, by identity, which is what Interpreter.locals needs
+            f"class {base_class_name}:\n",
+            "    __slots__ = ()\n\n",
+            "    def accept(self, visitor: any):\n",
+            "        pass\n\n",
+            "\n",
         ])
-    
-    for production in in_strs:
-        l1 = production.split(":")
-        class_name = l1[0].strip()
-        f.write(f"    def visit{class_name.capitalize()}{base_class_name.capitalize()}(self, {base_class_name.lower()}:{class_name}):\n")
-        f.write("        pass\n")
\ No newline at end of file
+
+        for production in in_strs:
+            l1 = production.split(":")
+            class_name = l1[0].strip()
+            fields, _, state = l1[1].partition("|")
+
+            child_tups = [] # list of tuples (type, arg_name)
+            for child in fields.split(","):
+                # creates a tuple from list
+                child_tups.append( tuple(child.strip().split()) )
+            state_names = [name.strip() for name in state.split(",") if name.strip()]
+
+            f.write(f"\n\nclass {class_name}({base_class_name}):")
+            slots = [tok for _, tok in child_tups] + state_names
+            f.write(f"\n    __slots__ = ({', '.join(repr(slot) for slot in slots)},)\n")
+
+            f.write("\n    def __init__(self, ")
+            for tok_type, tok in child_tups:
+                f.write(f"{tok}:{tok_type}, ")
+            f.write("):\n")
+
+            for tok_type, tok in child_tups:
+                f.write(f"        self.{tok} = {tok}\n")
+            for name in state_names:
+                f.write(f"        self.{name} = None\n")
+
+            # the per class dispatch, one call straight to the visitor's method
+            f.write("    def accept(self, visitor: any):\n")
+            f.write(f"        return visitor.visit{class_name.capitalize()}{base_class_name.capitalize()}(self)")
+
+        f.writelines([
+                f"\n\nclass {base_class_name.capitalize()}Visitor:\n",
+                "    def __str__(self):\n",
+                "        return self.__class__.__name__\n"
+            ])
+
+        for production in in_strs:
+            l1 = production.split(":")
+            class_name = l1[0].strip()
+            f.write(f"    def visit{class_name.capitalize()}{base_class_name.capitalize()}(self, {base_class_name.lower()}:{class_name}):\n")
+            f.write("        pass\n")
+
+        for class_name, generic in quickened.get(base_class_name, {}).items():
+            f.write(f"    def visit{class_name}{base_class_name}(self, {base_class_name.lower()}:{generic}):\n")
+            f.write(f"        return self.visit{generic}{base_class_name}({base_class_name.lower()})\n")
+
+
+if __name__ == "__main__":
+    for base_class_name in sys.argv[1:] or list(productions):
+        defineAst(base_class_name, productions[base_class_name])
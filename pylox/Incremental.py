@@ -0,0 +1,162 @@
+""" incremental front end, for sessions that hand pylox the whole buffer again after every edit
+
+    session = Incremental.Incremental(interpreter)
+    statements = session.update(source)     # None when it has errors
+    interpreter.interpret(statements)
+
+top level declarations outside the edited part of the source keep their tokens, AST and
+resolution from the previous update, only the edited part is scanned, parsed and resolved.
+declarations resolve on their own at the top level (globals are late bound), which is what
+lets a declaration be reused without looking at the ones around it.
+"""
+import Scanner
+import Parser
+import Resolver
+import LoxCache
+from Token import Token
+from Expr import Expr
+from Stmt import Stmt
+
+
+class Declaration:
+    # a top level declaration and where it was in the source of the last update
+    __slots__ = ("start", "followEnd", "stmt", "resolved")
+
+    def __init__(self, start: int, followEnd: int, stmt: Stmt, resolved: list) -> None:
+        # offset of its first token, and the end of the token after it: the parse of a
+        # declaration can depend on that token (if without else), not on anything past it
+        self.start = start
+        self.followEnd = followEnd
+        self.stmt = stmt
+        self.resolved = resolved
+
+
+class Incremental:
+    def __init__(self, interpreter) -> None:
+        self.interpreter = interpreter
+        self.source = ""
+        self.declarations: 'list[Declaration]' = []
+        # declarations parsed by the last update, the rest were reused
+        self.reparsed = 0
+
+    def update(self, source: str) -> 'list[Stmt]':
+        old = self.source
+        prefix = commonPrefix(old, source)
+        suffix = commonSuffix(old, source, prefix)
+        delta = len(source) - len(old)
+
+        # reused from the front: they and the token after them end before the edit,
+        # the unchanged character after that token is what ended it
+        keep = 0
+        while keep < len(self.declarations) and self.declarations[keep].followEnd < prefix:
+            keep += 1
+        # reusable from the back: their text is unchanged up to the end of the source
+        tail = {}
+        for i in range(keep, len(self.declarations)):
+            if self.declarations[i].start >= len(old) - suffix:
+                tail[self.declarations[i].start + delta] = i
+
+        # scanning restarts on a token, the first declaration not kept starts with the
+        # token after the last kept one (the last declaration is never kept, see parseFrom)
+        start = self.declarations[keep].start if keep > 0 else 0
+
+        front = self.declarations[:keep]
+        middle, resumeAt = self.parseFrom(source, start, tail)
+        back = []
+        if resumeAt is not None:
+            back = self.declarations[resumeAt:]
+            lineDelta = source.count("\n") - old.count("\n")
+            for declaration in back:
+                declaration.start += delta
+                declaration.followEnd += delta
+                if lineDelta != 0:
+                    shiftLines(declaration.stmt, lineDelta)
+
+        # whatever was neither kept nor moved is gone, and so is its resolution
+        for declaration in self.declarations[keep:resumeAt]:
+            for expr, _, _ in declaration.resolved:
+                self.interpreter.unresolve(expr)
+
+        self.source = source
+        self.declarations = front + middle + back
+        self.reparsed = len(middle)
+        if any(declaration.stmt is None for declaration in self.declarations):
+            return None
+        return [declaration.stmt for declaration in self.declarations]
+
+    def parseFrom(self, source: str, start: int, tail: 'dict[int, int]'):
+        """ scans and parses declarations from offset start until one starts where an old
+            declaration from tail now starts, returns the new declarations and the index
+            of that old declaration, or None when parsing reached the end """
+        scanner = Scanner.RegexScanner(source)
+        scanner.line = source.count("\n", 0, start) + 1
+        tokens = scanner.tokenStream(start)
+        parser = Parser.Parser(tokens)
+        resolver = Resolver.Resolver(None)
+        declarations = []
+        try:
+            while not parser.isAtEnd():
+                first = scanner.tokenStart
+                if first in tail:
+                    return declarations, tail[first]
+
+                recorder = LoxCache.ResolveRecorder(self.interpreter)
+                errors = parser.errors
+                stmt = parser.declaration()
+                if parser.errors != errors:
+                    # declaration() only gives None when the error was at its top
+                    stmt = None
+                if stmt is not None:
+                    resolver.interpreter = recorder
+                    if resolver.firstResolve([stmt]):
+                        stmt = None
+                    resolver.localHadError = False
+                followEnd = scanner.tokenEnd
+                if parser.isAtEnd():
+                    # nothing can follow the last declaration without changing the end
+                    followEnd += 1
+                declarations.append(Declaration(first, followEnd, stmt, recorder.resolved))
+            return declarations, None
+        finally:
+            tokens.close()
+
+
+def commonPrefix(a: str, b: str) -> int:
+    # binary search on slice compares, they run in C
+    low, high = 0, min(len(a), len(b))
+    while low < high:
+        mid = (low + high + 1) // 2
+        if a[:mid] == b[:mid]:
+            low = mid
+        else:
+            high = mid - 1
+    return low
+
+def commonSuffix(a: str, b: str, prefix: int) -> int:
+    # never overlapping the common prefix
+    low, high = 0, min(len(a), len(b)) - prefix
+    while low < high:
+        mid = (low + high + 1) // 2
+        if a[len(a) - mid:] == b[len(b) - mid:]:
+            low = mid
+        else:
+            high = mid - 1
+    return low
+
+def shiftLines(node, delta: int):
+    # a reused declaration below an edit that added or removed lines,
+    # tokens are frozen, so they are replaced in the node's fields
+    if isinstance(node, (Expr, Stmt)):
+        # a quickened node's class only adds empty __slots__, its fields are the base class's
+        for name in (name for cls in type(node).__mro__ for name in getattr(cls, "__slots__", ())):
+            value = getattr(node, name)
+            if isinstance(value, Token):
+                setattr(node, name, Token(value.type, value.lexeme, value.literal, value.line + delta))
+            else:
+                shiftLines(value, delta)
+    elif isinstance(node, list):
+        for i, value in enumerate(node):
+            if isinstance(value, Token):
+                node[i] = Token(value.type, value.lexeme, value.literal, value.line + delta)
+            else:
+                shiftLines(value, delta)
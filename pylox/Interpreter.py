@@ -1,9 +1,15 @@
-from Expr import ExprVisitor, Expr, Binary, Grouping, Set, Super, This, Unary, Literal, Variable, Assign, Logical, Call, Lambda, Get
+from Expr import ExprVisitor, Expr, Binary, Grouping, Set, Super, This, Unary, Literal, Variable, Assign, Logical, Call, Lambda, Get, Index, SetIndex
 from Token import TokenType, Token
-from Stmt import StmtVisitor, Stmt, Expression, Print,  Var, Block, If, While, StopIter, Function, Return, Class
+from Stmt import StmtVisitor, Stmt, Expression, Print,  Var, Block, If, While, StopIter, Function, Return, Class, Import
 import LoxCallable
-from Environment import Environment
+from Environment import Environment, GlobalEnvironment
+import operator
+import sys
+from sys import intern
 import pylox
+import Modules
+# stringify and the interning of runtime strings are shared with pylox build modules
+from LoxNatives import stringify, internShort, INTERN_LIMIT
 
 # helper 
 # everything apart from nil (None under the hood) and false is evaluated to true
@@ -24,34 +30,105 @@ def checkNumberOperands(operator, left, right):
         return True
     raise pylox.LoxRuntimeError(operator, "Operands must be numbers")
 
-def stringify(s) -> str:
-    if s is None:
-        return "nil"
-    elif isinstance(s, float):
-        txt = str(s)
-        if txt.endswith(".0"):
-            return txt[0:-2:]
-        return txt
-
-    return str(s)
+# lox calls deep before "Stack overflow.", pylox --stack-limit changes it
+MAX_CALL_DEPTH = 1000
+# python frames a lox call can take in the tree walker, for the python recursion limit
+PY_FRAMES_PER_CALL = 40
+
+class TailCall:
+    # completion of 'return f(x);' when f is a lox function, LoxFunction.callIn
+    # runs it in place of the returning call instead of nesting another one
+    __slots__ = ("function", "closure", "arguments")
+
+    def __init__(self, function, closure: Environment, arguments: list) -> None:
+        self.function = function
+        self.closure = closure
+        self.arguments = arguments
+
+def defineNatives(environment: GlobalEnvironment):
+    environment.define("clock", LoxCallable.clock())
+    environment.define("input", LoxCallable.loxInput())
+    environment.define("num", LoxCallable.loxToNum())
+    environment.define("list", LoxCallable.LoxList())
+    environment.define("f64array", LoxCallable.F64Array())
+    environment.define("map", LoxCallable.LoxMap())
+    environment.define("StringBuilder", LoxCallable.StringBuilder())
+
+# the globals a program starts with, made by the first interpreter of the process
+nativeGlobals: GlobalEnvironment = None
+
+def initialGlobals() -> GlobalEnvironment:
+    # natives hold no state, every interpreter copies the cells of the one set of them
+    global nativeGlobals
+    if nativeGlobals is None:
+        nativeGlobals = GlobalEnvironment()
+        defineNatives(nativeGlobals)
+    return nativeGlobals.copy()
+
+# ------- quickened nodes -------
+# after its first evaluation a Binary / Unary node swaps its class for one of these,
+# they keep every field of the original node and only exist in trees run by Interpreter,
+# no slots of their own so __class__ can be swapped both ways. other visitors get them as
+# the generic node, ExprVisitor's visitNumberBinaryExpr & co call visitBinaryExpr / visitUnaryExpr
+
+class NumberBinary(Binary):
+    # both operands were numbers, op is the python operator
+    __slots__ = ()
+
+    def accept(self, visitor: any):
+        return visitor.visitNumberBinaryExpr(self)
+
+class StringBinary(Binary):
+    # string + string
+    __slots__ = ()
+
+    def accept(self, visitor: any):
+        return visitor.visitStringBinaryExpr(self)
+
+class NegateUnary(Unary):
+    __slots__ = ()
+
+    def accept(self, visitor: any):
+        return visitor.visitNegateUnaryExpr(self)
+
+class NotUnary(Unary):
+    # works for any operand, never deoptimizes
+    __slots__ = ()
+
+    def accept(self, visitor: any):
+        return visitor.visitNotUnaryExpr(self)
+
+# classes / shapes remembered per Get / Set / Super node before it stops caching
+INLINE_CACHE_SIZE = 4
+
+numberOperators = {
+    TokenType.PLUS: operator.add,
+    TokenType.MINUS: operator.sub,
+    TokenType.STAR: operator.mul,
+    TokenType.SLASH: operator.truediv,
+    TokenType.GREATER: operator.gt,
+    TokenType.GREATER_EQUAL: operator.ge,
+    TokenType.LESS: operator.lt,
+    TokenType.LESS_EQUAL: operator.le,
+}
 
 class Interpreter(ExprVisitor, StmtVisitor):    
 
     def __init__(self) -> None:
-        self.globals = Environment()
+        self.globals = initialGlobals()
         self.environment = self.globals
         # or 
         # self.environment = Environment(self.globals)
         self.locals = {}
-
-# ------- defining built in functions -----
-        self.globals.define("clock", LoxCallable.clock())
-        self.globals.define("input", LoxCallable.loxInput())
-        self.globals.define("num", LoxCallable.loxToNum())
-        self.globals.define("list", LoxCallable.LoxList())
+        # quickened node counters, printed by pylox --stats
+        self.quickened = 0
+        self.deoptimized = 0
+        self.callDepth = 0
+        self.maxCallDepth = MAX_CALL_DEPTH
 
 
     def interpret(self, statements: 'list[Stmt]'):
+        self.raiseRecursionLimit()
         try:
             for statement in statements:
                 self.execute(statement)
@@ -59,11 +136,18 @@ class Interpreter(ExprVisitor, StmtVisitor):
             pylox.runtimeError(error)
             return None
 
+    def raiseRecursionLimit(self):
+        # lox calls are python calls, leave room for maxCallDepth of them
+        limit = self.maxCallDepth * PY_FRAMES_PER_CALL + 1000
+        if sys.getrecursionlimit() < limit:
+            sys.setrecursionlimit(limit)
+
 # ----------- visiting statemenst -------------
-    # statments dont have a return value since they dont evaluate to a value
+    # statments dont evaluate to a value, they return how they completed:
+    # None normally, the token of a break / continue, or (value,) for a return
 
     def visitBlockStmt(self, stmt: Block):
-        self.executeBlock(stmt.statements, Environment(self.environment))
+        return self.executeBlock(stmt.statements, Environment(self.environment))
 
     def visitClassStmt(self, stmt: Class):
         superclass = None
@@ -72,7 +156,7 @@ class Interpreter(ExprVisitor, StmtVisitor):
             if not isinstance(superclass, LoxCallable.LoxClass):
                 raise pylox.LoxRuntimeError(stmt.superclass.name, "Superclass must be a class")
 
-        self.environment.define(stmt.name.lexeme, None)
+        enclosing = self.environment
         if stmt.superclass != None:
             self.environment = Environment(self.environment)
             self.environment.define("super", superclass)
@@ -83,10 +167,10 @@ class Interpreter(ExprVisitor, StmtVisitor):
             methods[method.name.lexeme] = function
 
         klass: LoxCallable.LoxClass = LoxCallable.LoxClass(stmt.name.lexeme, superclass ,methods)
-        if superclass != None:
-            self.environment = self.environment.enclosing
+        self.environment = enclosing
 
-        self.environment.assign(stmt.name, klass)
+        # nothing runs between declaring and assigning the name, so define it once done
+        self.environment.define(stmt.name.lexeme, klass)
 
     def visitVarStmt(self, stmt: Var):
         value = None
@@ -99,24 +183,34 @@ class Interpreter(ExprVisitor, StmtVisitor):
 
     def visitIfStmt(self, stmt: If):
         if isTruthy(self.evaluate(stmt.condition)):
-            self.execute(stmt.thenBranch)
+            return self.execute(stmt.thenBranch)
         elif stmt.elseBranch != None:
-            self.execute(stmt.elseBranch)
+            return self.execute(stmt.elseBranch)
 
     def visitWhileStmt(self, stmt: While):
         while isTruthy(self.evaluate( stmt.condition )):
-            try:
-                self.execute(stmt.body)
-            except pylox.LoxBreakIter:
-                break
-            except pylox.LoxContinueIter:
-                continue
+            completion = self.execute(stmt.body)
+            if completion is not None:
+                if completion.__class__ is not Token:
+                    return completion
+                if completion.type == TokenType.BREAK:
+                    break
+            if stmt.increment != None:
+                self.evaluate(stmt.increment)
 
     def visitStopiterStmt(self, stmt: StopIter):
-        if stmt.name.type == TokenType.BREAK:
-            raise pylox.LoxBreakIter(stmt.name, "Invalid: 'break' statement outside of loop")
-        # else
-        raise pylox.LoxContinueIter(stmt.name, "Invalid: 'continue' statement outside of loop")
+        return stmt.name
+
+    def visitImportStmt(self, stmt: Import):
+        module = Modules.loader.enter(stmt)
+        if module is None:
+            return None
+        for expr, depth, slot in module.resolved:
+            self.resolve(expr, depth, slot)
+        # imports are top level, this is the global environment
+        for statement in module.statements:
+            self.execute(statement)
+        return None
 
     def visitPrintStmt(self, stmt: Print):
         value = self.evaluate(stmt.expression)
@@ -128,32 +222,50 @@ class Interpreter(ExprVisitor, StmtVisitor):
         return None
 
     def visitReturnStmt(self, stmt: Return):
+        if stmt.value.__class__ is Call:
+            return self.tailCall(stmt.value)
         value = None
         if stmt.value != None:
             value = self.evaluate(stmt.value)
          
-        raise pylox.ReturnExep(value)
+        return (value,)
 
 # ----------- visiting expressions ------------
 
     def visitAssignExpr(self, expr: Assign):
         value = self.evaluate(expr.value)
-        
-        distance = self.locals.get(expr, None)
-        if distance != None:
-            self.environment.assignAt(distance, expr.name, value)
+
+        # a global that was assigned here before
+        cell = expr.cell
+        if cell is not None:
+            cell.value = value
+            return value
+
+        local = self.locals.get(expr, None)
+        if local != None:
+            self.environment.assignAt(local[0], local[1], value)
         else:
-            self.globals.assign(expr.name, value)
+            cell = expr.cell = self.globals.cell(expr.name)
+            cell.value = value
 
         return value
 
     def visitVariableExpr(self, expr: Variable):
-        return self.lookUpVariable(expr.name, expr)
+        # a global that was read here before, no dict lookups at all
+        cell = expr.cell
+        if cell is not None:
+            return cell.value
+
+        local = self.locals.get(expr, None)
+        if local != None:
+            return self.environment.getAt(local[0], local[1])
+        cell = expr.cell = self.globals.cell(expr.name)
+        return cell.value
     
     def lookUpVariable(self, name: Token, expr: Expr):
-        distance = self.locals.get(expr, None) # wont work
-        if distance != None:
-            return self.environment.getAt(distance, name.lexeme)
+        local = self.locals.get(expr, None)
+        if local != None:
+            return self.environment.getAt(local[0], local[1])
         else:
             return self.globals.get(name)
 
@@ -173,6 +285,16 @@ class Interpreter(ExprVisitor, StmtVisitor):
 
     def visitSetExpr(self, expr: Set):
         obj = self.evaluate(expr.obj)
+        if obj.__class__ is LoxCallable.LoxInstance:
+            value = self.evaluate(expr.value)
+            # the value can add fields to obj too, so its shape is read after it
+            entry = self.fieldEntry(expr, obj.shape)
+            if entry.__class__ is int:
+                obj.values[entry] = value
+            else:
+                obj.shape = entry
+                obj.values.append(value)
+            return value
         if not isinstance(obj, LoxCallable.LoxInstance):
             raise pylox.LoxRuntimeError(expr.name, 
             "Only instances have fields")
@@ -182,13 +304,18 @@ class Interpreter(ExprVisitor, StmtVisitor):
         return value
 
     def visitSuperExpr(self, expr: Super):
-        distance: int = self.locals[expr]
-        superclass: LoxCallable.LoxClass = self.environment.getAt(distance, "super")
-        obj: LoxCallable.LoxInstance = self.environment.getAt(distance - 1, "this")
-        method: LoxCallable.LoxFunction = superclass.findMethod(expr.method.lexeme)
+        obj, method = self.superMethod(expr)
+        return method.bind(obj)
+
+    def superMethod(self, expr: Super):
+        distance, slot = self.locals[expr]
+        superclass: LoxCallable.LoxClass = self.environment.getAt(distance, slot)
+        # "this" is the only slot of the scope just inside "super"
+        obj: LoxCallable.LoxInstance = self.environment.getAt(distance - 1, 0)
+        method: LoxCallable.LoxFunction = self.cachedMethod(expr, superclass, expr.method.lexeme)
         if method == None:
             raise pylox.LoxRuntimeError(expr.method, f"Undefined property '{expr.method.lexeme}.")
-        return method.bind(obj)
+        return obj, method
 
     def visitThisExpr(self, expr: This):
         return self.lookUpVariable(expr.keyword, expr)
@@ -198,7 +325,10 @@ class Interpreter(ExprVisitor, StmtVisitor):
 
     def visitUnaryExpr(self, expr: Unary):
         right = self.evaluate(expr.right)
-        
+        self.quickenUnary(expr, right)
+        return self.unaryOperation(expr, right)
+
+    def unaryOperation(self, expr: Unary, right):
         if expr.operator.type == TokenType.MINUS:
             checkNumberOperand(expr.operator, right)
             return -float(right)
@@ -210,7 +340,10 @@ class Interpreter(ExprVisitor, StmtVisitor):
     def visitBinaryExpr(self, expr: Binary):
         left = self.evaluate(expr.left)
         right = self.evaluate(expr.right)
+        self.quickenBinary(expr, left, right)
+        return self.binaryOperation(expr, left, right)
 
+    def binaryOperation(self, expr: Binary, left, right):
         if expr.operator.type == TokenType.MINUS:
             checkNumberOperands(expr.operator, left, right)
             return float(left) - float(right)
@@ -227,7 +360,8 @@ class Interpreter(ExprVisitor, StmtVisitor):
             # no implicit conversions here
             elif isinstance(right, str) and isinstance(left, str):
                 # same syntax in python xd
-                return str(left) + str(right)
+                text = left + right
+                return intern(text) if len(text) <= INTERN_LIMIT else text
             
             raise pylox.LoxRuntimeError(expr.operator, "Operands must be two number or two strings")
         
@@ -252,9 +386,165 @@ class Interpreter(ExprVisitor, StmtVisitor):
         #else - unreachable
         return None
 
+    # ---- quickening ----
+
+    def quickenBinary(self, expr: Binary, left, right):
+        # a node that deoptimized once stays generic
+        if expr.deoptimized:
+            return
+        op = numberOperators.get(expr.operator.type)
+        if op != None and left.__class__ is float and right.__class__ is float:
+            expr.op = op
+            expr.__class__ = NumberBinary
+            self.quickened += 1
+        elif expr.operator.type == TokenType.PLUS and left.__class__ is str and right.__class__ is str:
+            expr.__class__ = StringBinary
+            self.quickened += 1
+
+    def quickenUnary(self, expr: Unary, right):
+        if expr.deoptimized:
+            return
+        if expr.operator.type == TokenType.BANG:
+            expr.__class__ = NotUnary
+            self.quickened += 1
+        elif right.__class__ is float:
+            expr.__class__ = NegateUnary
+            self.quickened += 1
+
+    def deoptimize(self, expr: Expr, generic: type):
+        expr.__class__ = generic
+        expr.deoptimized = True
+        self.deoptimized += 1
+
+    def visitNumberBinaryExpr(self, expr: NumberBinary):
+        left = expr.left.accept(self)
+        right = expr.right.accept(self)
+        if left.__class__ is float and right.__class__ is float:
+            return expr.op(left, right)
+        # guard failed, the operands are already evaluated so finish generically
+        self.deoptimize(expr, Binary)
+        return self.binaryOperation(expr, left, right)
+
+    def visitStringBinaryExpr(self, expr: StringBinary):
+        left = expr.left.accept(self)
+        right = expr.right.accept(self)
+        if left.__class__ is str and right.__class__ is str:
+            text = left + right
+            return intern(text) if len(text) <= INTERN_LIMIT else text
+        self.deoptimize(expr, Binary)
+        return self.binaryOperation(expr, left, right)
+
+    def visitNegateUnaryExpr(self, expr: NegateUnary):
+        right = expr.right.accept(self)
+        if right.__class__ is float:
+            return -right
+        self.deoptimize(expr, Unary)
+        return self.unaryOperation(expr, right)
+
+    def visitNotUnaryExpr(self, expr: NotUnary):
+        right = expr.right.accept(self)
+        return right is None or right is False
+
+    # ---- inline caches ----
+
+    def cachedMethod(self, expr: Expr, klass: 'LoxCallable.LoxClass', name: str):
+        # per node {class: method}, methods of a class never change once it is created
+        cache = expr.cache
+        if cache is None:
+            cache = expr.cache = {}
+        method = cache.get(klass)
+        if method is None:
+            method = klass.findMethod(name)
+            if method is not None and len(cache) < INLINE_CACHE_SIZE:
+                cache[klass] = method
+        return method
+
+    def propertyEntry(self, expr: Get, obj: 'LoxCallable.LoxInstance'):
+        # per node {shape: field index or method}, a shape belongs to a single class
+        # and never changes, so the name means the same thing on every instance of it
+        cache = expr.cache
+        if cache is None:
+            cache = expr.cache = {}
+        shape = obj.shape
+        entry = cache.get(shape)
+        if entry is None:
+            entry = shape.slots.get(expr.name.lexeme)
+            if entry is None:
+                entry = obj.klass.findMethod(expr.name.lexeme)
+            if entry is not None and len(cache) < INLINE_CACHE_SIZE:
+                cache[shape] = entry
+        return entry
+
+    def fieldEntry(self, expr: Set, shape: 'LoxCallable.Shape'):
+        # per node {shape: field index or the shape after adding the field}
+        cache = expr.cache
+        if cache is None:
+            cache = expr.cache = {}
+        entry = cache.get(shape)
+        if entry is None:
+            entry = shape.slots.get(expr.name.lexeme)
+            if entry is None:
+                entry = shape.withField(expr.name.lexeme)
+            if len(cache) < INLINE_CACHE_SIZE:
+                cache[shape] = entry
+        return entry
+
+    def invokeMethod(self, expr: Call, obj: 'LoxCallable.LoxInstance', method: 'LoxCallable.LoxFunction'):
+        # a method called right where it is looked up never needs a bound LoxFunction
+        arguments = self.functionArguments(expr, method)
+        if self.callDepth >= self.maxCallDepth:
+            raise pylox.LoxRuntimeError(expr.paren, "Stack overflow.")
+        return method.invoke(self, obj, arguments)
+
+    def functionArguments(self, expr: Call, function: 'LoxCallable.LoxFunction'):
+        # no depth check here, a tail call takes the place of the running call
+        arguments = []
+        for arg in expr.arguments:
+            arguments.append( self.evaluate(arg))
+        if len(arguments) != function.arity():
+            raise pylox.LoxRuntimeError(expr.paren, f"Exprcted {function.arity()} arguments but got {len(arguments)}.")
+        return arguments
+
+    def tailCall(self, expr: Call):
+        # visitCallExpr for 'return f(x);', a lox function or method is not called
+        # here but handed back to the trampoline in LoxFunction.callIn
+        calleeExpr = expr.callee
+        if calleeExpr.__class__ is Get:
+            obj = self.evaluate(calleeExpr.object)
+            if obj.__class__ is LoxCallable.LoxInstance:
+                method = self.propertyEntry(calleeExpr, obj)
+                if method.__class__ is LoxCallable.LoxFunction:
+                    arguments = self.functionArguments(expr, method)
+                    return TailCall(method, method.thisEnvironment(obj), arguments)
+            callee = self.getProperty(calleeExpr, obj)
+        elif calleeExpr.__class__ is Super:
+            obj, method = self.superMethod(calleeExpr)
+            arguments = self.functionArguments(expr, method)
+            return TailCall(method, method.thisEnvironment(obj), arguments)
+        else:
+            callee = self.evaluate( calleeExpr )
+
+        if callee.__class__ is LoxCallable.LoxFunction or callee.__class__ is LoxCallable.LoxLambda:
+            return TailCall(callee, callee.closure, self.functionArguments(expr, callee))
+        return (self.callValue(expr, callee),)
+
     def visitCallExpr(self, expr: Call):
-        callee = self.evaluate( expr.callee )
+        calleeExpr = expr.callee
+        if calleeExpr.__class__ is Get:
+            obj = self.evaluate(calleeExpr.object)
+            if obj.__class__ is LoxCallable.LoxInstance:
+                method = self.propertyEntry(calleeExpr, obj)
+                if method.__class__ is LoxCallable.LoxFunction:
+                    return self.invokeMethod(expr, obj, method)
+            callee = self.getProperty(calleeExpr, obj)
+        elif calleeExpr.__class__ is Super:
+            obj, method = self.superMethod(calleeExpr)
+            return self.invokeMethod(expr, obj, method)
+        else:
+            callee = self.evaluate( calleeExpr )
+        return self.callValue(expr, callee)
 
+    def callValue(self, expr: Call, callee):
         arguments: 'list[Expr]' = []
         for arg in expr.arguments:
             arguments.append( self.evaluate(arg))
@@ -264,6 +554,8 @@ class Interpreter(ExprVisitor, StmtVisitor):
         function: LoxCallable.LoxCallable = callee
         if len(arguments) != function.arity():
             raise pylox.LoxRuntimeError(expr.paren, f"Exprcted {function.arity()} arguments but got {len(arguments)}.")
+        if self.callDepth >= self.maxCallDepth:
+            raise pylox.LoxRuntimeError(expr.paren, "Stack overflow.")
 
         # for native functions throwing errors    
         try:
@@ -272,12 +564,49 @@ class Interpreter(ExprVisitor, StmtVisitor):
             raise pylox.LoxRuntimeError(expr.paren, err.mess)
     
     def visitGetExpr(self, expr: Get):
-        obj = self.evaluate(expr.object)
+        return self.getProperty(expr, self.evaluate(expr.object))
+
+    def getProperty(self, expr: Get, obj):
+        if obj.__class__ is LoxCallable.LoxInstance:
+            entry = self.propertyEntry(expr, obj)
+            if entry.__class__ is int:
+                return obj.values[entry]
+            if entry is not None:
+                return entry.bind(obj)
+            raise pylox.LoxRuntimeError(expr.name, f"Undefined property '{expr.name.lexeme}'.")
         if isinstance(obj, LoxCallable.LoxInstance):
             return obj.get(expr.name)
         
         raise pylox.LoxRuntimeError(expr.name, "Only instances have properties.")
 
+    def visitIndexExpr(self, expr: Index):
+        obj = self.evaluate(expr.object)
+        index = self.evaluate(expr.index)
+        # straight to the python list, nothing is looked up or bound
+        if obj.__class__ is LoxCallable.LoxListInstance:
+            items = obj.list
+            if index.__class__ is float and index.is_integer() and -len(items) <= index < len(items):
+                return items[int(index)]
+        # f64arrays, and the errors
+        try:
+            return LoxCallable.getIndex(obj, index)
+        except pylox.NativeFuncError as err:
+            raise pylox.LoxRuntimeError(expr.bracket, err.mess)
+
+    def visitSetindexExpr(self, expr: SetIndex):
+        obj = self.evaluate(expr.object)
+        index = self.evaluate(expr.index)
+        value = self.evaluate(expr.value)
+        if obj.__class__ is LoxCallable.LoxListInstance:
+            items = obj.list
+            if index.__class__ is float and index.is_integer() and -len(items) <= index < len(items):
+                items[int(index)] = value
+                return value
+        try:
+            return LoxCallable.setIndex(obj, index, value)
+        except pylox.NativeFuncError as err:
+            raise pylox.LoxRuntimeError(expr.bracket, err.mess)
+
 
     def visitLambdaExpr(self, expr: Lambda):
         function: LoxCallable.LoxFunction = LoxCallable.LoxLambda(expr, self.environment)
@@ -289,7 +618,9 @@ class Interpreter(ExprVisitor, StmtVisitor):
         try:
             self.environment = environment
             for statement in statements:
-                self.execute(statement)
+                completion = self.execute(statement)
+                if completion is not None:
+                    return completion
         
         finally:
             self.environment = previous
@@ -302,5 +633,9 @@ class Interpreter(ExprVisitor, StmtVisitor):
     def execute(self, stms: Stmt):
         return stms.accept(self)
 
-    def resolve(self, expr:Expr, depth):
-        self.locals[expr] = depth # wont work
+    def resolve(self, expr:Expr, depth, slot):
+        self.locals[expr] = (depth, slot)
+
+    def unresolve(self, expr:Expr):
+        # expr's tree is gone, Incremental dropped a declaration
+        self.locals.pop(expr, None)
@@ -0,0 +1,93 @@
+""" __loxcache__, scanned, parsed and resolved programs kept on disk like __pycache__
+
+    __loxcache__/script.pylox-N.pickle next to script.lox (script.pylox-N.opt.pickle
+    with -O) holds a checksum of the source it was made from, then the statements and
+    every resolve() the Resolver made.
+"""
+import gc
+import os
+import pickle
+import zlib
+
+# bump when the AST classes or what the Resolver records change
+CACHE_VERSION = 9
+CACHE_DIR = "__loxcache__"
+
+
+class ResolveRecorder:
+    # stands in for the interpreter while resolving, keeps what the Resolver tells it,
+    # with no interpreter it only keeps it (modules are resolved before anything runs them)
+    def __init__(self, interpreter) -> None:
+        self.interpreter = interpreter
+        self.resolved: 'list[tuple]' = []
+
+    def resolve(self, expr, depth, slot):
+        self.resolved.append((expr, depth, slot))
+        if self.interpreter is not None:
+            self.interpreter.resolve(expr, depth, slot)
+
+
+def cachePath(path: str, optimize: bool) -> str:
+    # -O programs are different trees, so they get their own entry
+    directory, name = os.path.split(os.path.abspath(path))
+    stem = os.path.splitext(name)[0]
+    opt = ".opt" if optimize else ""
+    return os.path.join(directory, CACHE_DIR, f"{stem}.pylox-{CACHE_VERSION}{opt}.pickle")
+
+
+def sourceKey(source: str) -> str:
+    # only tells an entry from the source it was made from, like the mtime and size
+    # in a .pyc. zlib is much quicker to import than hashlib's openssl
+    data = source.encode()
+    return f"{len(data)}-{zlib.crc32(data):08x}-{zlib.adler32(data):08x}"
+
+
+def load(path: str, optimize: bool, key: str):
+    # (statements, resolved) cached for path, None when missing, stale or unreadable
+    # unpickling a big tree is mostly allocation, without this the
+    # garbage collector keeps walking the part of it that is already loaded
+    gc.disable()
+    try:
+        with open(cachePath(path, optimize), "rb") as infile:
+            if pickle.load(infile) != key:
+                return None
+            program = pickle.load(infile)
+        # the tree is kept until the script ends, the collector has nothing to find in it
+        gc.freeze()
+        return program
+    except Exception:
+        # a broken entry is only a cache miss, it is written again
+        return None
+    finally:
+        gc.enable()
+
+
+def store(path: str, optimize: bool, key: str, program: tuple):
+    # written to a temporary file first, so a reader never sees half an entry
+    import tempfile
+    target = cachePath(path, optimize)
+    try:
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        fd, temp = tempfile.mkstemp(dir=os.path.dirname(target), suffix=".tmp")
+    except OSError:
+        # no cache where the script can not be written next to
+        return
+    # same as load, pickling allocates a lot of garbage free memo entries
+    gc.disable()
+    try:
+        with os.fdopen(fd, "wb") as outfile:
+            pickle.dump(key, outfile, pickle.HIGHEST_PROTOCOL)
+            pickle.dump(program, outfile, pickle.HIGHEST_PROTOCOL)
+        os.replace(temp, target)
+        temp = None
+    except Exception:
+        # like load, the cache never stops a run: a tree too deep to pickle, a
+        # node that can not be pickled or a full disk only means no entry
+        pass
+    finally:
+        gc.enable()
+        if temp is not None:
+            try:
+                os.unlink(temp)
+            except OSError:
+                pass
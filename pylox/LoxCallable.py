@@ -1,17 +1,14 @@
-import time
-
 from Expr import Literal, Lambda
 import Interpreter
 from Token import Token
 from Stmt import Function
 import Environment
 import pylox
-
-class LoxCallable:
-    def call(self, interpreter: 'Interpreter.Interpreter', arguments):
-        pass
-    def arity(self) -> int:
-        pass
+# the natives live in LoxNatives, which pylox build modules use without the interpreter
+from LoxNatives import (LoxCallable, Shape, LoxInstance, clock, loxInput, loxToNum,
+    LoxList, LoxListInstance, ListMethod, listMethods, indexError, getIndex, setIndex, elements,
+    F64Array, LoxF64Array, f64Methods, LoxMap, LoxMapInstance, mapKey, loxKey, mapMethods,
+    StringBuilder, LoxStringBuilder, builderMethods)
 
 class LoxFunction(LoxCallable):
     def __init__(self, declatration: Function, closure: 'Environment.Environment', isInitializer: bool = False) -> None:
@@ -20,21 +17,41 @@ class LoxFunction(LoxCallable):
         self.isInitializer = isInitializer
 
     def call(self, interpreter: 'Interpreter.Interpreter', arguments):
-        enviorment = Environment.Environment(self.closure)
+        return self.callIn(interpreter, self.closure, arguments)
+
+    def invoke(self, interpreter: 'Interpreter.Interpreter', instance: 'LoxInstance', arguments):
+        # bind(instance).call(...) without creating the bound LoxFunction
+        return self.callIn(interpreter, self.thisEnvironment(instance), arguments)
 
-        for param, arg in zip(self.declatration.params, arguments):
-            enviorment.define( param.lexeme, arg)
+    def thisEnvironment(self, instance: 'LoxInstance'):
+        this = Environment.Environment(self.closure)
+        this.values.append(instance)
+        return this
 
+    def callIn(self, interpreter: 'Interpreter.Interpreter', closure: 'Environment.Environment', arguments):
+        function = self
+        interpreter.callDepth += 1
         try:
-            interpreter.executeBlock(self.declatration.body, enviorment)
-        except pylox.ReturnExep as ex:
-            if self.isInitializer:
-                return self.closure.getAt(0, "this")
-            return ex.value
-        
-        if self.isInitializer:
-            return self.closure.getAt(0, "this")
-        return None
+            # trampoline, a tail call replaces the function running in this python frame
+            while True:
+                enviorment = Environment.Environment(closure)
+                # parameters are the first slots, the argument list is built fresh by every call site
+                enviorment.values = arguments
+
+                completion = interpreter.executeBlock(function.declatration.body, enviorment)
+                if completion.__class__ is not Interpreter.TailCall:
+                    break
+                function = completion.function
+                closure = completion.closure
+                arguments = completion.arguments
+        finally:
+            interpreter.callDepth -= 1
+
+        if function.isInitializer:
+            return closure.getAt(0, 0)
+        if completion is None:
+            return None
+        return completion[0]
 
     def arity(self) -> int:
         return len(self.declatration.params)
@@ -48,23 +65,10 @@ class LoxFunction(LoxCallable):
         return f"fn < {self.declaration.name.lexme}>"
 
 
-class LoxLambda(LoxCallable):
+class LoxLambda(LoxFunction):
+    # called like a function, through callIn's depth count and tail call trampoline
     def __init__(self, declatration: Lambda, closure: 'Environment.Environment') -> None:
-        self.declatration = declatration
-        self.closure = closure
-
-    def call(self, interpreter: 'Interpreter.Interpreter', arguments):
-        enviorment = Environment.Environment(self.closure)
-
-        for param, arg in zip(self.declatration.params, arguments):
-            enviorment.define( param.lexeme, arg)
-
-        try:
-            interpreter.executeBlock(self.declatration.body, enviorment)
-        except pylox.ReturnExep as ex:
-            return ex.value
-        
-        return None
+        super().__init__(declatration, closure)
 
     def arity(self) -> int:
         return len(self.declatration.params)
@@ -78,12 +82,14 @@ class LoxClass(LoxCallable):
         self.name = name
         self.superclass = superclass
         self.methods = methods
+        # every instance starts with no fields, shapes branch off from here
+        self.shape = Shape()
     
     def call(self, interpreter: 'Interpreter.Interpreter', arguments):
         instance = LoxInstance(self)
         initializer: LoxFunction = self.findMethod("init")
         if initializer != None:
-            initializer.bind(instance).call(interpreter, arguments)
+            initializer.invoke(interpreter, instance, arguments)
         return instance
     
     def findMethod(self, name: str):
@@ -102,165 +108,3 @@ class LoxClass(LoxCallable):
 
     def __str__(self) -> str:
         return self.name
-
-
-# ---- loxIntance class (didnt bother with new file) ---
-class LoxInstance():
-    def __init__(self, klass: LoxClass) -> None:
-        self.klass = klass
-        self.fields = {}
-
-    def get(self, name: Token):
-        if name.lexeme in self.fields:
-            return self.fields[name.lexeme]
-        method: LoxFunction = self.klass.findMethod(name.lexeme)
-        if method != None:
-            return method.bind(self)
-        
-        raise pylox.LoxRuntimeError(name, f"Undefined property '{name.lexeme}'.")
-
-
-    def set(self, name: Token, value):
-        self.fields[name.lexeme] = value
-
-    def __str__(self) -> str:
-        return self.klass.name + " instance"
-
-
-# ---- native functions -----
-
-class clock(LoxCallable):
-    def arity(self) -> int:
-        return 0
-
-    def call(self, interpreter: 'Interpreter.Interpreter', arguments):
-        return time.time()
-
-    def __str__(self) -> str:
-        return "<native fn>"
-
-class loxInput(LoxCallable):
-    def arity(self) -> int:
-        return 0
-    
-    def call(self, interpreter: 'Interpreter.Interpreter', arguments):
-        return input()
-
-    def __str__(self) -> str:
-        return "<native fn>"
-
-
-# ------ lists ---------   
-class LoxList(LoxCallable):
-    def call(self, interpreter: 'Interpreter.Interpreter', arguments):
-        return LoxListInstance()
-
-    def arity(self) -> int:
-        return 0
-
-    def __str__(self) -> str:
-        return "<class 'list'>"
-
-class LoxListInstance(LoxInstance):
-    def __init__(self) -> None:
-        self.list = []
-
-    def get(self, name: Token):
-        if name.lexeme == "insert":
-            return ListInsert(self, name)
-        elif name.lexeme == "get":
-            return listGet(self, name)
-        elif name.lexeme == "append":
-            return listAppend(self, name)
-        elif name.lexeme == "len":
-            return listLen(self, name)
-
-        raise pylox.LoxRuntimeError(name, f"Undefined ''''''''list'''''''' property '{name.lexeme}'.")
-
-    def set(self, name: Token, value):
-        raise pylox.LoxRuntimeError(name, "Can't set properties to built-in 'list' class")
-
-    def __str__(self) -> str:
-        return self.list.__str__()
-
-# suport list classes
-class ListInsert(LoxFunction):
-    def __init__(self, mother_list, name:Token) -> None:
-        self.this = mother_list
-        self.name = name
-
-    def arity(self) -> int:
-        return 2
-
-    def call(self, interpreter: 'Interpreter.Interpreter', arguments):
-        position = arguments[0]
-        value = arguments[1]
-        if not isinstance(position, float) or not position.is_integer():
-            raise pylox.LoxRuntimeError(self.name, "List index must be an intiger")
-        
-        return self.this.list.insert(int(position), value)
-
-    def __str__(self) -> str:
-        return "<native fn>"
-
-class listGet(LoxFunction):
-    def __init__(self, mother_list, name:Token) -> None:
-        self.this = mother_list
-        self.name = name
-
-    def arity(self) -> int:
-        return 1
-
-    def call(self, interpreter: 'Interpreter.Interpreter', arguments):
-        position = arguments[0]
-        if not isinstance(position, float) or not position.is_integer():
-            raise pylox.LoxRuntimeError(self.name, "List index must be an intiger")
-        
-        return self.this.list[int(position)]
-
-    def __str__(self) -> str:
-        return "<native fn>"
-
-class listAppend(LoxFunction):
-    def __init__(self, mother_list, name:Token) -> None:
-        self.this = mother_list
-        self.name = name
-
-    def arity(self) -> int:
-        return 1
-
-    def call(self, interpreter: 'Interpreter.Interpreter', arguments):
-        value = arguments[0]
-        return self.this.list.append(value)
-
-    def __str__(self) -> str:
-        return "<native fn>"
-
-class listLen(LoxFunction):
-    def __init__(self, mother_list: LoxListInstance, name:Token) -> None:
-        self.this = mother_list
-        self.name = name
-
-    def arity(self) -> int:
-        return 0
-
-    def call(self, interpreter: 'Interpreter.Interpreter', arguments):
-        return len(self.this.list)
-
-    def __str__(self) -> str:
-        return "<native fn>"
-
-# ------ end of list stuff -------
-
-class loxToNum(LoxCallable):
-    def arity(self) -> int:
-        return 1
-
-    def call(self, interpreter: 'Interpreter.Interpreter', arguments):
-        try:
-            return float(arguments[0])
-        except ValueError:
-            raise pylox.NativeFuncError("'num' argument must be a number")
-            
-    def __str__(self) -> str:
-        return "<native fn>"
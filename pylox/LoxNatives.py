@@ -0,0 +1,512 @@
+""" native functions and the built-in list, f64array, map and StringBuilder classes,
+    the base classes they share with lox functions and instances, and the runtime
+    errors. nothing here imports the interpreter, so pylox build modules ship it
+    next to LoxRuntime.py """
+import io
+import time
+from array import array
+from sys import intern
+
+class LoxRuntimeError(RuntimeError):
+    def __init__(self, token: 'Token', mess:str) -> None:
+        self.token = token
+        self.mess = mess 
+        
+class NativeFuncError(LoxRuntimeError):
+    def __init__(self, mess: str) -> None:
+        self.mess = mess
+
+
+def stringify(s) -> str:
+    if s is None:
+        return "nil"
+    elif isinstance(s, float):
+        txt = str(s)
+        if txt.endswith(".0"):
+            return txt[0:-2:]
+        return txt
+
+    return str(s)
+
+# strings made while running (+, input(), StringBuilder.toString()) up to this long are
+# interned, like the scanners' names and string literals. equal short strings are then
+# one object, and == and dict lookups (map keys, names) stop at python's identity check.
+# longer ones are left alone, they are rarely compared and the lookup is not free
+INTERN_LIMIT = 64
+
+def internShort(text: str) -> str:
+    # the hot + paths do the same inline
+    return intern(text) if len(text) <= INTERN_LIMIT else text
+
+
+class LoxCallable:
+    def call(self, interpreter: 'Interpreter.Interpreter', arguments):
+        pass
+    def arity(self) -> int:
+        pass
+
+# ---- shapes ----
+class Shape():
+    # field layout of instances, field name -> index in LoxInstance.values.
+    # instances of a class that add the same fields in the same order share
+    # shapes, adding a field moves an instance along a transition
+    __slots__ = ("slots", "transitions")
+
+    def __init__(self, slots: 'dict[str, int]' = None) -> None:
+        self.slots = {} if slots is None else slots
+        self.transitions: 'dict[str, Shape]' = {}
+
+    def withField(self, name: str) -> 'Shape':
+        shape = self.transitions.get(name)
+        if shape is None:
+            slots = dict(self.slots)
+            slots[name] = len(slots)
+            shape = self.transitions[name] = Shape(slots)
+        return shape
+
+
+# ---- loxIntance class ---
+class LoxInstance():
+    __slots__ = ("klass", "shape", "values")
+
+    def __init__(self, klass: 'LoxCallable.LoxClass') -> None:
+        self.klass = klass
+        self.shape = klass.shape
+        self.values = []
+
+    def get(self, name: 'Token'):
+        index = self.shape.slots.get(name.lexeme)
+        if index is not None:
+            return self.values[index]
+        method = self.klass.findMethod(name.lexeme)
+        if method != None:
+            return method.bind(self)
+        
+        raise LoxRuntimeError(name, f"Undefined property '{name.lexeme}'.")
+
+
+    def set(self, name: 'Token', value):
+        index = self.shape.slots.get(name.lexeme)
+        if index is not None:
+            self.values[index] = value
+            return
+        self.shape = self.shape.withField(name.lexeme)
+        self.values.append(value)
+
+    def __str__(self) -> str:
+        return self.klass.name + " instance"
+
+
+# ---- native functions -----
+
+class clock(LoxCallable):
+    def arity(self) -> int:
+        return 0
+
+    def call(self, interpreter: 'Interpreter.Interpreter', arguments):
+        return time.time()
+
+    def __str__(self) -> str:
+        return "<native fn>"
+
+class loxInput(LoxCallable):
+    def arity(self) -> int:
+        return 0
+    
+    def call(self, interpreter: 'Interpreter.Interpreter', arguments):
+        return internShort(input())
+
+    def __str__(self) -> str:
+        return "<native fn>"
+
+
+# ------ lists ---------   
+class LoxList(LoxCallable):
+    def call(self, interpreter: 'Interpreter.Interpreter', arguments):
+        return LoxListInstance()
+
+    def arity(self) -> int:
+        return 0
+
+    def __str__(self) -> str:
+        return "<class 'list'>"
+
+class LoxListInstance(LoxInstance):
+    __slots__ = ("list", "methods")
+
+    def __init__(self) -> None:
+        self.list = []
+        # name -> ListMethod, bound the first time the method is looked up
+        self.methods = None
+
+    def get(self, name: 'Token'):
+        methods = self.methods
+        if methods is None:
+            methods = self.methods = {}
+        method = methods.get(name.lexeme)
+        if method is None:
+            entry = listMethods.get(name.lexeme)
+            if entry is None:
+                raise LoxRuntimeError(name, f"Undefined ''''''''list'''''''' property '{name.lexeme}'.")
+            method = methods[name.lexeme] = ListMethod(self.list, *entry)
+        return method
+
+    def set(self, name: 'Token', value):
+        raise LoxRuntimeError(name, "Can't set properties to built-in 'list' class")
+
+    def __str__(self) -> str:
+        return self.list.__str__()
+
+# suport list classes
+class ListMethod(LoxCallable):
+    # a list (or f64array) method bound to the elements of its instance, kept by the
+    # instance, so looking a method up again does not allocate. errors are
+    # NativeFuncErrors, every call site reports them at its own line
+    __slots__ = ("items", "function", "params")
+
+    def __init__(self, items, function, params: int) -> None:
+        self.items = items
+        self.function = function
+        self.params = params
+
+    def arity(self) -> int:
+        return self.params
+
+    def call(self, interpreter: 'Interpreter.Interpreter', arguments):
+        return self.function(self.items, arguments)
+
+    def __str__(self) -> str:
+        return "<native fn>"
+
+def listInsert(items: list, arguments):
+    position = arguments[0]
+    if not isinstance(position, float) or not position.is_integer():
+        raise NativeFuncError("List index must be an intiger")
+    return items.insert(int(position), arguments[1])
+
+def listGet(items: list, arguments):
+    position = arguments[0]
+    if position.__class__ is float and position.is_integer() and -len(items) <= position < len(items):
+        return items[int(position)]
+    raise NativeFuncError(indexError(position))
+
+def listAppend(items: list, arguments):
+    return items.append(arguments[0])
+
+def listLen(items: list, arguments):
+    # a lox number, so it can be compared and added to
+    return float(len(items))
+
+# name -> (function, arity)
+listMethods = {
+    "insert": (listInsert, 2),
+    "get": (listGet, 1),
+    "append": (listAppend, 1),
+    "len": (listLen, 0),
+}
+
+def indexError(position) -> str:
+    # why a list has no element at position, for xs[i], xs[i] = v and xs.get(i)
+    if not isinstance(position, float) or not position.is_integer():
+        return "List index must be an intiger"
+    return "List index out of range."
+
+# xs[i] and xs[i] = v for whatever the backends do not handle inline (only lists
+# are), the backends turn the NativeFuncErrors into runtime errors at the '['
+def getIndex(obj, index):
+    items = elements(obj)
+    if index.__class__ is float and index.is_integer() and -len(items) <= index < len(items):
+        return items[int(index)]
+    raise NativeFuncError(indexError(index))
+
+def setIndex(obj, index, value):
+    items = elements(obj)
+    if index.__class__ is float and index.is_integer() and -len(items) <= index < len(items):
+        if obj.__class__ is LoxF64Array and value.__class__ is not float:
+            raise NativeFuncError("f64array elements must be numbers.")
+        items[int(index)] = value
+        return value
+    raise NativeFuncError(indexError(index))
+
+def elements(obj):
+    if obj.__class__ is LoxListInstance:
+        return obj.list
+    if obj.__class__ is LoxF64Array:
+        return obj.view
+    raise NativeFuncError("Only lists and arrays can be indexed.")
+
+# ------ end of list stuff -------
+
+# ------ f64 arrays ---------
+# a fixed number of lox numbers unboxed in an array('d'), 8 bytes each.
+# an instance holds a memoryview of it, slice() makes one sharing the same memory
+class F64Array(LoxCallable):
+    def call(self, interpreter: 'Interpreter.Interpreter', arguments):
+        size = arguments[0]
+        if not isinstance(size, float) or not size.is_integer() or size < 0:
+            raise NativeFuncError("f64array size must be a whole number.")
+        # repeating one zero allocates the n * 8 bytes once, nothing on the way
+        return LoxF64Array(memoryview(array('d', [0.0]) * int(size)))
+
+    def arity(self) -> int:
+        return 1
+
+    def __str__(self) -> str:
+        return "<class 'f64array'>"
+
+class LoxF64Array(LoxInstance):
+    __slots__ = ("view", "methods")
+
+    def __init__(self, view: memoryview) -> None:
+        self.view = view
+        # name -> ListMethod, like a list's
+        self.methods = None
+
+    def get(self, name: 'Token'):
+        methods = self.methods
+        if methods is None:
+            methods = self.methods = {}
+        method = methods.get(name.lexeme)
+        if method is None:
+            entry = f64Methods.get(name.lexeme)
+            if entry is None:
+                raise LoxRuntimeError(name, f"Undefined 'f64array' property '{name.lexeme}'.")
+            method = methods[name.lexeme] = ListMethod(self.view, *entry)
+        return method
+
+    def set(self, name: 'Token', value):
+        raise LoxRuntimeError(name, "Can't set properties to built-in 'f64array' class")
+
+    def __str__(self) -> str:
+        return self.view.tolist().__str__()
+
+def f64Range(view: memoryview, start, end) -> memoryview:
+    # view[start:end], a view of the same memory
+    if not (isinstance(start, float) and isinstance(end, float) and start.is_integer() and end.is_integer()):
+        raise NativeFuncError("f64array bounds must be whole numbers.")
+    if not 0 <= start <= end <= len(view):
+        raise NativeFuncError("f64array bounds out of range.")
+    return view[int(start):int(end)]
+
+def f64Len(view: memoryview, arguments):
+    return float(len(view))
+
+def f64Fill(view: memoryview, arguments):
+    # fill(value, start, end): the first element is set, then the filled part is
+    # copied after itself, doubling, memmoves with no temporary array
+    value = arguments[0]
+    if value.__class__ is not float:
+        raise NativeFuncError("f64array elements must be numbers.")
+    part = f64Range(view, arguments[1], arguments[2])
+    if len(part):
+        part[0] = value
+        filled = 1
+        while filled < len(part):
+            step = min(filled, len(part) - filled)
+            part[filled:filled + step] = part[:step]
+            filled += step
+    return None
+
+def f64Copy(view: memoryview, arguments):
+    # copy(start, source, sourceStart, count), overlapping ranges copy like memmove
+    start, source, sourceStart, count = arguments
+    if source.__class__ is not LoxF64Array:
+        raise NativeFuncError("f64array copy source must be an f64array.")
+    if not (isinstance(start, float) and isinstance(sourceStart, float) and isinstance(count, float)):
+        raise NativeFuncError("f64array bounds must be whole numbers.")
+    f64Range(view, start, start + count)[:] = f64Range(source.view, sourceStart, sourceStart + count)
+    return None
+
+def f64Slice(view: memoryview, arguments):
+    # slice(start, end), an f64array sharing the elements, nothing is copied
+    return LoxF64Array(f64Range(view, arguments[0], arguments[1]))
+
+# name -> (function, arity)
+f64Methods = {
+    "len": (f64Len, 0),
+    "fill": (f64Fill, 3),
+    "copy": (f64Copy, 4),
+    "slice": (f64Slice, 2),
+}
+
+# ------ end of f64 arrays -------
+
+# ------ maps ---------
+# a python dict keyed by numbers, strings, booleans and nil
+class LoxMap(LoxCallable):
+    def call(self, interpreter: 'Interpreter.Interpreter', arguments):
+        return LoxMapInstance()
+
+    def arity(self) -> int:
+        return 0
+
+    def __str__(self) -> str:
+        return "<class 'map'>"
+
+class LoxMapInstance(LoxInstance):
+    __slots__ = ("map", "methods")
+
+    def __init__(self) -> None:
+        self.map = {}
+        # name -> ListMethod, like a list's
+        self.methods = None
+
+    def get(self, name: 'Token'):
+        methods = self.methods
+        if methods is None:
+            methods = self.methods = {}
+        method = methods.get(name.lexeme)
+        if method is None:
+            entry = mapMethods.get(name.lexeme)
+            if entry is None:
+                raise LoxRuntimeError(name, f"Undefined 'map' property '{name.lexeme}'.")
+            method = methods[name.lexeme] = ListMethod(self.map, *entry)
+        return method
+
+    def set(self, name: 'Token', value):
+        raise LoxRuntimeError(name, "Can't set properties to built-in 'map' class")
+
+    def __str__(self) -> str:
+        # keys and values shown the way print shows them
+        return "{" + ", ".join(f"{stringify(loxKey(key))}: {stringify(value)}" for key, value in self.map.items()) + "}"
+
+# true == 1 for python, so the booleans are keyed by their own objects
+trueKey = object()
+falseKey = object()
+
+def mapKey(key):
+    cls = key.__class__
+    if cls is float or cls is str or key is None:
+        return key
+    if cls is bool:
+        return trueKey if key else falseKey
+    raise NativeFuncError("Map keys must be numbers, strings, booleans or nil.")
+
+def loxKey(key):
+    if key is trueKey:
+        return True
+    if key is falseKey:
+        return False
+    return key
+
+def mapGet(items: dict, arguments):
+    # nil for a missing key, has() tells it from a nil value
+    return items.get(mapKey(arguments[0]))
+
+def mapSet(items: dict, arguments):
+    items[mapKey(arguments[0])] = arguments[1]
+    return None
+
+def mapHas(items: dict, arguments):
+    return mapKey(arguments[0]) in items
+
+def mapDelete(items: dict, arguments):
+    # whether there was such a key
+    key = mapKey(arguments[0])
+    if key in items:
+        del items[key]
+        return True
+    return False
+
+def mapLen(items: dict, arguments):
+    return float(len(items))
+
+def mapKeys(items: dict, arguments):
+    # a new list, in the order the keys were first set
+    keys = LoxListInstance()
+    keys.list = [loxKey(key) for key in items]
+    return keys
+
+# name -> (function, arity)
+mapMethods = {
+    "get": (mapGet, 1),
+    "set": (mapSet, 2),
+    "has": (mapHas, 1),
+    "delete": (mapDelete, 1),
+    "len": (mapLen, 0),
+    "keys": (mapKeys, 0),
+}
+
+# ------ end of maps -------
+
+# ------ string builders ---------
+# a + b copies both strings, so a loop growing a string with + is quadratic in its
+# length. a builder appends to an io.StringIO, amortized linear, and only makes the
+# string when asked for it
+class StringBuilder(LoxCallable):
+    def call(self, interpreter: 'Interpreter.Interpreter', arguments):
+        return LoxStringBuilder()
+
+    def arity(self) -> int:
+        return 0
+
+    def __str__(self) -> str:
+        return "<class 'StringBuilder'>"
+
+class LoxStringBuilder(LoxInstance):
+    __slots__ = ("buffer", "methods")
+
+    def __init__(self) -> None:
+        self.buffer = io.StringIO()
+        # name -> ListMethod, like a list's
+        self.methods = None
+
+    def get(self, name: 'Token'):
+        methods = self.methods
+        if methods is None:
+            methods = self.methods = {}
+        method = methods.get(name.lexeme)
+        if method is None:
+            entry = builderMethods.get(name.lexeme)
+            if entry is None:
+                raise LoxRuntimeError(name, f"Undefined 'StringBuilder' property '{name.lexeme}'.")
+            method = methods[name.lexeme] = ListMethod(self.buffer, *entry)
+        return method
+
+    def set(self, name: 'Token', value):
+        raise LoxRuntimeError(name, "Can't set properties to built-in 'StringBuilder' class")
+
+    def __str__(self) -> str:
+        # printing a builder prints what it has built
+        return self.buffer.getvalue()
+
+def builderAppend(buffer: io.StringIO, arguments):
+    # anything else is appended the way print would show it
+    value = arguments[0]
+    buffer.write(value if value.__class__ is str else stringify(value))
+    return None
+
+def builderToString(buffer: io.StringIO, arguments):
+    return internShort(buffer.getvalue())
+
+def builderLen(buffer: io.StringIO, arguments):
+    # only ever written at the end, the position is the length
+    return float(buffer.tell())
+
+def builderClear(buffer: io.StringIO, arguments):
+    buffer.seek(0)
+    buffer.truncate()
+    return None
+
+# name -> (function, arity)
+builderMethods = {
+    "append": (builderAppend, 1),
+    "toString": (builderToString, 0),
+    "len": (builderLen, 0),
+    "clear": (builderClear, 0),
+}
+
+# ------ end of string builders -------
+
+class loxToNum(LoxCallable):
+    def arity(self) -> int:
+        return 1
+
+    def call(self, interpreter: 'Interpreter.Interpreter', arguments):
+        try:
+            return float(arguments[0])
+        except ValueError:
+            raise NativeFuncError("'num' argument must be a number")
+            
+    def __str__(self) -> str:
+        return "<native fn>"
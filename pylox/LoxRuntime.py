@@ -0,0 +1,265 @@
+""" runtime shim for python modules generated by Transpiler.py (pylox build),
+    pylox build copies it and LoxNatives.py next to the module it writes """
+import sys
+import time
+import traceback
+from types import FunctionType, MethodType
+import LoxNatives
+from LoxNatives import LoxRuntimeError, NativeFuncError, stringify as loxStringify, internShort
+
+# lox recursion becomes python recursion
+RECURSION_LIMIT = 10000
+
+class Name:
+    # in place of the Token a LoxRuntimeError or a native's get / set takes
+    __slots__ = ("lexeme", "line")
+
+    def __init__(self, lexeme: str, line: int) -> None:
+        self.lexeme = lexeme
+        self.line = line
+
+def error(line: int, mess: str):
+    return LoxRuntimeError(Name("", line), mess)
+
+
+class LoxObject:
+    """ base of every lox class, fields and methods are stored with an 'f_' prefix """
+    _loxName = "LoxObject"
+
+    def __str__(self) -> str:
+        return self._loxName + " instance"
+
+
+def isLoxClass(value) -> bool:
+    return isinstance(value, type) and issubclass(value, LoxObject)
+
+# ------- semantics of Interpreter.py ------
+
+def truthy(value) -> bool:
+    return value is not None and value is not False
+
+def stringify(value) -> str:
+    if value.__class__ is FunctionType:
+        name = functionNames.get(value.__code__.co_name)
+        if name is None:
+            return "anmoymous lambda expression"
+        return f"<fn {name}>"
+    if value.__class__ is MethodType:
+        return f"<fn {value.__func__.__name__[2:]}>"
+    if isLoxClass(value):
+        return value._loxName
+    return loxStringify(value)
+
+# python function name -> lox function name, set by the generated module
+functionNames = {}
+
+def add(a, b, line):
+    if a.__class__ is float and b.__class__ is float:
+        return a + b
+    if a.__class__ is str and b.__class__ is str:
+        return internShort(a + b)
+    raise error(line, "Operands must be two number or two strings")
+
+def sub(a, b, line):
+    if a.__class__ is float and b.__class__ is float:
+        return a - b
+    raise error(line, "Operands must be numbers")
+
+def mul(a, b, line):
+    if a.__class__ is float and b.__class__ is float:
+        return a * b
+    raise error(line, "Operands must be numbers")
+
+def div(a, b, line):
+    if a.__class__ is float and b.__class__ is float:
+        return a / b
+    raise error(line, "Operands must be numbers")
+
+def gt(a, b, line):
+    if a.__class__ is float and b.__class__ is float:
+        return a > b
+    raise error(line, "Operands must be numbers")
+
+def ge(a, b, line):
+    if a.__class__ is float and b.__class__ is float:
+        return a >= b
+    raise error(line, "Operands must be numbers")
+
+def lt(a, b, line):
+    if a.__class__ is float and b.__class__ is float:
+        return a < b
+    raise error(line, "Operands must be numbers")
+
+def le(a, b, line):
+    if a.__class__ is float and b.__class__ is float:
+        return a <= b
+    raise error(line, "Operands must be numbers")
+
+def neg(a, line):
+    if a.__class__ is float:
+        return -a
+    raise error(line, "Operand must be a number")
+
+# ------- variables -------
+
+def setGlobal(moduleGlobals: dict, name: str, value, line):
+    if name not in moduleGlobals:
+        raise error(line, f"Undefined variable '{name[2:]}'.")
+    moduleGlobals[name] = value
+    return value
+
+def setBox(box: list, value):
+    box[0] = value
+    return value
+
+# ------- calls and classes -------
+
+def arityError(line, arity: int, count: int):
+    return error(line, f"Exprcted {arity} arguments but got {count}.")
+
+def call(line, callee, *args):
+    cls = callee.__class__
+    if cls is FunctionType:
+        if callee.__code__.co_argcount != len(args):
+            raise arityError(line, callee.__code__.co_argcount, len(args))
+        return callee(*args)
+
+    if cls is MethodType:
+        arity = callee.__func__.__code__.co_argcount - 1
+        if arity != len(args):
+            raise arityError(line, arity, len(args))
+        return callee(*args)
+
+    if isLoxClass(callee):
+        instance = callee()
+        initializer = getattr(callee, "f_init", None)
+        if initializer is None:
+            if len(args) != 0:
+                raise arityError(line, 0, len(args))
+            return instance
+        arity = initializer.__code__.co_argcount - 1
+        if arity != len(args):
+            raise arityError(line, arity, len(args))
+        initializer(instance, *args)
+        return instance
+
+    if isinstance(callee, LoxNatives.LoxCallable):
+        # natives are called directly, with no interpreter
+        if callee.arity() != len(args):
+            raise arityError(line, callee.arity(), len(args))
+        try:
+            return callee.call(None, list(args))
+        except NativeFuncError as err:
+            raise error(line, err.mess)
+
+    raise error(line, "Can only call functions and classes.")
+
+def superclass(value, line):
+    if not isLoxClass(value):
+        raise error(line, "Superclass must be a class")
+    return value
+
+def getProperty(obj, name: str, line):
+    if isinstance(obj, LoxObject):
+        try:
+            return getattr(obj, name)
+        except AttributeError:
+            raise error(line, f"Undefined property '{name[2:]}'.")
+    if isinstance(obj, LoxNatives.LoxInstance):
+        return obj.get(Name(name[2:], line))
+    raise error(line, "Only instances have properties.")
+
+def invoke(obj, name: str, line, *args):
+    return call(line, getProperty(obj, name, line), *args)
+
+def setProperty(obj, name: str, value, line):
+    if isinstance(obj, LoxObject):
+        setattr(obj, name, value)
+        return value
+    if isinstance(obj, LoxNatives.LoxInstance):
+        obj.set(Name(name[2:], line), value)
+        return value
+    raise error(line, "Only instances have fields")
+
+def getIndex(obj, index, line):
+    if obj.__class__ is LoxNatives.LoxListInstance:
+        items = obj.list
+        if index.__class__ is float and index.is_integer() and -len(items) <= index < len(items):
+            return items[int(index)]
+    try:
+        return LoxNatives.getIndex(obj, index)
+    except NativeFuncError as err:
+        raise error(line, err.mess)
+
+def setIndex(obj, index, value, line):
+    if obj.__class__ is LoxNatives.LoxListInstance:
+        items = obj.list
+        if index.__class__ is float and index.is_integer() and -len(items) <= index < len(items):
+            items[int(index)] = value
+            return value
+    try:
+        return LoxNatives.setIndex(obj, index, value)
+    except NativeFuncError as err:
+        raise error(line, err.mess)
+
+def getSuper(klass: type, this, name: str, line):
+    try:
+        return getattr(super(klass, this), name)
+    except AttributeError:
+        raise error(line, f"Undefined property '{name[2:]}.")
+
+# ------- natives, for call sites where the name is never rebound -------
+
+def clock():
+    return time.time()
+
+def num(value, line):
+    try:
+        return float(value)
+    except ValueError:
+        raise error(line, "'num' argument must be a number")
+
+def newList():
+    return LoxNatives.LoxListInstance()
+
+def readLine():
+    return internShort(input())
+
+natives = {
+    "g_clock": LoxNatives.clock(),
+    "g_input": LoxNatives.loxInput(),
+    "g_num": LoxNatives.loxToNum(),
+    "g_list": LoxNatives.LoxList(),
+    "g_f64array": LoxNatives.F64Array(),
+    "g_map": LoxNatives.LoxMap(),
+    "g_StringBuilder": LoxNatives.StringBuilder(),
+}
+
+# ------- entry point -------
+
+def run(main: FunctionType, lines: 'dict[int, int]', names: 'dict[tuple, int]'):
+    """ runs the generated main function, reports runtime errors like pylox.runtimeError """
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), RECURSION_LIMIT))
+    try:
+        main()
+    except LoxRuntimeError as err:
+        print(f"[line {err.token.line}] {err.mess}")
+        sys.exit(70)
+    except NameError as err:
+        # an undefined global
+        pyLine = failedLine(main, err)
+        line = names.get((pyLine, err.name), lines.get(pyLine, 0))
+        print(f"[line {line}] Undefined variable '{err.name[2:]}'.")
+        sys.exit(70)
+    except RecursionError as err:
+        print(f"[line {lines.get(failedLine(main, err), 0)}] Stack overflow.")
+        sys.exit(70)
+
+def failedLine(main: FunctionType, err: Exception) -> int:
+    # the last line of the generated module in the traceback
+    filename = main.__code__.co_filename
+    pyLine = 0
+    for frame, lineno in traceback.walk_tb(err.__traceback__):
+        if frame.f_code.co_filename == filename:
+            pyLine = lineno
+    return pyLine
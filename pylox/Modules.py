@@ -0,0 +1,189 @@
+""" import "path"; modules
+
+a module is scanned, parsed and resolved once per process, kept by path and mtime, and
+runs once, the first time it is imported. its top level declarations are globals like
+the importing script's. paths are relative to the directory of the importing file
+(the current directory in the REPL).
+
+before a script runs, the modules it imports are loaded a level of the import graph at
+a time, the modules of a level in parallel in a process pool when there are several.
+"""
+import gc
+import io
+import os
+import contextlib
+import pylox
+import LoxCache
+from Stmt import Import
+
+
+class Module:
+    __slots__ = ("path", "mtime", "statements", "resolved", "imports", "errors")
+
+    def __init__(self, path: str, mtime: int) -> None:
+        self.path = path
+        self.mtime = mtime
+        self.statements: list = None
+        # (expr, depth, slot) for every resolve() the Resolver made, like __loxcache__
+        self.resolved: 'list[tuple]' = []
+        # files of the modules it imports
+        self.imports: 'list[str]' = []
+        # the error reports of its scanning, parsing and resolving, "" when it has none
+        self.errors = ""
+
+
+def linkImports(statements: list, directory: str) -> 'list[str]':
+    """ gives every import of a top level list of statements the file it imports,
+        reports the ones that do not exist, returns the files """
+    files = []
+    for stmt in statements:
+        if isinstance(stmt, Import):
+            stmt.file = os.path.abspath(os.path.join(directory, stmt.path.literal))
+            if not os.path.isfile(stmt.file):
+                pylox.error(stmt.path, f"Can't find module '{stmt.path.literal}'.")
+            files.append(stmt.file)
+    return files
+
+
+def compileModule(path: str, optimize: bool, scanner: str, cache: bool) -> Module:
+    # scan, parse and resolve one module, in a worker process of the pool or in this one.
+    # the options are passed along, a spawned worker does not have the loader's
+    module = Module(path, os.stat(path).st_mtime_ns)
+    with open(path) as infile:
+        source = infile.read()
+
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        key = LoxCache.sourceKey(source)
+        program = LoxCache.load(path, optimize, key) if cache else None
+        if program is not None:
+            module.statements, module.resolved = program
+        else:
+            import Resolver
+            module.statements = pylox.makeParser(source, scanner=scanner).parse()
+            if module.statements is not None:
+                recorder = LoxCache.ResolveRecorder(None)
+                Resolver.Resolver(recorder).firstResolve(module.statements)
+                module.resolved = recorder.resolved
+                if optimize:
+                    import Optimizer
+                    module.statements = Optimizer.Optimizer().optimize(module.statements)
+                if cache and not output.getvalue():
+                    LoxCache.store(path, optimize, key, (module.statements, module.resolved))
+
+        if module.statements is not None:
+            module.imports = linkImports(module.statements, os.path.dirname(path))
+    module.errors = output.getvalue()
+    return module
+
+
+class ModuleLoader:
+    def __init__(self) -> None:
+        # (optimize, scanner, cache) modules are compiled with, pylox sets them from its options
+        self.options = (False, "regex", True)
+        # processes of the pool, None for one per core, 1 never starts a pool
+        self.workers: int = None
+        # file -> its Module, as of its mtime then
+        self.modules: 'dict[str, Module]' = {}
+        # files that have run, or are running, the running script is one too
+        self.executed: 'set[str]' = set()
+
+    def fresh(self, path: str) -> bool:
+        module = self.modules.get(path)
+        try:
+            return module is not None and module.mtime == os.stat(path).st_mtime_ns
+        except OSError:
+            return False
+
+    def preload(self, files: 'list[str]') -> bool:
+        """ loads the modules of files and everything they import,
+            prints their errors and returns False if any had one """
+        ok = True
+        seen = set()
+        level = files
+        while level:
+            level = [path for path in dict.fromkeys(level) if path not in seen]
+            seen.update(level)
+            stale = [path for path in level if os.path.isfile(path) and not self.fresh(path)]
+            for module in self.compileAll(stale):
+                self.modules[module.path] = module
+
+            following = []
+            for path in level:
+                module = self.modules.get(path)
+                if module is None:
+                    # missing, linkImports already reported it
+                    ok = False
+                    continue
+                if module.errors:
+                    print(f"In module '{path}':")
+                    print(module.errors, end="")
+                    pylox.errorFlags().hadError = True
+                    ok = False
+                following.extend(module.imports)
+            level = following
+        return ok
+
+    def compileAll(self, paths: 'list[str]') -> 'list[Module]':
+        options = self.options
+        workers = min(len(paths), self.workers or os.cpu_count() or 1)
+        if workers < 2:
+            return [compileModule(path, *options) for path in paths]
+
+        # not imported at startup, most scripts import fewer modules than that
+        import concurrent.futures
+        # the trees come back pickled, see LoxCache.load for why the collector waits
+        gc.disable()
+        try:
+            with concurrent.futures.ProcessPoolExecutor(workers) as pool:
+                futures = [pool.submit(compileModule, path, *options) for path in paths]
+                modules = []
+                for path, future in zip(paths, futures):
+                    try:
+                        modules.append(future.result())
+                    except RecursionError:
+                        # too deep to send back pickled, done here instead
+                        modules.append(compileModule(path, *options))
+                return modules
+        except (OSError, concurrent.futures.process.BrokenProcessPool):
+            # no processes to be had, one at a time then
+            return [compileModule(path, *options) for path in paths]
+        finally:
+            gc.enable()
+
+    def enter(self, stmt: Import) -> Module:
+        """ the module to run for an import statement,
+            None when it has already run (or is running) """
+        if stmt.file is None:
+            linkImports([stmt], os.getcwd())
+        if stmt.file in self.executed:
+            return None
+
+        if not self.fresh(stmt.file):
+            try:
+                self.modules[stmt.file] = compileModule(stmt.file, *self.options)
+            except OSError:
+                raise pylox.LoxRuntimeError(stmt.path, f"Can't find module '{stmt.path.literal}'.")
+        module = self.modules[stmt.file]
+        if module.errors:
+            print(module.errors, end="")
+            raise pylox.LoxRuntimeError(stmt.path, f"Module '{stmt.path.literal}' has errors.")
+
+        self.executed.add(stmt.file)
+        return module
+
+    def inline(self, statements: list) -> list:
+        """ statements with each import replaced by the statements of its module, the
+            first time it is imported, for pylox build's one program ahead of time """
+        inlined = []
+        for stmt in statements:
+            if not isinstance(stmt, Import):
+                inlined.append(stmt)
+            elif stmt.file not in self.executed:
+                self.executed.add(stmt.file)
+                inlined.extend(self.inline(self.modules[stmt.file].statements))
+        return inlined
+
+
+# one per process, modules are shared by everything that runs in it
+loader = ModuleLoader()
@@ -0,0 +1,63 @@
+import LoxCallable
+from Chunk import Chunk
+
+# runtime objects of the bytecode VM, same ones as clox/object.h
+# classes and instances are shared with the tree walker (LoxCallable.LoxClass, LoxCallable.LoxInstance)
+
+class ObjFunction:
+    __slots__ = ("arity", "upvalueCount", "chunk", "name")
+
+    def __init__(self, name: str = None) -> None:
+        self.arity = 0
+        self.upvalueCount = 0
+        self.chunk = Chunk()
+        self.name = name
+
+    def __str__(self) -> str:
+        if self.name is None:
+            return "<script>"
+        return f"<fn {self.name}>"
+
+
+class ObjUpvalue:
+    # while the captured variable still lives on the stack, index points at its slot,
+    # once closed index is -1 and the value is held here
+    __slots__ = ("index", "value")
+
+    def __init__(self, index: int) -> None:
+        self.index = index
+        self.value = None
+
+
+class ObjClosure(LoxCallable.LoxCallable):
+    __slots__ = ("function", "upvalues", "isLambda")
+
+    def __init__(self, function: ObjFunction, upvalues: 'list[ObjUpvalue]', isLambda: bool = False) -> None:
+        self.function = function
+        self.upvalues = upvalues
+        self.isLambda = isLambda
+
+    def arity(self) -> int:
+        return self.function.arity
+
+    def bind(self, instance: 'LoxCallable.LoxInstance'):
+        return ObjBoundMethod(instance, self)
+
+    def __str__(self) -> str:
+        if self.isLambda:
+            return "anmoymous lambda expression"
+        return str(self.function)
+
+
+class ObjBoundMethod(LoxCallable.LoxCallable):
+    __slots__ = ("receiver", "method")
+
+    def __init__(self, receiver, method: ObjClosure) -> None:
+        self.receiver = receiver
+        self.method = method
+
+    def arity(self) -> int:
+        return self.method.function.arity
+
+    def __str__(self) -> str:
+        return str(self.method)
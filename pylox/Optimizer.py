@@ -0,0 +1,227 @@
+from Expr import ExprVisitor, Expr, Binary, Grouping, Set, Super, This, Unary, Literal, Variable, Assign, Logical, Call, Lambda, Get, Index, SetIndex
+from Token import TokenType, Token
+from Stmt import StmtVisitor, Stmt, Expression, Print,  Var, Block, If, While, StopIter, Function, Return, Class, Import
+from Interpreter import isTruthy
+from sys import intern
+
+# AST to AST pass run on the resolved tree (pylox -O), the Resolver checks code
+# before it is removed and the slots it gave the statements that are kept stay valid
+#   constant folding of operators with literal operands
+#   if with a constant condition becomes the branch taken, while (false) goes away
+#   statements after an unconditional return / break / continue are dropped
+# anything that would raise at runtime is left alone, so errors stay on the same line
+
+numberOps = {
+    TokenType.MINUS: lambda a, b: a - b,
+    TokenType.STAR: lambda a, b: a * b,
+    TokenType.SLASH: lambda a, b: a / b,
+    TokenType.GREATER: lambda a, b: a > b,
+    TokenType.GREATER_EQUAL: lambda a, b: a >= b,
+    TokenType.LESS: lambda a, b: a < b,
+    TokenType.LESS_EQUAL: lambda a, b: a <= b,
+}
+
+
+class Optimizer(ExprVisitor, StmtVisitor):
+    def __init__(self) -> None:
+        # nodes folded or removed, for -O runs that want to know
+        self.folded = 0
+        self.removed = 0
+
+    def optimize(self, statements: 'list[Stmt]') -> 'list[Stmt]':
+        return self.optimizeSequence(statements)
+
+    def optimizeSequence(self, statements: 'list[Stmt]') -> 'list[Stmt]':
+        out = []
+        for i, stmt in enumerate(statements):
+            stmt = stmt.accept(self)
+            if stmt is None:
+                self.removed += 1
+                continue
+            out.append(stmt)
+            if isinstance(stmt, (Return, StopIter)):
+                self.removed += len(statements) - i - 1
+                break
+        return out
+
+    def optimizeBody(self, stmt: Stmt) -> Stmt:
+        # if / while bodies need a statement, even when theirs was removed
+        stmt = stmt.accept(self)
+        if stmt is None:
+            return Block([])
+        return stmt
+
+    def expr(self, expr: Expr) -> Expr:
+        return expr.accept(self)
+
+# ----------- statements -------------
+
+    def visitBlockStmt(self, stmt: Block):
+        stmt.statements = self.optimizeSequence(stmt.statements)
+        return stmt
+
+    def visitClassStmt(self, stmt: Class):
+        for method in stmt.methods:
+            method.body = self.optimizeSequence(method.body)
+        return stmt
+
+    def visitVarStmt(self, stmt: Var):
+        if stmt.initializer != None:
+            stmt.initializer = self.expr(stmt.initializer)
+        return stmt
+
+    def visitFunctionStmt(self, stmt: Function):
+        stmt.body = self.optimizeSequence(stmt.body)
+        return stmt
+
+    def visitExpressionStmt(self, stmt: Expression):
+        stmt.expression = self.expr(stmt.expression)
+        return stmt
+
+    def visitIfStmt(self, stmt: If):
+        stmt.condition = self.expr(stmt.condition)
+        if isinstance(stmt.condition, Literal):
+            self.removed += 1
+            # the branches are statements, not declarations, so no scope changes
+            if isTruthy(stmt.condition.value):
+                return stmt.thenBranch.accept(self)
+            if stmt.elseBranch != None:
+                return stmt.elseBranch.accept(self)
+            return None
+
+        stmt.thenBranch = self.optimizeBody(stmt.thenBranch)
+        if stmt.elseBranch != None:
+            stmt.elseBranch = self.optimizeBody(stmt.elseBranch)
+        return stmt
+
+    def visitWhileStmt(self, stmt: While):
+        stmt.condition = self.expr(stmt.condition)
+        if isinstance(stmt.condition, Literal) and not isTruthy(stmt.condition.value):
+            return None
+        stmt.body = self.optimizeBody(stmt.body)
+        if stmt.increment != None:
+            stmt.increment = self.expr(stmt.increment)
+        return stmt
+
+    def visitStopiterStmt(self, stmt: StopIter):
+        return stmt
+
+    def visitImportStmt(self, stmt: Import):
+        return stmt
+
+    def visitPrintStmt(self, stmt: Print):
+        stmt.expression = self.expr(stmt.expression)
+        return stmt
+
+    def visitReturnStmt(self, stmt: Return):
+        if stmt.value != None:
+            stmt.value = self.expr(stmt.value)
+        return stmt
+
+# ----------- expressions ------------
+
+    def visitAssignExpr(self, expr: Assign):
+        expr.value = self.expr(expr.value)
+        return expr
+
+    def visitVariableExpr(self, expr: Variable):
+        return expr
+
+    def visitThisExpr(self, expr: This):
+        return expr
+
+    def visitSuperExpr(self, expr: Super):
+        return expr
+
+    def visitLiteralExpr(self, expr: Literal):
+        return expr
+
+    def visitGroupingExpr(self, expr: Grouping):
+        # grouping only matters to the parser
+        return self.expr(expr.expression)
+
+    def visitUnaryExpr(self, expr: Unary):
+        expr.right = self.expr(expr.right)
+        if not isinstance(expr.right, Literal):
+            return expr
+
+        value = expr.right.value
+        if expr.operator.type == TokenType.BANG:
+            return self.fold(not isTruthy(value))
+        if expr.operator.type == TokenType.MINUS and isinstance(value, float):
+            return self.fold(-value)
+        return expr
+
+    def visitBinaryExpr(self, expr: Binary):
+        expr.left = self.expr(expr.left)
+        expr.right = self.expr(expr.right)
+        if not (isinstance(expr.left, Literal) and isinstance(expr.right, Literal)):
+            return expr
+
+        left = expr.left.value
+        right = expr.right.value
+        optype = expr.operator.type
+        if optype == TokenType.EQUAL_EQUAL:
+            return self.fold(right == left)
+        if optype == TokenType.BANG_EQUAL:
+            return self.fold(not (right == left))
+        if optype == TokenType.PLUS:
+            if isinstance(left, float) and isinstance(right, float):
+                return self.fold(left + right)
+            if isinstance(left, str) and isinstance(right, str):
+                # a string literal, interned like the scanned ones
+                return self.fold(intern(left + right))
+            return expr
+
+        if not (isinstance(left, float) and isinstance(right, float)):
+            return expr
+        # x / 0 is left for the interpreter to deal with
+        if optype == TokenType.SLASH and right == 0:
+            return expr
+        return self.fold(numberOps[optype](left, right))
+
+    def visitLogicalExpr(self, expr: Logical):
+        expr.left = self.expr(expr.left)
+        expr.right = self.expr(expr.right)
+        if not isinstance(expr.left, Literal):
+            return expr
+
+        self.folded += 1
+        if expr.operator.type == TokenType.OR:
+            return expr.left if isTruthy(expr.left.value) else expr.right
+        return expr.right if isTruthy(expr.left.value) else expr.left
+
+    def visitSetExpr(self, expr: Set):
+        expr.obj = self.expr(expr.obj)
+        expr.value = self.expr(expr.value)
+        return expr
+
+    def visitCallExpr(self, expr: Call):
+        expr.callee = self.expr(expr.callee)
+        expr.arguments = [self.expr(arg) for arg in expr.arguments]
+        return expr
+
+    def visitGetExpr(self, expr: Get):
+        expr.object = self.expr(expr.object)
+        return expr
+
+    def visitIndexExpr(self, expr: Index):
+        expr.object = self.expr(expr.object)
+        expr.index = self.expr(expr.index)
+        return expr
+
+    def visitSetindexExpr(self, expr: SetIndex):
+        expr.object = self.expr(expr.object)
+        expr.index = self.expr(expr.index)
+        expr.value = self.expr(expr.value)
+        return expr
+
+    def visitLambdaExpr(self, expr: Lambda):
+        expr.body = self.optimizeSequence(expr.body)
+        return expr
+
+# ----------- helpers ------------
+
+    def fold(self, value) -> Literal:
+        self.folded += 1
+        return Literal(value)
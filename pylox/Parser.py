@@ -1,6 +1,6 @@
-from Token import Token, TokenType
-from Expr import Expr, Binary, Get, Grouping, Set, Super, This, Unary, Literal, Token, Variable, Assign, Logical, Call, Lambda
-from Stmt import Class, Stmt, Expression, Print, Var, Block, If, While, StopIter, Function, Return
+from Token import Token, TokenType, TokenBuffer, tokenTypes
+from Expr import Expr, Binary, Get, Grouping, Set, Super, This, Unary, Literal, Token, Variable, Assign, Logical, Call, Lambda, Index, SetIndex
+from Stmt import Class, Stmt, Expression, Print, Var, Block, If, While, StopIter, Function, Return, Import
 import pylox
 from Flags import Flags
 
@@ -13,9 +13,14 @@ class ParseError(RuntimeError):
 
 class Parser:
     def __init__(self, tokens: 'list[Token]', inREPLmode = False) -> None:
-        self.tokens = tokens
-        self.current: int = 0
+        # any iterable of tokens ending with EOF, a list or RegexScanner.tokenStream(),
+        # the parser only ever looks at the previous and the next token
+        self.tokens = iter(tokens)
+        self.previousToken: Token = None
+        self.nextToken: Token = next(self.tokens)
         self.inREPLmode = inREPLmode
+        # syntax errors reported by this parser
+        self.errors = 0
 
 
     def parse(self):
@@ -30,6 +35,16 @@ class Parser:
             return None
         return self.statements
 
+    def declarations(self):
+        # top level declarations one at a time, as soon as each is parsed,
+        # None for one with a syntax error
+        while not self.isAtEnd():
+            try:
+                yield self.declaration()
+            except ParseError:
+                yield None
+                return
+
 # ------- handling statement productions ----------
 
     def declaration(self):
@@ -40,11 +55,19 @@ class Parser:
                 return self.function("function")
             if self.match([TokenType.VAR]):
                 return self.varDeclaration()
+            if self.match([TokenType.IMPORT]):
+                return self.importDeclaration()
             return self.statement()
         except ParseError as err:
             self.synchronize()
             return None
 
+    def importDeclaration(self):
+        keyword: Token = self.previous()
+        path: Token = self.consume(TokenType.STRING, "Expected module path after 'import'.")
+        self.consume(TokenType.SEMICOLON, "Expected ';' after import.")
+        return Import(keyword, path)
+
     def classDeclaration(self):
         name: Token = self.consume(TokenType.IDENTIFIER, "Expected class name.")
         superclass = None
@@ -128,15 +151,10 @@ class Parser:
 
         body: Stmt = self.statement()
 
-        if increment != None: 
-            body = Block([
-              body, 
-              Expression( increment )  
-            ])
-        
+        # the increment is kept on the While so that continue still runs it
         if condition == None:
             condition = Literal(True)
-        body = While(condition, body)
+        body = While(condition, body, increment)
         
         if initializer != None:
             body = Block([initializer, body])
@@ -161,7 +179,7 @@ class Parser:
         self.consume(TokenType.RIGHT_PAREN, "Expected ')' after while condition.")
         body: Stmt = self.statement()
 
-        return While(condition, body)
+        return While(condition, body, None)
 
     def printStatement(self):
         value: Expr = self.expression()
@@ -221,123 +239,120 @@ class Parser:
         return Return(keyword, value)
 
 
-# ------- handling expression productions top down --------------------
+# ------- expressions, precedence climbing over explicit stacks --------
+    # one loop for every binary, prefix and postfix operator: the table says how
+    # tight an operator binds, operators wait on a stack until something binding
+    # less tight comes, open parentheses, argument lists and index brackets are stack
+    # entries too.
+    # nesting costs no python frames, and there is one call per operand and operator
 
     def expression(self):
-        return self.assignment()
-    
-    def assignment(self):
-        expr: Expr = self.logic_or()
-
-        if self.match([TokenType.EQUAL]):
-            equals = self.previous()
-            value = self.assignment()
-
-            if isinstance(expr, Variable):
-                name = expr.name
-                return Assign(name, value)
-            
-            elif isinstance(expr, Get):
-                return Set(expr.object, expr.name, value)
-
-            self.error(equals, "Invalid assignment target.")
-
-        return expr
-
-    def logic_or(self):
-        expr: Expr = self.logic_and()
-
-        while (self.match([TokenType.OR])):
-            operator: Token = self.previous()
-            right : expr = self.logic_and()
-            expr = Logical(expr, operator, right)
-
-        return expr
-
-    def logic_and(self):
-        expr: Expr = self.equality()
-
-        while (self.match([TokenType.AND])):
-            operator: Token = self.previous()
-            right : expr = self.equality()
-            expr = Logical(expr, operator, right)
-
-        return expr
-        
-    def equality(self):
-        expr: Expr = self.comparison()
-        while self.match([TokenType.BANG_EQUAL, TokenType.EQUAL_EQUAL]):
-            operator: Token = self.previous()
-            right: Expr = self.comparison()
-            expr = Binary(expr, operator, right)
-        
-        return expr
-
-    def comparison(self):
-        expr: Expr = self.term()
-        while self.match([TokenType.GREATER, TokenType.GREATER_EQUAL, TokenType.LESS, TokenType.LESS_EQUAL]):
-            operator: Token = self.previous()
-            right: Expr = self.term()
-            expr = Binary(expr, operator, right)
-
-        return expr
-
-    def term(self):
-        expr: Expr = self.factor()
-        while self.match([TokenType.MINUS, TokenType.PLUS]):
-            operator: Token = self.previous()
-            right: Expr = self.factor()
-            expr = Binary(expr, operator, right)
-            
-        return expr
- 
-    def factor(self):
-        expr: Expr = self.unary()
-        while self.match([TokenType.STAR, TokenType.SLASH]):
-            operator: Token = self.previous()
-            right: Expr = self.unary()
-            expr = Binary(expr, operator, right)
-    
-        return expr
-    
-    def unary(self):
-        if self.match([TokenType.BANG, TokenType.MINUS]):
-            operator : Token = self.previous()
-            right: Expr = self.unary()
-            return Unary(operator, right)
-    
-        return self.call()
-
-    def call(self):
-        expr: Expr = self.primary()
-        while True: 
-            if self.match([TokenType.LEFT_PAREN]):
-                expr = self.finishCall(expr)
-            elif self.match([TokenType.DOT]):
-                name: Token = self.consume(TokenType.IDENTIFIER, "Expected property name after '.' .")
-                expr = Get(expr, name)
+        operands: 'list[Expr]' = []
+        operators = []
+
+        while True:
+            # an operand, after its prefix operators and open parentheses
+            type = self.peekType()
+            if type is TokenType.IDENTIFIER:
+                operands.append(Variable(self.advance()))
+            elif type is TokenType.NUMBER or type is TokenType.STRING:
+                operands.append(Literal(self.advance().literal))
+            elif type is TokenType.BANG or type is TokenType.MINUS:
+                operators.append((UNARY, self.advance(), Unary))
+                continue
+            elif type is TokenType.LEFT_PAREN:
+                self.skip()
+                operators.append(GROUP)
+                continue
             else:
-                break
-
-        return expr
-    
-    def finishCall(self, callee: Expr):
-        arguments = []
-
-        if not self.check(TokenType.RIGHT_PAREN):
-            arguments.append( self.expression() )
-            while(self.match([TokenType.COMMA])):
-                if len(arguments) >= 255:
-                    self.error(self.peek(), "Can't have more than 255 arguments")
-                arguments.append( self.expression() )
-        
-        paren: Token = self.consume(TokenType.RIGHT_PAREN, "Expected ')' after arguments")
-
-        return Call(callee, paren, arguments)
-
-
+                operands.append(self.primary())
+
+            # then what comes after it
+            while True:
+                type = self.peekType()
+                if type is TokenType.DOT:
+                    self.skip()
+                    name: Token = self.consume(TokenType.IDENTIFIER, "Expected property name after '.' .")
+                    operands[-1] = Get(operands[-1], name)
+
+                elif type is TokenType.LEFT_PAREN:
+                    self.skip()
+                    if self.peekType() is TokenType.RIGHT_PAREN:
+                        operands[-1] = Call(operands[-1], self.advance(), [])
+                    else:
+                        # the arguments are parsed like parenthesized expressions
+                        operators.append((0, operands.pop(), []))
+                        break
+
+                elif type is TokenType.LEFT_BRACKET:
+                    # so is the index
+                    operators.append((0, operands.pop(), self.advance()))
+                    break
+
+                elif type in infixOperators:
+                    precedence, node = infixOperators[type]
+                    # assignment is right associative
+                    self.reduce(operands, operators, precedence + 1 if node is None else precedence)
+                    operators.append((precedence, self.advance(), node))
+                    break
+
+                else:
+                    # the end of the expression, or of a parenthesized part of it
+                    self.reduce(operands, operators, ASSIGNMENT)
+                    if not operators:
+                        return operands.pop()
+
+                    if operators[-1] is GROUP:
+                        if type is not TokenType.RIGHT_PAREN:
+                            raise self.error(self.peek(), 'Expect ")" after expression')
+                        self.skip()
+                        operators.pop()
+                        operands[-1] = Grouping(operands[-1])
+                        continue
+
+                    _, callee, arguments = operators[-1]
+                    if arguments.__class__ is Token:
+                        if type is not TokenType.RIGHT_BRACKET:
+                            raise self.error(self.peek(), "Expected ']' after index.")
+                        self.skip()
+                        operators.pop()
+                        operands[-1] = Index(callee, arguments, operands[-1])
+                        continue
+
+                    arguments.append(operands.pop())
+                    if type is TokenType.COMMA:
+                        self.skip()
+                        if len(arguments) >= 255:
+                            self.error(self.peek(), "Can't have more than 255 arguments")
+                        break
+                    if type is not TokenType.RIGHT_PAREN:
+                        raise self.error(self.peek(), "Expected ')' after arguments")
+                    operators.pop()
+                    operands.append(Call(callee, self.advance(), arguments))
+
+    def reduce(self, operands: 'list[Expr]', operators: list, precedence: int):
+        # builds the nodes of the waiting operators that bind at least as tight as precedence
+        while operators and operators[-1][0] >= precedence:
+            _, operator, node = operators.pop()
+            if node is Unary:
+                operands[-1] = Unary(operator, operands[-1])
+            elif node is None:
+                value: Expr = operands.pop()
+                target: Expr = operands[-1]
+                if isinstance(target, Variable):
+                    operands[-1] = Assign(target.name, value)
+                elif isinstance(target, Get):
+                    operands[-1] = Set(target.object, target.name, value)
+                elif isinstance(target, Index):
+                    operands[-1] = SetIndex(target.object, target.bracket, target.index, value)
+                else:
+                    self.error(operator, "Invalid assignment target.")
+            else:
+                right: Expr = operands.pop()
+                operands[-1] = node(operands[-1], operator, right)
 
-    def primary(self):        
+    def primary(self):
+        # the operands expression() does not handle itself
         if self.match([TokenType.FALSE]):
             return Literal(False)
         if self.match([TokenType.TRUE]):
@@ -364,11 +379,6 @@ class Parser:
         if self.match([TokenType.IDENTIFIER]):
             return Variable(self.previous())
 
-        if self.match([TokenType.LEFT_PAREN]):
-            expr: Expr = self.expression()
-            self.consume(TokenType.RIGHT_PAREN, 'Expect ")" after expression')
-            return Grouping(expr)
-
         # else - token cant start expression
 
         raise self.error(self.peek(), "Expected expression")
@@ -400,6 +410,7 @@ class Parser:
 
     def error(self, token: Token, mess):
         myFlgas.hadError = True # not the greatest solution but was done with python scoping 
+        self.errors += 1
         pylox.error(token, mess)
         return ParseError() # FIXME dont know if it should be "return ParesError" or "return ParesError()"
 
@@ -412,7 +423,7 @@ class Parser:
             
             if self.peek().type in [
                 TokenType.CLASS, TokenType.FUN, TokenType.VAR, TokenType.FOR, TokenType.IF, TokenType.WHILE,
-                TokenType.PRINT, TokenType.RETURN ]:
+                TokenType.PRINT, TokenType.RETURN, TokenType.IMPORT ]:
                 return
             
             self.advance()
@@ -434,14 +445,22 @@ class Parser:
 
     def advance(self):
         if not self.isAtEnd():
-            self.current += 1
-        return self.previous()
+            self.previousToken = self.nextToken
+            self.nextToken = next(self.tokens)
+        return self.previousToken
     
+    def skip(self):
+        # advance() past a token the AST does not keep
+        self.advance()
+
     def previous(self):
-        return self.tokens[self.current - 1]
+        return self.previousToken
 
     def peek(self):
-        return self.tokens[self.current]
+        return self.nextToken
+
+    def peekType(self):
+        return self.nextToken.type
 
     def isAtEnd(self):
         return self.peek().type == TokenType.EOF
@@ -464,4 +483,81 @@ class Parser:
 
         error_unary -> ("+"| "/"| "*"| "!="| ...) expr
 
-        """
\ No newline at end of file
+        """
+
+
+class BufferParser(Parser):
+    # Parser over a Token.TokenBuffer by index, looking ahead only reads the type
+    # column, Token objects are made for the tokens that end up in the AST
+    def __init__(self, tokens: TokenBuffer, inREPLmode = False) -> None:
+        self.tokens = tokens
+        self.types = tokens.types
+        self.current: int = 0
+        # the last Token made by previous(), it is usually asked for more than once
+        self.previousIndex = -1
+        self.previousToken: Token = None
+        self.inREPLmode = inREPLmode
+        self.errors = 0
+
+    def match(self, types: 'list[Token]'):
+        type = tokenTypes[self.types[self.current]]
+        if type in types and type is not TokenType.EOF:
+            self.current += 1
+            return True
+        return False
+
+    def check(self, type:TokenType):
+        return tokenTypes[self.types[self.current]] is type and type is not TokenType.EOF
+
+    def advance(self):
+        if self.types[self.current] != EOF_CODE:
+            self.current += 1
+        return self.previous()
+
+    def skip(self):
+        if self.types[self.current] != EOF_CODE:
+            self.current += 1
+
+    def previous(self):
+        index = self.current - 1
+        if index != self.previousIndex:
+            self.previousIndex = index
+            self.previousToken = self.tokens[index]
+        return self.previousToken
+
+    def peek(self):
+        return self.tokens[self.current]
+
+    def peekType(self):
+        return tokenTypes[self.types[self.current]]
+
+    def isAtEnd(self):
+        return self.types[self.current] == EOF_CODE
+
+
+EOF_CODE = TokenType.EOF.value
+
+# binding power of the binary operators, higher binds tighter, prefix operators bind
+# tighter than all of them and postfix ones (calls, '.', '[') tighter still
+ASSIGNMENT, OR, AND, EQUALITY, COMPARISON, TERM, FACTOR, UNARY = range(1, 9)
+
+# token type -> (precedence, node class), None for assignment
+infixOperators = {
+    TokenType.EQUAL: (ASSIGNMENT, None),
+    TokenType.OR: (OR, Logical),
+    TokenType.AND: (AND, Logical),
+    TokenType.BANG_EQUAL: (EQUALITY, Binary),
+    TokenType.EQUAL_EQUAL: (EQUALITY, Binary),
+    TokenType.GREATER: (COMPARISON, Binary),
+    TokenType.GREATER_EQUAL: (COMPARISON, Binary),
+    TokenType.LESS: (COMPARISON, Binary),
+    TokenType.LESS_EQUAL: (COMPARISON, Binary),
+    TokenType.MINUS: (TERM, Binary),
+    TokenType.PLUS: (TERM, Binary),
+    TokenType.STAR: (FACTOR, Binary),
+    TokenType.SLASH: (FACTOR, Binary),
+}
+
+# an open parenthesis on the operator stack, nothing is reduced past it
+# (an open argument list is (0, callee, arguments), an open index (0, object, '[' token))
+GROUP = (0, None, None)
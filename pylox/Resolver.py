@@ -1,7 +1,7 @@
 from enum import Enum
-from Expr import ExprVisitor, Expr, Binary, Grouping, Set, Super, This, Unary, Literal, Variable, Assign, Logical, Call, Lambda, Get
+from Expr import ExprVisitor, Expr, Binary, Grouping, Set, Super, This, Unary, Literal, Variable, Assign, Logical, Call, Lambda, Get, Index, SetIndex
 from Token import Token 
-from Stmt import StmtVisitor, Stmt, Expression, Print,  Var, Block, If, While, StopIter, Function, Return, Class
+from Stmt import StmtVisitor, Stmt, Expression, Print,  Var, Block, If, While, StopIter, Function, Return, Class, Import
 import LoxCallable
 from Environment import Environment
 import pylox
@@ -43,8 +43,12 @@ class Resolver(StmtVisitor, ExprVisitor):
     def __init__(self, interpreter: 'Interpreter.Interpreter') -> None:
         self.interpreter = interpreter
         self.scopes = Stack()
+        # name -> slot of the local in its Environment, one dict per scope
+        self.slots = Stack()
         self.currentFunction: FunctionType = FunctionType.NONE
         self.currentClass = ClassType.NONE
+        # loops around the statement in the current function, break / continue can't leave it
+        self.loopDepth = 0
 
         self.localHadError = False
 # ---------- Statements -----------------
@@ -75,10 +79,10 @@ class Resolver(StmtVisitor, ExprVisitor):
             self.resolve(stmt.superclass)
             if stmt.superclass != None:
                 self.beginScope()
-                self.scopes.peek()["super"] = True
+                self.defineSlot("super")
 
         self.beginScope()
-        self.scopes.peek()["this"] = True
+        self.defineSlot("this")
         for method in stmt.methods:
             declaration = FunctionType.METHOD
             if method.name.lexeme == "init":
@@ -131,11 +135,23 @@ class Resolver(StmtVisitor, ExprVisitor):
         
     def visitWhileStmt(self, stmt: While):
         self.resolve(stmt.condition)
+        self.loopDepth += 1
         self.resolve(stmt.body)
+        self.loopDepth -= 1
+        if stmt.increment != None:
+            self.resolve(stmt.increment)
+
+    def visitImportStmt(self, stmt: Import):
+        # the module is resolved on its own, it runs at the top level
+        if not self.scopes.isEmpty():
+            pylox.error(stmt.keyword, "Can only import at the top level.")
+            self.localHadError = True
 
     # costume
     def visitStopiterStmt(self, stmt: StopIter):
-        return
+        if self.loopDepth == 0:
+            pylox.error(stmt.name, f"Can't use '{stmt.name.lexeme}' outside of a loop")
+            self.localHadError = True
 
 # --------- Expressions ----------------
 
@@ -166,6 +182,15 @@ class Resolver(StmtVisitor, ExprVisitor):
     def visitGetExpr(self, expr: Get):
         self.resolve(expr.object)
 
+    def visitIndexExpr(self, expr: Index):
+        self.resolve(expr.object)
+        self.resolve(expr.index)
+
+    def visitSetindexExpr(self, expr: SetIndex):
+        self.resolve(expr.object)
+        self.resolve(expr.index)
+        self.resolve(expr.value)
+
     def visitGroupingExpr(self, expr: Grouping):
         self.resolve(expr.expression)
 
@@ -202,6 +227,7 @@ class Resolver(StmtVisitor, ExprVisitor):
 
     # custom   
     def visitLambdaExpr(self, expr: Lambda):
+        enclosingLoops, self.loopDepth = self.loopDepth, 0
         self.beginScope()
         for param in expr.params:
             self.declare(param)
@@ -209,6 +235,7 @@ class Resolver(StmtVisitor, ExprVisitor):
         for stmt in expr.body:
             self.resolve(stmt)   
         self.endScope()
+        self.loopDepth = enclosingLoops
 
 # ----------- helpers ----------------
 
@@ -218,6 +245,7 @@ class Resolver(StmtVisitor, ExprVisitor):
     def resolveFunction(self, function: Function, ftype: FunctionType.FUNCTION):
         enclosingFunction = self.currentFunction
         self.currentFunction = ftype
+        enclosingLoops, self.loopDepth = self.loopDepth, 0
         
         self.beginScope()
         for param in function.params:
@@ -229,13 +257,22 @@ class Resolver(StmtVisitor, ExprVisitor):
         self.endScope()
 
         self.currentFunction = enclosingFunction
+        self.loopDepth = enclosingLoops
 
 
     def beginScope(self):
         self.scopes.push(dict()) # ??? FIXME
+        self.slots.push(dict())
 
     def endScope(self):
         self.scopes.pop()
+        self.slots.pop()
+
+    def defineSlot(self, name: str):
+        # locals are stored in declaration order, the slot is the position
+        slots = self.slots.peek()
+        slots[name] = len(slots)
+        self.scopes.peek()[name] = True
     
     def declare(self, name: Token):
         if self.scopes.isEmpty():
@@ -246,6 +283,8 @@ class Resolver(StmtVisitor, ExprVisitor):
             self.localHadError = True
             return 
         scope[name.lexeme] = False
+        slots = self.slots.peek()
+        slots[name.lexeme] = len(slots)
 
     def define(self, name: Token):
         if self.scopes.isEmpty():
@@ -253,7 +292,7 @@ class Resolver(StmtVisitor, ExprVisitor):
         self.scopes.peek()[name.lexeme] =  True
 
     def resolveLocal(self, expr: Expr, name: Token):
-        for i, scope in enumerate(reversed(self.scopes.stack)):
-            if name.lexeme in scope:
-                self.interpreter.resolve(expr, i)
+        for i, slots in enumerate(reversed(self.slots.stack)):
+            if name.lexeme in slots:
+                self.interpreter.resolve(expr, i, slots[name.lexeme])
                 return 
\ No newline at end of file
@@ -1,4 +1,6 @@
-from Token import Token, TokenType
+from Token import Token, TokenType, TokenBuffer
+import re
+from sys import intern
 import pylox
 
 
@@ -12,6 +14,7 @@ keywords = {
     "fun": TokenType.FUN,
     "for": TokenType.FOR,
     "if": TokenType.IF,
+    "import": TokenType.IMPORT,
     "nil": TokenType.NIL,
     "or": TokenType.OR,
     "print": TokenType.PRINT,
@@ -126,10 +129,12 @@ class Scanner:
         while(self.isAlphaNumeric(self.peek())):
             self.advance()
         
-        text = self.source[self.start: self.current:]
+        # names are interned, every token of one name shares its lexeme like clox's
+        # vm.strings, so dict lookups by it find the key by identity
+        text = intern(self.source[self.start: self.current:])
         # default value is user defined identifier
         type: TokenType = keywords.get(text, TokenType.IDENTIFIER) 
-        self.addToken(type)
+        self.tokens.append(Token(type, text, None, self.line))
         
 
 
@@ -169,13 +174,13 @@ class Scanner:
             self.advance()
         
         if (self.isAtEnd()):
-            pylox.error(self.line, "Unterminated string")
+            pylox.error(Token(TokenType.ERROR, '"', None, self.line), "Unterminated string")
             return
 
         # eat the closing " 
         self.advance()
         # trim the "   "  off
-        str_val = self.source[self.start + 1:self.current -1:]
+        str_val = intern(self.source[self.start + 1:self.current -1:])
         self.addToken(TokenType.STRING, str_val)
 
 
@@ -202,8 +207,144 @@ class Scanner:
         text = self.source[self.start:self.current:]
         self.tokens.append(Token(type, text, literal, self.line))
 
-        
 
+# ------- regex scanner -------
+# same tokens as Scanner, but every token is one match of tokenPattern
+# instead of a scanToken call per character
+
+punctuation = {
+    "(": TokenType.LEFT_PAREN,
+    ")": TokenType.RIGHT_PAREN,
+    "{": TokenType.LEFT_BRACE,
+    "}": TokenType.RIGHT_BRACE,
+    ",": TokenType.COMMA,
+    ".": TokenType.DOT,
+    "-": TokenType.MINUS,
+    "+": TokenType.PLUS,
+    ";": TokenType.SEMICOLON,
+    "*": TokenType.STAR,
+    "/": TokenType.SLASH,
+    #custom
+    "[": TokenType.LEFT_BRACKET,
+    "]": TokenType.RIGHT_BRACKET,
+    "!": TokenType.BANG,
+    "!=": TokenType.BANG_EQUAL,
+    "=": TokenType.EQUAL,
+    "==": TokenType.EQUAL_EQUAL,
+    "<": TokenType.LESS,
+    "<=": TokenType.LESS_EQUAL,
+    ">": TokenType.GREATER,
+    ">=": TokenType.GREATER_EQUAL,
+}
+
+# group numbers are what RegexScanner.tokenStream dispatches on, keep the order
+NAME, PUNCT, SKIP, NUMBER, STRING, UNTERMINATED, UNEXPECTED = range(1, 8)
+
+tokenRegex = r"""
+    [ \t\r]*     # spaces before a token are part of its match, not a match of their own
+  (?:
+    ([A-Za-z_][A-Za-z_0-9]*)
+  | (!=|==|<=|>=|[(){},.\-+;*\[\]!=<>]|/(?![/*]))
+  | ((?:[ \r\t\n]+|//[^\n]*|/\*[\s\S]*?(?:\*/|\Z))+)
+  | ([0-9]+(?:\.[0-9]+)?)
+  | ("[^"]*")
+  | ("[^"]*\Z)
+  | ([\s\S])
+  )
+"""
+tokenPattern = re.compile(tokenRegex, re.VERBOSE)
+# for utf-8 bytes (a memory mapped file), an unexpected character can be several bytes
+bytesTokenPattern = re.compile(
+    tokenRegex.replace(r"([\s\S])", r"([\xc0-\xff][\x80-\xbf]*|[\s\S])").encode(), re.VERBOSE)
+
+
+class RegexScanner:
+    def __init__(self, source) -> None:
+        # source is a str, or utf-8 bytes of anything with the buffer protocol (mmap)
+        self.source = source
+        self.tokens:'list[Token]' = []
+        self.line = 1
+        # source offsets of the last token tokenStream gave out
+        self.tokenStart = 0
+        self.tokenEnd = 0
 
+    def scanTokens(self):
+        self.tokens.extend(self.tokenStream())
+        return self.tokens
 
+    def scanBuffer(self) -> TokenBuffer:
+        # same tokens as scanTokens, stored by offset in a TokenBuffer instead
+        # of a Token each, str sources only
+        buffer = TokenBuffer(self.source)
+        types, starts, ends, lines = buffer.types, buffer.starts, buffer.ends, buffer.lines
+        line = self.line
+        for match in tokenPattern.finditer(self.source):
+            kind = match.lastindex
+            if kind == SKIP:
+                line += match.group(kind).count("\n")
+                continue
+            if kind == NAME:
+                type = keywords.get(match.group(kind), TokenType.IDENTIFIER)
+            elif kind == PUNCT:
+                type = punctuation[match.group(kind)]
+            elif kind == NUMBER:
+                type = TokenType.NUMBER
+            elif kind == STRING:
+                line += match.group(kind).count("\n")
+                type = TokenType.STRING
+            elif kind == UNTERMINATED:
+                line += match.group(kind).count("\n")
+                pylox.error(Token(TokenType.ERROR, '"', None, line), "Unterminated string")
+                continue
+            else:
+                pylox.error(Token(TokenType.ERROR, match.group(kind), None, line), "Unexpected character.")
+                continue
+            types.append(type.value)
+            starts.append(match.start(kind))
+            ends.append(match.end(kind))
+            lines.append(line)
+
+        self.line = line
+        end = len(self.source)
+        buffer.append(TokenType.EOF, end, end, line)
+        return buffer
+
+    def tokenStream(self, start: int = 0):
+        # generator of the tokens, for a Parser that does not want them all at once,
+        # scanning from offset start, which has to be on self.line
+        source = self.source
+        decode = not isinstance(source, str)
+        pattern = bytesTokenPattern if decode else tokenPattern
+        line = self.line
+        for match in pattern.finditer(source, start):
+            kind = match.lastindex
+            text = match.group(kind)
+            if decode:
+                text = text.decode("utf-8", "replace")
+            if kind != SKIP:
+                self.tokenStart, self.tokenEnd = match.span(kind)
+            if kind == NAME:
+                # interned, like Scanner.identifier
+                text = intern(text)
+                yield Token(keywords.get(text, TokenType.IDENTIFIER), text, None, line)
+            elif kind == PUNCT:
+                yield Token(punctuation[text], text, None, line)
+            elif kind == SKIP:
+                # whitespace and comments, only newlines matter
+                line += text.count("\n")
+            elif kind == NUMBER:
+                yield Token(TokenType.NUMBER, text, float(text), line)
+            elif kind == STRING:
+                # the token is on the line the string ends
+                line += text.count("\n")
+                yield Token(TokenType.STRING, text, intern(text[1:-1]), line)
+            elif kind == UNTERMINATED:
+                line += text.count("\n")
+                pylox.error(Token(TokenType.ERROR, '"', None, line), "Unterminated string")
+            else:
+                pylox.error(Token(TokenType.ERROR, text, None, line), "Unexpected character.")
 
+        self.line = line
+        self.tokenStart = self.tokenEnd = len(source)
+        # add an EOF token
+        yield Token(TokenType.EOF,"", None, line)
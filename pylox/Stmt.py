@@ -1,31 +1,27 @@
-from abc import ABC
 from Token import Token
 from Expr import Expr
 
-class Stmt (ABC):
-    def __init__(self) -> None:
-       super().__init__()
-       pass
+class Stmt:
+    __slots__ = ()
+
     def accept(self, visitor: any):
         pass
-    def __eq__(self, __o: object) -> bool:
-        return self is __o
-    def __hash__(self):
-        return hash(id(self))
 
 
 
 
 class Block(Stmt):
+    __slots__ = ('statements',)
+
     def __init__(self, statements:'list[Stmt]', ):
-        super().__init__()
         self.statements = statements
     def accept(self, visitor: any):
         return visitor.visitBlockStmt(self)
 
 class Class(Stmt):
+    __slots__ = ('name', 'superclass', 'methods',)
+
     def __init__(self, name:Token, superclass:'Expr.Variable', methods:'list[Function]', ):
-        super().__init__()
         self.name = name
         self.superclass = superclass
         self.methods = methods
@@ -33,15 +29,17 @@ class Class(Stmt):
         return visitor.visitClassStmt(self)
 
 class Expression(Stmt):
+    __slots__ = ('expression',)
+
     def __init__(self, expression:Expr, ):
-        super().__init__()
         self.expression = expression
     def accept(self, visitor: any):
         return visitor.visitExpressionStmt(self)
 
 class Function(Stmt):
+    __slots__ = ('name', 'params', 'body',)
+
     def __init__(self, name:Token, params:'list[Token]', body:list[Stmt], ):
-        super().__init__()
         self.name = name
         self.params = params
         self.body = body
@@ -49,8 +47,9 @@ class Function(Stmt):
         return visitor.visitFunctionStmt(self)
 
 class If(Stmt):
+    __slots__ = ('condition', 'thenBranch', 'elseBranch',)
+
     def __init__(self, condition:Expr, thenBranch:Stmt, elseBranch:Stmt, ):
-        super().__init__()
         self.condition = condition
         self.thenBranch = thenBranch
         self.elseBranch = elseBranch
@@ -58,43 +57,59 @@ class If(Stmt):
         return visitor.visitIfStmt(self)
 
 class Return(Stmt):
+    __slots__ = ('keyword', 'value',)
+
     def __init__(self, keyword:Token, value:Expr, ):
-        super().__init__()
         self.keyword = keyword
         self.value = value
     def accept(self, visitor: any):
         return visitor.visitReturnStmt(self)
 
 class Print(Stmt):
+    __slots__ = ('expression',)
+
     def __init__(self, expression:Expr, ):
-        super().__init__()
         self.expression = expression
     def accept(self, visitor: any):
         return visitor.visitPrintStmt(self)
 
 class Var(Stmt):
+    __slots__ = ('name', 'initializer',)
+
     def __init__(self, name:Token, initializer:Expr, ):
-        super().__init__()
         self.name = name
         self.initializer = initializer
     def accept(self, visitor: any):
         return visitor.visitVarStmt(self)
 
 class While(Stmt):
-    def __init__(self, condition:Expr, body:Stmt, ):
-        super().__init__()
+    __slots__ = ('condition', 'body', 'increment',)
+
+    def __init__(self, condition:Expr, body:Stmt, increment:Expr, ):
         self.condition = condition
         self.body = body
+        self.increment = increment
     def accept(self, visitor: any):
         return visitor.visitWhileStmt(self)
 
 class StopIter(Stmt):
+    __slots__ = ('name',)
+
     def __init__(self, name:Token, ):
-        super().__init__()
         self.name = name
     def accept(self, visitor: any):
         return visitor.visitStopiterStmt(self)
 
+class Import(Stmt):
+    __slots__ = ('keyword', 'path', 'file',)
+
+    def __init__(self, keyword:Token, path:Token, ):
+        self.keyword = keyword
+        self.path = path
+        self.file = None
+    def accept(self, visitor: any):
+        return visitor.visitImportStmt(self)
+
 class StmtVisitor:
     def __str__(self):
         return self.__class__.__name__
@@ -118,3 +133,5 @@ class StmtVisitor:
         pass
     def visitStopiterStmt(self, stmt:StopIter):
         pass
+    def visitImportStmt(self, stmt:Import):
+        pass
@@ -0,0 +1,82 @@
+""" regression scripts for pylox
+
+    python Tests.py [-O] [--backend=tree,closure,vm,build] [tests/file.lox ...]
+
+runs every script in pylox/tests with every backend and as a pylox build module, each in
+its own process, and compares the lines it prints with the script's "// expect: " comments
+in order. A "// backends: " comment limits a script to the backends it names.
+Python scripts there (for the APIs lox code can't reach) run once and are compared with
+their "# expect: " comments.
+-O passes -O to pylox. Prints the scripts that failed and exits with 1 if any did.
+"""
+import sys
+import os
+import shutil
+import tempfile
+import subprocess
+import pylox
+
+here = os.path.dirname(os.path.abspath(__file__))
+testDir = os.path.join(here, "tests")
+targets = [*pylox.backends, "build"]
+
+
+def expectations(source: str, comment: str):
+    # the expected output lines and the backends the script runs with
+    expected, backends = [], targets
+    for line in source.splitlines():
+        if f"{comment} expect: " in line:
+            expected.append(line.split(f"{comment} expect: ", 1)[1])
+        elif f"{comment} backends: " in line:
+            backends = line.split(f"{comment} backends: ", 1)[1].split()
+    return expected, backends
+
+
+def output(path: str, target: str, options: 'list[str]', directory: str) -> 'list[str]':
+    pyloxPath = os.path.join(here, "pylox.py")
+    if path.endswith(".py"):
+        command = [sys.executable, path]
+    elif target == "build":
+        module = os.path.join(directory, "built.py")
+        result = subprocess.run([sys.executable, pyloxPath, "build", *options, f"--out={module}", path],
+                                stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+        # a script with compile errors is checked against the errors pylox build printed
+        if result.returncode != 0:
+            return result.stdout.splitlines()
+        command = [sys.executable, module]
+    else:
+        command = [sys.executable, pyloxPath, f"--backend={target}", "--no-cache", *options, path]
+    result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    return result.stdout.splitlines()
+
+
+def main():
+    options, args = pylox.parseArgs(sys.argv[1:])
+    chosen = options.get("backend", ",".join(targets)).split(",")
+    pyloxOptions = ["-O"] if "O" in options else []
+    files = args or sorted(os.path.join(testDir, name) for name in os.listdir(testDir) if name.endswith((".lox", ".py")))
+
+    directory = tempfile.mkdtemp()
+    failed = 0
+    try:
+        for path in files:
+            with open(path) as infile:
+                expected, backends = expectations(infile.read(), "#" if path.endswith(".py") else "//")
+            # a python script runs once, not once per backend
+            for target in (chosen[:1] if path.endswith(".py") else chosen):
+                if target not in backends:
+                    continue
+                got = output(path, target, pyloxOptions, directory)
+                if got != expected:
+                    failed += 1
+                    print(f"FAIL {os.path.basename(path)} {target}")
+                    print("  expected: " + " | ".join(expected))
+                    print("  got:      " + " | ".join(got))
+    finally:
+        shutil.rmtree(directory)
+    print(f"{len(files)} scripts, {failed} failed")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
-from dataclasses import dataclass
 from enum import Enum, auto
+from array import array
+from sys import intern
 
 class TokenType(Enum):
     # Single-character tokens. 
@@ -40,6 +41,7 @@ class TokenType(Enum):
     FUN = auto()
     FOR = auto()
     IF = auto()
+    IMPORT = auto()
     NIL = auto()
     OR = auto()
     PRINT = auto()
@@ -54,10 +56,86 @@ class TokenType(Enum):
 
 
 
-@dataclass(frozen=True)
 class Token:
-    type: TokenType
-    lexeme: str
-    literal: any
-    line: int
+    # what @dataclass(frozen=True) made, written out: importing dataclasses was
+    # a fifth of pylox's startup. tokens hash by value and are dict keys, so like the
+    # frozen one its fields can't be set once it is made, make a new Token instead
+    __slots__ = ("type", "lexeme", "literal", "line")
+
+    def __init__(self, type: TokenType, lexeme: str, literal: any, line: int) -> None:
+        # the slots' own setters, __setattr__ below refuses
+        setType(self, type)
+        setLexeme(self, lexeme)
+        setLiteral(self, literal)
+        setLine(self, line)
+
+    def __setattr__(self, name: str, value):
+        raise AttributeError(f"cannot assign to field '{name}' of a Token")
+
+    def __delattr__(self, name: str):
+        raise AttributeError(f"cannot delete field '{name}' of a Token")
+
+    def __reduce__(self):
+        # unpickling would set the slots one by one, a new Token is made instead
+        return (Token, (self.type, self.lexeme, self.literal, self.line))
+
+    def __eq__(self, other) -> bool:
+        if other.__class__ is not Token:
+            return NotImplemented
+        return (self.type, self.lexeme, self.literal, self.line) == (other.type, other.lexeme, other.literal, other.line)
+
+    def __hash__(self) -> int:
+        return hash((self.type, self.lexeme, self.literal, self.line))
+
+    def __repr__(self) -> str:
+        return f"Token(type={self.type!r}, lexeme={self.lexeme!r}, literal={self.literal!r}, line={self.line!r})"
+
+setType = Token.type.__set__
+setLexeme = Token.lexeme.__set__
+setLiteral = Token.literal.__set__
+setLine = Token.line.__set__
+
+
+# type code (TokenType.value) -> TokenType
+tokenTypes = [None] * (max(type.value for type in TokenType) + 1)
+for type in TokenType:
+    tokenTypes[type.value] = type
+
+# identifiers and keywords, the type codes whose lexemes are interned
+nameCodes = frozenset(type.value for type in TokenType
+                      if type is TokenType.IDENTIFIER or TokenType.AND.value <= type.value <= TokenType.WHILE.value)
+
+class TokenBuffer:
+    # all the tokens of a source in columns, a Token is only made when one is indexed
+    __slots__ = ("source", "types", "starts", "ends", "lines")
+
+    def __init__(self, source: str) -> None:
+        self.source = source
+        self.types = array("B")
+        self.starts = array("i")
+        self.ends = array("i")
+        self.lines = array("i")
+
+    def append(self, type: TokenType, start: int, end: int, line: int):
+        self.types.append(type.value)
+        self.starts.append(start)
+        self.ends.append(end)
+        self.lines.append(line)
+
+    def __len__(self):
+        return len(self.types)
+
+    def __getitem__(self, i: int) -> Token:
+        code = self.types[i]
+        type = tokenTypes[code]
+        lexeme = self.source[self.starts[i]:self.ends[i]]
+        literal = None
+        if code in nameCodes:
+            # interned like the scanners do
+            lexeme = intern(lexeme)
+        elif type is TokenType.NUMBER:
+            literal = float(lexeme)
+        elif type is TokenType.STRING:
+            literal = intern(lexeme[1:-1])
+        return Token(type, lexeme, literal, self.lines[i])
 
@@ -0,0 +1,719 @@
+import os
+from Expr import ExprVisitor, Expr, Binary, Grouping, Set, Super, This, Unary, Literal, Variable, Assign, Logical, Call, Lambda, Get, Index, SetIndex
+from Token import TokenType, Token
+from Stmt import StmtVisitor, Stmt, Expression, Print,  Var, Block, If, While, StopIter, Function, Return, Class
+
+# ahead of time translation of a resolved lox program into a python module (pylox build)
+#
+# naming in the generated module:
+#   g_name      lox global
+#   v_name      lox local, v2_name, v3_name ... when the name is declared again
+#   f_name      field or method of a lox instance
+#   _name       runtime helpers, hoisted lambdas and temporaries
+#
+# lox locals are python locals, a block scope only renames. A local that is both
+# captured by a closure and declared inside a loop needs a fresh variable every
+# iteration, so it is kept in a one element list ("box") and passed to the
+# closures as a keyword-only default when they are created.
+
+# pylox build copies these next to the module, which imports LoxRuntime from its own directory
+runtimeFiles = ["LoxRuntime.py", "LoxNatives.py"]
+
+natives = ["clock", "input", "num", "list", "f64array", "map", "StringBuilder"]
+
+
+class LocalVar:
+    def __init__(self, name: str, pyName: str, function, inLoop: bool, kind: str = "var") -> None:
+        self.name = name
+        self.pyName = pyName
+        # Function / Lambda node declaring it, None for top level code
+        self.function = function
+        self.inLoop = inLoop
+        # "var", "function", "class" or "param"
+        self.kind = kind
+        self.arity = None
+        self.captured = False
+        self.assigned = False
+
+    @property
+    def boxed(self) -> bool:
+        return self.captured and self.inLoop
+
+# the receiver, a parameter of every method
+THIS = LocalVar("this", "this", None, False, "param")
+SUPER = LocalVar("super", "super", None, False, "param")
+
+
+class FunctionInfo:
+    def __init__(self, node, enclosing: 'FunctionInfo') -> None:
+        self.node = node
+        self.enclosing = enclosing
+        # locals of enclosing functions used here or in nested functions
+        self.freeVars: 'set[LocalVar]' = set()
+        # locals of enclosing functions assigned directly in this function
+        self.assignedFree: 'set[LocalVar]' = set()
+        # globals assigned here without _setGlobal, see ScopeAnalyzer.definedAssigns
+        self.globalWrites: 'set[str]' = set()
+
+
+class ScopeAnalyzer(StmtVisitor, ExprVisitor):
+    """ first pass, mirrors the scopes of the Resolver to give every local its python name """
+
+    def __init__(self, locals: dict) -> None:
+        self.locals = locals
+        self.scopes: 'list[dict]' = []
+        self.function = FunctionInfo(None, None)
+        self.loopDepth = 0
+        self.nameCounts = {}
+
+        self.varOf = {}        # Variable / Assign / This node -> LocalVar
+        self.declOf = {}       # Var / Function / Class node -> LocalVar
+        self.paramsOf = {}     # Function / Lambda node -> list of LocalVar
+        self.functions = {None: self.function}   # Function / Lambda node -> FunctionInfo
+        self.globalDecls = {}  # global name -> list of declaring statements
+        self.globalAssigns = set()
+        # globals declared by a top level statement that already ran, and the
+        # Assign nodes of them that come after it, which need no defined check
+        self.definedGlobals = set()
+        self.definedAssigns = set()
+
+    def analyze(self, statements: 'list[Stmt]'):
+        # top level statements run in order, whatever is in one (functions and
+        # lambdas too) runs after every declaration before it
+        for stmt in statements:
+            self.resolve(stmt)
+            if isinstance(stmt, (Var, Function, Class)):
+                self.definedGlobals.add(stmt.name.lexeme)
+
+    def resolve(self, node):
+        node.accept(self)
+
+    def newLocal(self, name: str, kind: str) -> LocalVar:
+        count = self.nameCounts.get(name, 0) + 1
+        self.nameCounts[name] = count
+        pyName = f"v_{name}" if count == 1 else f"v{count}_{name}"
+        return LocalVar(name, pyName, self.function.node, self.loopDepth > 0, kind)
+
+    def declare(self, name: Token, node, kind: str):
+        if not self.scopes:
+            self.globalDecls.setdefault(name.lexeme, []).append(node)
+            return None
+        local = self.newLocal(name.lexeme, kind)
+        self.scopes[-1][name.lexeme] = local
+        if node is not None:
+            self.declOf[node] = local
+        return local
+
+    def reference(self, expr: Expr, name: str, assigned: bool = False):
+        distance = self.locals.get(expr)
+        if distance is None:
+            if assigned:
+                self.globalAssigns.add(name)
+                if name in self.definedGlobals:
+                    self.definedAssigns.add(expr)
+                    self.function.globalWrites.add(name)
+            return
+        local = self.scopes[-1 - distance][name]
+        self.varOf[expr] = local
+        if assigned:
+            local.assigned = True
+        if local.function is not self.function.node and local not in (THIS, SUPER):
+            local.captured = True
+            if assigned:
+                self.function.assignedFree.add(local)
+            function = self.function
+            while function is not None and function.node is not local.function:
+                function.freeVars.add(local)
+                function = function.enclosing
+
+    def function_(self, node, params: 'list[Token]', body: 'list[Stmt]'):
+        info = FunctionInfo(node, self.function)
+        self.functions[node] = info
+        enclosing, enclosingLoops = self.function, self.loopDepth
+        self.function, self.loopDepth = info, 0
+
+        self.scopes.append({})
+        self.paramsOf[node] = [self.declare(param, None, "param") for param in params]
+        for stmt in body:
+            self.resolve(stmt)
+        self.scopes.pop()
+
+        self.function, self.loopDepth = enclosing, enclosingLoops
+
+# ----------- statements -------------
+
+    def visitBlockStmt(self, stmt: Block):
+        self.scopes.append({})
+        for statement in stmt.statements:
+            self.resolve(statement)
+        self.scopes.pop()
+
+    def visitClassStmt(self, stmt: Class):
+        self.declare(stmt.name, stmt, "class")
+        if stmt.superclass != None:
+            self.resolve(stmt.superclass)
+            self.scopes.append({"super": SUPER})
+        self.scopes.append({"this": THIS})
+        for method in stmt.methods:
+            self.function_(method, method.params, method.body)
+        self.scopes.pop()
+        if stmt.superclass != None:
+            self.scopes.pop()
+
+    def visitVarStmt(self, stmt: Var):
+        self.declare(stmt.name, stmt, "var")
+        if stmt.initializer != None:
+            self.resolve(stmt.initializer)
+
+    def visitFunctionStmt(self, stmt: Function):
+        local = self.declare(stmt.name, stmt, "function")
+        if local is not None:
+            local.arity = len(stmt.params)
+        self.function_(stmt, stmt.params, stmt.body)
+
+    def visitExpressionStmt(self, stmt: Expression):
+        self.resolve(stmt.expression)
+
+    def visitIfStmt(self, stmt: If):
+        self.resolve(stmt.condition)
+        self.resolve(stmt.thenBranch)
+        if stmt.elseBranch != None:
+            self.resolve(stmt.elseBranch)
+
+    def visitPrintStmt(self, stmt: Print):
+        self.resolve(stmt.expression)
+
+    def visitReturnStmt(self, stmt: Return):
+        if stmt.value != None:
+            self.resolve(stmt.value)
+
+    def visitWhileStmt(self, stmt: While):
+        self.resolve(stmt.condition)
+        self.loopDepth += 1
+        self.resolve(stmt.body)
+        if stmt.increment != None:
+            self.resolve(stmt.increment)
+        self.loopDepth -= 1
+
+    def visitStopiterStmt(self, stmt: StopIter):
+        return
+
+# ----------- expressions ------------
+
+    def visitAssignExpr(self, expr: Assign):
+        self.resolve(expr.value)
+        self.reference(expr, expr.name.lexeme, True)
+
+    def visitVariableExpr(self, expr: Variable):
+        self.reference(expr, expr.name.lexeme)
+
+    def visitThisExpr(self, expr: This):
+        self.reference(expr, "this")
+
+    def visitBinaryExpr(self, expr: Binary):
+        self.resolve(expr.left)
+        self.resolve(expr.right)
+
+    def visitCallExpr(self, expr: Call):
+        self.resolve(expr.callee)
+        for arg in expr.arguments:
+            self.resolve(arg)
+
+    def visitGetExpr(self, expr: Get):
+        self.resolve(expr.object)
+
+    def visitIndexExpr(self, expr: Index):
+        self.resolve(expr.object)
+        self.resolve(expr.index)
+
+    def visitSetindexExpr(self, expr: SetIndex):
+        self.resolve(expr.object)
+        self.resolve(expr.index)
+        self.resolve(expr.value)
+
+    def visitGroupingExpr(self, expr: Grouping):
+        self.resolve(expr.expression)
+
+    def visitLiteralExpr(self, expr: Literal):
+        return
+
+    def visitLogicalExpr(self, expr: Logical):
+        self.resolve(expr.left)
+        self.resolve(expr.right)
+
+    def visitSetExpr(self, expr: Set):
+        self.resolve(expr.obj)
+        self.resolve(expr.value)
+
+    def visitSuperExpr(self, expr: Super):
+        return
+
+    def visitUnaryExpr(self, expr: Unary):
+        self.resolve(expr.right)
+
+    def visitLambdaExpr(self, expr: Lambda):
+        self.function_(expr, expr.params, expr.body)
+
+
+def hasContinue(stmt: Stmt) -> bool:
+    """ does a continue in stmt belong to the loop stmt is the body of """
+    if isinstance(stmt, StopIter):
+        return stmt.name.type == TokenType.CONTINUE
+    if isinstance(stmt, Block):
+        return any(hasContinue(statement) for statement in stmt.statements)
+    if isinstance(stmt, If):
+        return hasContinue(stmt.thenBranch) or (stmt.elseBranch != None and hasContinue(stmt.elseBranch))
+    return False
+
+
+def firstLine(node):
+    """ line of the first token found in a node, statements like print dont keep one """
+    if isinstance(node, Token):
+        return node.line
+    if isinstance(node, (Expr, Stmt)):
+        # slots are the node's fields in order, then interpreter state
+        for name in node.__slots__:
+            line = firstLine(getattr(node, name))
+            if line is not None:
+                return line
+    elif isinstance(node, list):
+        for value in node:
+            line = firstLine(value)
+            if line is not None:
+                return line
+    return None
+
+
+boolOperators = {TokenType.BANG_EQUAL, TokenType.EQUAL_EQUAL, TokenType.GREATER,
+                 TokenType.GREATER_EQUAL, TokenType.LESS, TokenType.LESS_EQUAL}
+
+numberHelpers = {
+    TokenType.PLUS: "_add",
+    TokenType.MINUS: "_sub",
+    TokenType.STAR: "_mul",
+    TokenType.SLASH: "_div",
+    TokenType.GREATER: "_gt",
+    TokenType.GREATER_EQUAL: "_ge",
+    TokenType.LESS: "_lt",
+    TokenType.LESS_EQUAL: "_le",
+}
+
+def isBool(expr: Expr) -> bool:
+    """ expressions that always produce a python bool, they need no truthiness check """
+    if isinstance(expr, Binary):
+        return expr.operator.type in boolOperators
+    if isinstance(expr, Unary):
+        return expr.operator.type == TokenType.BANG
+    if isinstance(expr, Literal):
+        return isinstance(expr.value, bool)
+    if isinstance(expr, Grouping):
+        return isBool(expr.expression)
+    if isinstance(expr, Logical):
+        return isBool(expr.left) and isBool(expr.right)
+    return False
+
+
+header = [
+    "import LoxRuntime as _rt",
+    "",
+    "_G = globals()",
+    "_truthy = _rt.truthy",
+    "_str = _rt.stringify",
+    "_add = _rt.add",
+    "_sub = _rt.sub",
+    "_mul = _rt.mul",
+    "_div = _rt.div",
+    "_gt = _rt.gt",
+    "_ge = _rt.ge",
+    "_lt = _rt.lt",
+    "_le = _rt.le",
+    "_neg = _rt.neg",
+    "_call = _rt.call",
+    "_invoke = _rt.invoke",
+    "_getProperty = _rt.getProperty",
+    "_setProperty = _rt.setProperty",
+    "_getIndex = _rt.getIndex",
+    "_setIndex = _rt.setIndex",
+    "_getSuper = _rt.getSuper",
+    "_superclass = _rt.superclass",
+    "_setGlobal = _rt.setGlobal",
+    "_setBox = _rt.setBox",
+    "_LoxObject = _rt.LoxObject",
+    "_clock = _rt.clock",
+    "_num = _rt.num",
+    "_input = _rt.readLine",
+    "_newList = _rt.newList",
+    "_G.update(_rt.natives)",
+    "",
+]
+
+
+class Transpiler(ExprVisitor, StmtVisitor):
+    def __init__(self) -> None:
+        # filled by the Resolver
+        self.locals = {}
+
+    def resolve(self, expr, depth, slot):
+        self.locals[expr] = depth
+
+    def transpile(self, statements: 'list[Stmt]', sourceName: str) -> str:
+        self.analyzer = ScopeAnalyzer(self.locals)
+        self.analyzer.analyze(statements)
+        self.directFunctions = self.findDirectFunctions()
+
+        self.body: 'list[str]' = []
+        self.lineMap = {}
+        self.nameMap = {}
+        self.pendingNames = []
+        self.functionNames = {}
+        self.indent = 1
+        self.line = 1
+        self.loopDepth = 0
+        self.inInitializer = False
+        self.temps = 0
+
+        globalNames = sorted("g_" + name for name in self.analyzer.globalDecls)
+        if globalNames:
+            self.emit("global " + ", ".join(globalNames))
+        self.emitBody(statements)
+
+        out = [f"# generated by pylox build from {os.path.basename(sourceName)}, do not edit"]
+        out += header
+        out.append("def _main():")
+        offset = len(out) + 1
+        out += self.body
+        out.append("")
+        out.append(f"_rt.functionNames.update({self.functionNames!r})")
+        out.append(f"_LINES = {({index + offset: line for index, line in self.lineMap.items()})!r}")
+        out.append(f"_NAMES = {({(index + offset, name): line for (index, name), line in self.nameMap.items()})!r}")
+        out.append("")
+        out.append('if __name__ == "__main__":')
+        out.append("    _rt.run(_main, _LINES, _NAMES)")
+        out.append("")
+        return "\n".join(out)
+
+    def findDirectFunctions(self) -> 'dict[str, int]':
+        """ globals that always hold the same function can be called without _call,
+            name -> arity, -1 for the natives """
+        direct = {}
+        for name, decls in self.analyzer.globalDecls.items():
+            if len(decls) == 1 and isinstance(decls[0], Function) and name not in self.analyzer.globalAssigns:
+                direct[name] = len(decls[0].params)
+        for name in natives:
+            if name not in self.analyzer.globalDecls and name not in self.analyzer.globalAssigns:
+                direct[name] = -1
+        return direct
+
+# ----------- emitting ------------------
+
+    def emit(self, text: str):
+        index = len(self.body)
+        self.body.append("    " * self.indent + text)
+        self.lineMap[index] = self.line
+        for name, line in self.pendingNames:
+            self.nameMap[(index, name)] = line
+        self.pendingNames = []
+
+    def emitBody(self, statements: 'list[Stmt]'):
+        start = len(self.body)
+        for stmt in statements:
+            self.statement(stmt)
+        if len(self.body) == start:
+            self.emit("pass")
+
+    def statement(self, stmt: Stmt):
+        line = firstLine(stmt)
+        if line is not None:
+            self.line = line
+        stmt.accept(self)
+
+    def expr(self, expr: Expr) -> str:
+        return expr.accept(self)
+
+    def condition(self, expr: Expr) -> str:
+        if isBool(expr):
+            return self.expr(expr)
+        return f"_truthy({self.expr(expr)})"
+
+    def temp(self) -> str:
+        self.temps += 1
+        return f"_t{self.temps}"
+
+    def emitFunction(self, node, pyName: str, body: 'list[Stmt]', isMethod: bool = False, isInitializer: bool = False):
+        info = self.analyzer.functions[node]
+        params = ["this"] if isMethod else []
+        params += [param.pyName for param in self.analyzer.paramsOf[node]]
+        boxed = sorted(local.pyName for local in info.freeVars if local.boxed)
+        signature = ", ".join(params)
+        if boxed:
+            signature += (", " if params else "") + "*, " + ", ".join(f"{name}={name}" for name in boxed)
+
+        # the body has its own lines and loops
+        saved = (self.pendingNames, self.loopDepth, self.inInitializer, self.line)
+        self.pendingNames, self.loopDepth, self.inInitializer = [], 0, isInitializer
+
+        self.emit(f"def {pyName}({signature}):")
+        self.indent += 1
+        nonlocals = sorted(local.pyName for local in info.assignedFree if not local.boxed)
+        if nonlocals:
+            self.emit("nonlocal " + ", ".join(nonlocals))
+        if info.globalWrites:
+            self.emit("global " + ", ".join(sorted("g_" + name for name in info.globalWrites)))
+        if isInitializer:
+            for stmt in body:
+                self.statement(stmt)
+            self.emit("return this")
+        else:
+            self.emitBody(body)
+        self.indent -= 1
+
+        self.pendingNames, self.loopDepth, self.inInitializer, self.line = saved
+
+    def declare(self, stmt: Stmt, name: Token):
+        """ python name a declaration binds, boxed locals get their box first """
+        local = self.analyzer.declOf.get(stmt)
+        if local is None:
+            return "g_" + name.lexeme, None
+        if local.boxed:
+            self.emit(f"{local.pyName} = [None]")
+        return local.pyName, local
+
+# ----------- statements -------------
+
+    def visitBlockStmt(self, stmt: Block):
+        for statement in stmt.statements:
+            self.statement(statement)
+
+    def visitClassStmt(self, stmt: Class):
+        target, local = self.declare(stmt, stmt.name)
+        className = f"_c_{target}" if local is not None and local.boxed else target
+
+        base = "_LoxObject"
+        if stmt.superclass != None:
+            base = f"_superclass({self.expr(stmt.superclass)}, {stmt.superclass.name.line})"
+
+        self.emit(f"class {className}({base}):")
+        self.indent += 1
+        self.emit(f"_loxName = {stmt.name.lexeme!r}")
+        for method in stmt.methods:
+            self.line = method.name.line
+            isInitializer = method.name.lexeme == "init"
+            self.emitFunction(method, "f_" + method.name.lexeme, method.body, True, isInitializer)
+        self.indent -= 1
+
+        if className != target:
+            self.emit(f"{target}[0] = {className}")
+
+    def visitVarStmt(self, stmt: Var):
+        target, local = self.declare(stmt, stmt.name)
+        value = "None" if stmt.initializer == None else self.expr(stmt.initializer)
+        if local is not None and local.boxed:
+            self.emit(f"{target}[0] = {value}")
+        else:
+            self.emit(f"{target} = {value}")
+
+    def visitFunctionStmt(self, stmt: Function):
+        target, local = self.declare(stmt, stmt.name)
+        if local is not None and local.boxed:
+            self.emitFunction(stmt, f"_f_{target}", stmt.body)
+            self.functionNames[f"_f_{target}"] = stmt.name.lexeme
+            self.emit(f"{target}[0] = _f_{target}")
+            return
+        self.emitFunction(stmt, target, stmt.body)
+        self.functionNames[target] = stmt.name.lexeme
+
+    def visitExpressionStmt(self, stmt: Expression):
+        self.emitExpression(stmt.expression)
+
+    def emitExpression(self, expr: Expr):
+        if isinstance(expr, Assign):
+            self.emit(self.assign(expr, True))
+            return
+        self.emit(self.expr(expr))
+
+    def visitIfStmt(self, stmt: If):
+        self.emit(f"if {self.condition(stmt.condition)}:")
+        self.indent += 1
+        self.emitBody([stmt.thenBranch])
+        self.indent -= 1
+        if stmt.elseBranch != None:
+            self.emit("else:")
+            self.indent += 1
+            self.emitBody([stmt.elseBranch])
+            self.indent -= 1
+
+    def visitWhileStmt(self, stmt: While):
+        if stmt.increment != None and hasContinue(stmt.body):
+            self.emitForContinue(stmt)
+            return
+
+        self.emit(f"while {self.condition(stmt.condition)}:")
+        self.indent += 1
+        self.loopDepth += 1
+        self.emitBody([stmt.body])
+        if stmt.increment != None:
+            self.emitExpression(stmt.increment)
+        self.loopDepth -= 1
+        self.indent -= 1
+
+    def emitForContinue(self, stmt: While):
+        # a python continue would skip an increment at the end of the body,
+        # so it goes first and is skipped on the first iteration
+        started = self.temp()
+        self.emit(f"{started} = False")
+        self.emit("while True:")
+        self.indent += 1
+        self.loopDepth += 1
+        self.emit(f"if {started}:")
+        self.indent += 1
+        self.emitExpression(stmt.increment)
+        self.indent -= 1
+        self.emit(f"{started} = True")
+        self.emit(f"if not ({self.condition(stmt.condition)}):")
+        self.emit("    break")
+        self.emitBody([stmt.body])
+        self.loopDepth -= 1
+        self.indent -= 1
+
+    def visitStopiterStmt(self, stmt: StopIter):
+        self.emit("break" if stmt.name.type == TokenType.BREAK else "continue")
+
+    def visitPrintStmt(self, stmt: Print):
+        self.emit(f"print(_str({self.expr(stmt.expression)}))")
+
+    def visitReturnStmt(self, stmt: Return):
+        if self.inInitializer:
+            self.emit("return this")
+        elif stmt.value == None:
+            self.emit("return None")
+        else:
+            self.emit(f"return {self.expr(stmt.value)}")
+
+# ----------- expressions ------------
+
+    def assign(self, expr: Assign, isStatement: bool = False) -> str:
+        value = self.expr(expr.value)
+        local = self.analyzer.varOf.get(expr)
+        if local is None:
+            if expr not in self.analyzer.definedAssigns:
+                return f"_setGlobal(_G, 'g_{expr.name.lexeme}', {value}, {expr.name.line})"
+            if isStatement:
+                return f"g_{expr.name.lexeme} = {value}"
+            return f"(g_{expr.name.lexeme} := {value})"
+        if local.boxed:
+            if isStatement:
+                return f"{local.pyName}[0] = {value}"
+            return f"_setBox({local.pyName}, {value})"
+        if isStatement:
+            return f"{local.pyName} = {value}"
+        return f"({local.pyName} := {value})"
+
+    def visitAssignExpr(self, expr: Assign):
+        return self.assign(expr)
+
+    def variable(self, expr: Expr, name: Token) -> str:
+        local = self.analyzer.varOf.get(expr)
+        if local is None:
+            self.pendingNames.append((f"g_{name.lexeme}", name.line))
+            return f"g_{name.lexeme}"
+        if local.boxed:
+            return f"{local.pyName}[0]"
+        return local.pyName
+
+    def visitVariableExpr(self, expr: Variable):
+        return self.variable(expr, expr.name)
+
+    def visitThisExpr(self, expr: This):
+        return "this"
+
+    def visitLiteralExpr(self, expr: Literal):
+        if isinstance(expr.value, float) and (expr.value != expr.value or expr.value in (float("inf"), float("-inf"))):
+            return f"float({str(expr.value)!r})"
+        return repr(expr.value)
+
+    def visitLogicalExpr(self, expr: Logical):
+        left = self.expr(expr.left)
+        right = self.expr(expr.right)
+        if isBool(expr.left):
+            op = "or" if expr.operator.type == TokenType.OR else "and"
+            return f"({left} {op} {right})"
+
+        temp = self.temp()
+        if expr.operator.type == TokenType.OR:
+            return f"({temp} if _truthy({temp} := {left}) else {right})"
+        return f"({right} if _truthy({temp} := {left}) else {temp})"
+
+    def visitSetExpr(self, expr: Set):
+        return f"_setProperty({self.expr(expr.obj)}, 'f_{expr.name.lexeme}', {self.expr(expr.value)}, {expr.name.line})"
+
+    def visitSuperExpr(self, expr: Super):
+        return f"_getSuper(__class__, this, 'f_{expr.method.lexeme}', {expr.method.line})"
+
+    def visitGroupingExpr(self, expr: Grouping):
+        return f"({self.expr(expr.expression)})"
+
+    def visitUnaryExpr(self, expr: Unary):
+        if expr.operator.type == TokenType.MINUS:
+            return f"_neg({self.expr(expr.right)}, {expr.operator.line})"
+        return f"(not {self.condition(expr.right)})"
+
+    def visitBinaryExpr(self, expr: Binary):
+        left = self.expr(expr.left)
+        right = self.expr(expr.right)
+        optype = expr.operator.type
+        if optype == TokenType.EQUAL_EQUAL:
+            return f"({left} == {right})"
+        if optype == TokenType.BANG_EQUAL:
+            return f"({left} != {right})"
+        return f"{numberHelpers[optype]}({left}, {right}, {expr.operator.line})"
+
+    def visitCallExpr(self, expr: Call):
+        line = expr.paren.line
+        callee = expr.callee
+
+        if isinstance(callee, Get):
+            obj = self.expr(callee.object)
+            args = "".join(", " + self.expr(arg) for arg in expr.arguments)
+            return f"_invoke({obj}, 'f_{callee.name.lexeme}', {callee.name.line}{args})"
+
+        function = self.expr(callee)
+        args = ", ".join(self.expr(arg) for arg in expr.arguments)
+        count = len(expr.arguments)
+
+        if isinstance(callee, Variable):
+            local = self.analyzer.varOf.get(callee)
+            name = callee.name.lexeme
+            if local is None and self.directFunctions.get(name) == -1:
+                # natives
+                if name == "clock" and count == 0:
+                    return "_clock()"
+                if name == "list" and count == 0:
+                    return "_newList()"
+                if name == "input" and count == 0:
+                    return "_input()"
+                if name == "num" and count == 1:
+                    return f"_num({args}, {line})"
+            elif local is None and self.directFunctions.get(name) == count:
+                return f"{function}({args})"
+            elif local is not None and local.kind == "function" and not local.assigned \
+                    and not local.boxed and local.arity == count:
+                return f"{function}({args})"
+
+        if args:
+            args = ", " + args
+        return f"_call({line}, {function}{args})"
+
+    def visitGetExpr(self, expr: Get):
+        return f"_getProperty({self.expr(expr.object)}, 'f_{expr.name.lexeme}', {expr.name.line})"
+
+    def visitIndexExpr(self, expr: Index):
+        return f"_getIndex({self.expr(expr.object)}, {self.expr(expr.index)}, {expr.bracket.line})"
+
+    def visitSetindexExpr(self, expr: SetIndex):
+        return f"_setIndex({self.expr(expr.object)}, {self.expr(expr.index)}, {self.expr(expr.value)}, {expr.bracket.line})"
+
+    def visitLambdaExpr(self, expr: Lambda):
+        self.temps += 1
+        name = f"_lambda{self.temps}"
+        self.emitFunction(expr, name, expr.body)
+        return name
@@ -0,0 +1,444 @@
+from Token import TokenType, Token
+from Stmt import Stmt
+from Chunk import *
+from Object import ObjFunction, ObjClosure, ObjUpvalue, ObjBoundMethod
+from Compiler import Compiler
+from LoxCallable import LoxCallable, LoxClass, LoxInstance, LoxListInstance, getIndex, setIndex
+import Interpreter
+from Interpreter import stringify, INTERN_LIMIT
+from sys import intern
+import pylox
+
+# stack based bytecode VM, python version of clox/vm.c
+# values live on one python list, call frames only remember where their slots start
+
+FRAMES_MAX = 4096
+
+class CallFrame:
+    __slots__ = ("closure", "ip", "base")
+
+    def __init__(self, closure: ObjClosure, base: int) -> None:
+        self.closure = closure
+        self.ip = 0
+        self.base = base
+
+
+class VM:
+    def __init__(self) -> None:
+        self.globals = Interpreter.initialGlobals()
+        # filled by the Resolver, the compiler resolves variables on its own
+        self.locals = {}
+        # pylox --stack-limit
+        self.maxCallDepth = FRAMES_MAX
+
+        self.stack = []
+        self.frames: 'list[CallFrame]' = []
+        # stack index -> open upvalue pointing at it
+        self.openUpvalues: 'dict[int, ObjUpvalue]' = {}
+
+    def resolve(self, expr, depth, slot):
+        pass
+
+    def unresolve(self, expr):
+        pass
+
+    def interpret(self, statements: 'list[Stmt]'):
+        function: ObjFunction = Compiler().compile(statements)
+        if function is None:
+            return None
+
+        closure = ObjClosure(function, [])
+        self.stack.append(closure)
+        self.frames.append(CallFrame(closure, 0))
+        try:
+            self.run()
+        except pylox.LoxRuntimeError as error:
+            self.resetStack()
+            pylox.runtimeError(error)
+        return None
+
+    def resetStack(self):
+        self.stack.clear()
+        self.frames.clear()
+        self.openUpvalues.clear()
+
+    def runtimeError(self, line: int, mess: str):
+        return pylox.LoxRuntimeError(Token(TokenType.ERROR, "", None, line), mess)
+
+    def captureUpvalue(self, index: int) -> ObjUpvalue:
+        upvalue = self.openUpvalues.get(index)
+        if upvalue is None:
+            upvalue = self.openUpvalues[index] = ObjUpvalue(index)
+        return upvalue
+
+    def closeUpvalues(self, last: int):
+        stack = self.stack
+        for index in [index for index in self.openUpvalues if index >= last]:
+            upvalue = self.openUpvalues.pop(index)
+            upvalue.value = stack[index]
+            upvalue.index = -1
+
+    def globalCell(self, globals: dict, name: str, line: int):
+        # cells are never replaced, so a chunk can keep the one it found
+        cell = globals.get(name)
+        if cell is None:
+            raise self.runtimeError(line, f"Undefined variable '{name}'.")
+        return cell
+
+    def run(self):
+        stack = self.stack
+        frames = self.frames
+        globals = self.globals.cells
+        # the dict is never replaced, closeUpvalues and resetStack change it in place
+        openUpvalues = self.openUpvalues
+        push = stack.append
+        pop = stack.pop
+
+        frame = frames[-1]
+        closure = frame.closure
+        chunk = closure.function.chunk
+        code = chunk.code
+        constants = chunk.constants
+        cells = chunk.globalCells
+        ip = frame.ip
+        base = frame.base
+
+        while True:
+            op = code[ip]
+            ip += 1
+
+            # most frequent instructions first
+            if op == OP_GET_LOCAL:
+                push(stack[base + code[ip]])
+                ip += 1
+
+            elif op == OP_CONSTANT:
+                push(constants[(code[ip] << 8) | code[ip + 1]])
+                ip += 2
+
+            elif op == OP_GET_GLOBAL:
+                index = (code[ip] << 8) | code[ip + 1]
+                ip += 2
+                cell = cells[index]
+                if cell is None:
+                    cell = cells[index] = self.globalCell(globals, constants[index], chunk.lines[ip - 1])
+                push(cell.value)
+
+            elif op == OP_SET_GLOBAL:
+                index = (code[ip] << 8) | code[ip + 1]
+                ip += 2
+                cell = cells[index]
+                if cell is None:
+                    cell = cells[index] = self.globalCell(globals, constants[index], chunk.lines[ip - 1])
+                cell.value = stack[-1]
+
+            elif op == OP_JUMP_IF_FALSE:
+                value = stack[-1]
+                if value is None or value is False:
+                    ip += ((code[ip] << 8) | code[ip + 1]) + 2
+                else:
+                    ip += 2
+
+            elif op == OP_POP:
+                pop()
+
+            elif op == OP_SET_LOCAL:
+                stack[base + code[ip]] = stack[-1]
+                ip += 1
+
+            elif op == OP_ADD:
+                b = pop()
+                a = stack[-1]
+                if a.__class__ is float and b.__class__ is float:
+                    stack[-1] = a + b
+                elif a.__class__ is str and b.__class__ is str:
+                    text = a + b
+                    stack[-1] = intern(text) if len(text) <= INTERN_LIMIT else text
+                else:
+                    raise self.runtimeError(chunk.lines[ip - 1], "Operands must be two number or two strings")
+
+            elif op == OP_LESS:
+                b = pop()
+                a = stack[-1]
+                if a.__class__ is float and b.__class__ is float:
+                    stack[-1] = a < b
+                else:
+                    raise self.runtimeError(chunk.lines[ip - 1], "Operands must be numbers")
+
+            elif op == OP_SUBTRACT:
+                b = pop()
+                a = stack[-1]
+                if a.__class__ is float and b.__class__ is float:
+                    stack[-1] = a - b
+                else:
+                    raise self.runtimeError(chunk.lines[ip - 1], "Operands must be numbers")
+
+            elif op == OP_LOOP:
+                ip += 2 - ((code[ip] << 8) | code[ip + 1])
+
+            elif op == OP_JUMP:
+                ip += ((code[ip] << 8) | code[ip + 1]) + 2
+
+            elif op == OP_CALL or op == OP_INVOKE or op == OP_SUPER_INVOKE:
+                if op == OP_CALL:
+                    argCount = code[ip]
+                    ip += 1
+                    callee = stack[-1 - argCount]
+
+                elif op == OP_INVOKE:
+                    name = constants[(code[ip] << 8) | code[ip + 1]]
+                    argCount = code[ip + 2]
+                    ip += 3
+                    receiver = stack[-1 - argCount]
+                    if receiver.__class__ is LoxInstance:
+                        # fields shadow methods, a method is called without binding it
+                        index = receiver.shape.slots.get(name.lexeme)
+                        if index is not None:
+                            callee = stack[-1 - argCount] = receiver.values[index]
+                        else:
+                            callee = receiver.klass.methods.get(name.lexeme)
+                            if callee is None:
+                                raise pylox.LoxRuntimeError(name, f"Undefined property '{name.lexeme}'.")
+                    elif isinstance(receiver, LoxInstance):
+                        callee = stack[-1 - argCount] = receiver.get(name)
+                    else:
+                        raise pylox.LoxRuntimeError(name, "Only instances have properties.")
+
+                else:
+                    name = constants[(code[ip] << 8) | code[ip + 1]]
+                    argCount = code[ip + 2]
+                    ip += 3
+                    superclass = pop()
+                    callee = superclass.methods.get(name.lexeme)
+                    if callee is None:
+                        raise pylox.LoxRuntimeError(name, f"Undefined property '{name.lexeme}.")
+
+                if callee.__class__ is ObjBoundMethod:
+                    stack[-1 - argCount] = callee.receiver
+                    callee = callee.method
+                elif callee.__class__ is LoxClass:
+                    stack[-1 - argCount] = LoxInstance(callee)
+                    initializer = callee.methods.get("init")
+                    if initializer is None:
+                        if argCount != 0:
+                            raise self.runtimeError(chunk.lines[ip - 1], f"Exprcted 0 arguments but got {argCount}.")
+                        continue
+                    callee = initializer
+
+                if callee.__class__ is ObjClosure:
+                    function = callee.function
+                    if argCount != function.arity:
+                        raise self.runtimeError(chunk.lines[ip - 1], f"Exprcted {function.arity} arguments but got {argCount}.")
+
+                    if code[ip] == OP_RETURN and frames[-1] is not frames[0]:
+                        # tail call, the callee and its arguments take the place of this frame
+                        if openUpvalues:
+                            self.closeUpvalues(base)
+                        stack[base:] = stack[len(stack) - argCount - 1:]
+                        frame.closure = callee
+                    else:
+                        if len(frames) >= self.maxCallDepth:
+                            raise self.runtimeError(chunk.lines[ip - 1], "Stack overflow.")
+                        frame.ip = ip
+                        frame = CallFrame(callee, len(stack) - argCount - 1)
+                        frames.append(frame)
+                    closure = callee
+                    chunk = function.chunk
+                    code = chunk.code
+                    constants = chunk.constants
+                    cells = chunk.globalCells
+                    ip = 0
+                    base = frame.base
+
+                elif isinstance(callee, LoxCallable):
+                    # native functions and list methods
+                    if argCount != callee.arity():
+                        raise self.runtimeError(chunk.lines[ip - 1], f"Exprcted {callee.arity()} arguments but got {argCount}.")
+                    arguments = stack[len(stack) - argCount:]
+                    try:
+                        result = callee.call(self, arguments)
+                    except pylox.NativeFuncError as err:
+                        raise self.runtimeError(chunk.lines[ip - 1], err.mess)
+                    del stack[len(stack) - argCount - 1:]
+                    push(result)
+
+                else:
+                    raise self.runtimeError(chunk.lines[ip - 1], "Can only call functions and classes.")
+
+            elif op == OP_RETURN:
+                result = pop()
+                if openUpvalues:
+                    self.closeUpvalues(base)
+                frames.pop()
+                if not frames:
+                    # pop the script closure
+                    pop()
+                    return
+
+                del stack[base:]
+                push(result)
+                frame = frames[-1]
+                closure = frame.closure
+                chunk = closure.function.chunk
+                code = chunk.code
+                constants = chunk.constants
+                cells = chunk.globalCells
+                ip = frame.ip
+                base = frame.base
+
+            elif op == OP_GET_UPVALUE:
+                upvalue = closure.upvalues[code[ip]]
+                ip += 1
+                push(stack[upvalue.index] if upvalue.index >= 0 else upvalue.value)
+
+            elif op == OP_GET_INDEX:
+                index = pop()
+                instance = stack[-1]
+                if instance.__class__ is LoxListInstance:
+                    items = instance.list
+                    if index.__class__ is float and index.is_integer() and -len(items) <= index < len(items):
+                        stack[-1] = items[int(index)]
+                        continue
+                # f64arrays, and the errors
+                try:
+                    stack[-1] = getIndex(instance, index)
+                except pylox.NativeFuncError as err:
+                    raise self.runtimeError(chunk.lines[ip - 1], err.mess)
+
+            elif op == OP_SET_INDEX:
+                value = pop()
+                index = pop()
+                instance = stack[-1]
+                if instance.__class__ is LoxListInstance:
+                    items = instance.list
+                    if index.__class__ is float and index.is_integer() and -len(items) <= index < len(items):
+                        items[int(index)] = value
+                        stack[-1] = value
+                        continue
+                try:
+                    stack[-1] = setIndex(instance, index, value)
+                except pylox.NativeFuncError as err:
+                    raise self.runtimeError(chunk.lines[ip - 1], err.mess)
+
+            elif op == OP_GET_PROPERTY:
+                name = constants[(code[ip] << 8) | code[ip + 1]]
+                ip += 2
+                instance = stack[-1]
+                if not isinstance(instance, LoxInstance):
+                    raise pylox.LoxRuntimeError(name, "Only instances have properties.")
+                stack[-1] = instance.get(name)
+
+            elif op == OP_SET_PROPERTY:
+                name = constants[(code[ip] << 8) | code[ip + 1]]
+                ip += 2
+                value = pop()
+                instance = stack[-1]
+                if not isinstance(instance, LoxInstance):
+                    raise pylox.LoxRuntimeError(name, "Only instances have fields")
+                instance.set(name, value)
+                stack[-1] = value
+
+            elif op == OP_SET_UPVALUE:
+                upvalue = closure.upvalues[code[ip]]
+                ip += 1
+                if upvalue.index >= 0:
+                    stack[upvalue.index] = stack[-1]
+                else:
+                    upvalue.value = stack[-1]
+
+            elif op == OP_DEFINE_GLOBAL:
+                self.globals.define(constants[(code[ip] << 8) | code[ip + 1]], pop())
+                ip += 2
+
+            elif op == OP_NIL:
+                push(None)
+            elif op == OP_TRUE:
+                push(True)
+            elif op == OP_FALSE:
+                push(False)
+
+            elif op == OP_EQUAL:
+                b = pop()
+                stack[-1] = b == stack[-1]
+            elif op == OP_NOT_EQUAL:
+                b = pop()
+                stack[-1] = not (b == stack[-1])
+
+            elif op == OP_GREATER or op == OP_GREATER_EQUAL or op == OP_LESS_EQUAL \
+                    or op == OP_MULTIPLY or op == OP_DIVIDE:
+                b = pop()
+                a = stack[-1]
+                if a.__class__ is not float or b.__class__ is not float:
+                    raise self.runtimeError(chunk.lines[ip - 1], "Operands must be numbers")
+                if op == OP_GREATER:
+                    stack[-1] = a > b
+                elif op == OP_GREATER_EQUAL:
+                    stack[-1] = a >= b
+                elif op == OP_LESS_EQUAL:
+                    stack[-1] = a <= b
+                elif op == OP_MULTIPLY:
+                    stack[-1] = a * b
+                else:
+                    stack[-1] = a / b
+
+            elif op == OP_NOT:
+                value = stack[-1]
+                stack[-1] = value is None or value is False
+
+            elif op == OP_NEGATE:
+                value = stack[-1]
+                if value.__class__ is not float:
+                    raise self.runtimeError(chunk.lines[ip - 1], "Operand must be a number")
+                stack[-1] = -value
+
+            elif op == OP_PRINT:
+                print(stringify(pop()))
+
+            elif op == OP_CLOSURE:
+                function = constants[(code[ip] << 8) | code[ip + 1]]
+                ip += 2
+                upvalues = []
+                for _ in range(function.upvalueCount):
+                    if code[ip]:
+                        upvalues.append(self.captureUpvalue(base + code[ip + 1]))
+                    else:
+                        upvalues.append(closure.upvalues[code[ip + 1]])
+                    ip += 2
+                push(ObjClosure(function, upvalues, function.name is None))
+
+            elif op == OP_CLOSE_UPVALUE:
+                self.closeUpvalues(len(stack) - 1)
+                pop()
+
+            elif op == OP_GET_SUPER:
+                name = constants[(code[ip] << 8) | code[ip + 1]]
+                ip += 2
+                superclass = pop()
+                method = superclass.methods.get(name.lexeme)
+                if method is None:
+                    raise pylox.LoxRuntimeError(name, f"Undefined property '{name.lexeme}.")
+                stack[-1] = ObjBoundMethod(stack[-1], method)
+
+            elif op == OP_CLASS:
+                push(LoxClass(constants[(code[ip] << 8) | code[ip + 1]], None, {}))
+                ip += 2
+
+            elif op == OP_INHERIT:
+                superclass = stack[-2]
+                if not isinstance(superclass, LoxClass):
+                    raise self.runtimeError(chunk.lines[ip - 1], "Superclass must be a class")
+                subclass = pop()
+                # copy-down inheritance, methods defined afterwards override these
+                subclass.methods.update(superclass.methods)
+                subclass.superclass = superclass
+
+            elif op == OP_METHOD:
+                method = pop()
+                stack[-1].methods[constants[(code[ip] << 8) | code[ip + 1]]] = method
+                ip += 2
+
+            elif op == OP_RUNTIME_ERROR:
+                raise self.runtimeError(chunk.lines[ip - 1], constants[(code[ip] << 8) | code[ip + 1]])
+
+            else:
+                raise self.runtimeError(chunk.lines[ip - 1], f"Unknown opcode {op}.")
@@ -1,57 +1,120 @@
 import sys
-import Scanner
+import os
+import time
 from Token import Token, TokenType
-import Parser
-import AstPrinter
 import Interpreter
-import Resolver
+import Modules
 from Flags import Flags
+# Scanner, Parser, Resolver, Optimizer and LoxCache are imported where they are
+# used: a script that runs from __loxcache__ never scans, parses or resolves
 
 Flags = Flags()
 
 # globals ? idk java thing
-interpreter = Interpreter.Interpreter()
+# the interpreter run() and friends use, main() makes it (and so does Bench)
+interpreter = None
 
-class LoxRuntimeError(RuntimeError):
-    def __init__(self, token:Token, mess:str) -> None:
-        self.token = token
-        self.mess = mess 
-        
-class NativeFuncError(LoxRuntimeError):
-    def __init__(self, mess: str) -> None:
-        self.mess = mess
+# the exceptions are defined with the natives, which raise them too
+from LoxNatives import LoxRuntimeError, NativeFuncError
 
-class LoxBreakIter(LoxRuntimeError):
-    def __init__(self, token: Token, mess: str) -> None:
-        super().__init__(token, mess)
-class LoxContinueIter(LoxRuntimeError):
-    def __init__(self, token: Token, mess: str) -> None:
-        super().__init__(token, mess)
 
-class ReturnExep(RuntimeError):
-    def __init__(self, value) -> None:
-        self.value = value
+backends = ["tree", "closure", "vm"]
+
+def makeInterpreter(backend: str):
+    if backend == "closure":
+        import ClosureInterpreter
+        return ClosureInterpreter.ClosureInterpreter()
+    if backend == "vm":
+        import VM
+        return VM.VM()
+    return Interpreter.Interpreter()
+
+
+scanners = ["regex", "char"]
+
+def makeScanner(source: str, scanner: str = None):
+    import Scanner
+    if (scanner or Flags.scanner) == "char":
+        return Scanner.Scanner(source)
+    return Scanner.RegexScanner(source)
+
+def makeParser(source: str, REPLmode = False, scanner: str = None):
+    # the regex scanner fills a columnar TokenBuffer, read by index by BufferParser
+    import Scanner
+    import Parser
+    if (scanner or Flags.scanner) == "char":
+        return Parser.Parser(Scanner.Scanner(source).scanTokens(), inREPLmode = REPLmode)
+    return Parser.BufferParser(Scanner.RegexScanner(source).scanBuffer(), inREPLmode = REPLmode)
+
+
+def parseArgs(argv: 'list[str]'):
+    # split argv into "--name=value" / "-X" options and positional arguments
+    options = {}
+    args = []
+    for arg in argv:
+        if arg.startswith("-"):
+            name, _, value = arg.lstrip("-").partition("=")
+            options[name] = value
+        else:
+            args.append(arg)
+    return options, args
 
 
 def main():
-    global hadError, hadRuntimeError
+    global hadError, hadRuntimeError, interpreter
     hadError = False
     hadRuntimeError = False
-    if len(sys.argv) > 2:
-        print("Usage: pylox [script]")
+    options, args = parseArgs(sys.argv[1:])
+    backend = options.get("backend", "tree")
+    Flags.optimize = "O" in options
+    Flags.scanner = options.get("scanner", "regex")
+    Flags.cache = "no-cache" not in options
+    Modules.loader.options = (Flags.optimize, Flags.scanner, Flags.cache)
+    if "startup-bench" in options:
+        import Bench
+        Bench.benchStartup(args, options)
+        return
+    if len(args) == 2 and args[0] == "build":
+        build(args[1], options.get("out"))
+        return
+    if len(args) > 1 or backend not in backends or Flags.scanner not in scanners:
+        print("Usage: pylox [-O] [--stats] [--stack-limit=N] [--backend=tree|closure|vm] [--scanner=regex|char] [--stream] [--no-cache] [script]")
+        print("       pylox build [-O] [--out=file.py] script")
+        print("       pylox --startup-bench [--repeat=N] [pylox options] [script]")
         sys.exit(64)
 
-    elif len(sys.argv) == 2:
-        runFile(sys.argv[1])
-    else:
-        runPrompt()
+    interpreter = makeInterpreter(backend)
+    if "stack-limit" in options:
+        interpreter.maxCallDepth = int(options["stack-limit"])
+    try:
+        if len(args) == 1 and "stream" in options:
+            runStream(args[0])
+        elif len(args) == 1:
+            runFile(args[0])
+        else:
+            runPrompt()
+    finally:
+        if "stats" in options:
+            printStats()
+
+
+def printStats():
+    # quickened operator nodes, only the tree backend quickens
+    quickened = getattr(interpreter, "quickened", 0)
+    deoptimized = getattr(interpreter, "deoptimized", 0)
+    print(f"quickened nodes: {quickened}, deoptimized: {deoptimized}", file=sys.stderr)
 
 
 def runFile(path):
     infile = open(path)
     buffer = infile.read()
     infile.close()
-    run(buffer)
+    # a module importing the script does not run it again
+    Modules.loader.executed.add(os.path.abspath(path))
+    if Flags.cache:
+        runCached(path, buffer)
+    else:
+        run(buffer, path=path)
 
     if Flags.hadError:
         sys.exit(65)
@@ -59,6 +122,153 @@ def runFile(path):
         sys.exit(70)
 
 
+def runCached(path, source):
+    # run() through __loxcache__, the parsed and resolved program is stored the
+    # first time and loaded instead of scanning, parsing and resolving after that
+    import LoxCache
+    key = LoxCache.sourceKey(source)
+    program = LoxCache.load(path, Flags.optimize, key)
+    if program is not None:
+        stmt_list, resolved = program
+        for expr, depth, slot in resolved:
+            interpreter.resolve(expr, depth, slot)
+    else:
+        import Resolver
+        stmt_list = makeParser(source).parse()
+        if stmt_list == None:
+            return
+
+        recorder = LoxCache.ResolveRecorder(interpreter)
+        if Resolver.Resolver(recorder).firstResolve(stmt_list) or Flags.hadRuntimeError:
+            return
+        # after the Resolver, so code -O removes is still checked
+        if Flags.optimize:
+            import Optimizer
+            stmt_list = Optimizer.Optimizer().optimize(stmt_list)
+        # scanner errors do not stop a run, but such a program is not worth keeping
+        if not errorFlags().hadError:
+            LoxCache.store(path, Flags.optimize, key, (stmt_list, recorder.resolved))
+
+    if not loadImports(stmt_list, os.path.dirname(os.path.abspath(path))):
+        return
+    startupMark()
+    interpreter.interpret(stmt_list)
+
+
+def loadImports(stmt_list, directory: str) -> bool:
+    # the modules the statements import, and the ones those import, are
+    # compiled before anything runs, False when one of them has errors
+    return Modules.loader.preload(Modules.linkImports(stmt_list, directory))
+
+
+def runStream(path):
+    # the file is memory mapped and each top level declaration is resolved and run
+    # as soon as it is parsed, the whole source, token list and AST are never held
+    # at once. declarations before a syntax error have already run by then
+    import mmap
+    import Scanner
+    import Parser
+    infile = open(path, "rb")
+    try:
+        source = mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ)
+    except ValueError:
+        # an empty file can not be mapped
+        source = b""
+    tokens = Scanner.RegexScanner(source).tokenStream()
+    Modules.loader.executed.add(os.path.abspath(path))
+    try:
+        runDeclarations(Parser.Parser(tokens).declarations(), os.path.dirname(os.path.abspath(path)))
+    finally:
+        # the scanner holds on to the mapping until it is closed
+        tokens.close()
+        if isinstance(source, mmap.mmap):
+            source.close()
+        infile.close()
+
+    if Flags.hadError:
+        sys.exit(65)
+    if Flags.hadRuntimeError:
+        sys.exit(70)
+
+
+def runDeclarations(declarations, directory: str):
+    import Resolver
+    flags = errorFlags()
+    resolver = Resolver.Resolver(interpreter)
+    failed = False
+    for stmt in declarations:
+        # after a syntax error the rest is still parsed, for its errors, but not run
+        if failed or stmt is None or flags.hadError:
+            failed = True
+            continue
+        stmt_list = [stmt]
+        if resolver.firstResolve(stmt_list):
+            failed = True
+            continue
+        if Flags.optimize:
+            import Optimizer
+            stmt_list = Optimizer.Optimizer().optimize(stmt_list)
+        if not loadImports(stmt_list, directory):
+            failed = True
+            continue
+        startupMark()
+        interpreter.interpret(stmt_list)
+        if flags.hadRuntimeError:
+            return
+
+
+def startupMark():
+    # pylox --startup-bench starts scripts with the time.time_ns() it started them at
+    # in PYLOX_STARTUP_NS, how long until the first statement runs goes to stderr
+    started = os.environ.pop("PYLOX_STARTUP_NS", None)
+    if started is not None:
+        print(f"first statement after {(time.time_ns() - int(started)) / 1e6:.3f}ms", file=sys.stderr)
+
+
+def errorFlags():
+    # the rest of the interpreter reports errors through "import pylox", which
+    # is a second copy of this module when it is run as a script
+    return sys.modules.get("pylox", sys.modules[__name__]).Flags
+
+
+def build(path, out=None):
+    # transpile a script into a python module next to it, run it with python
+    import Transpiler
+    import Resolver
+    infile = open(path)
+    buffer = infile.read()
+    infile.close()
+
+    stmt_list = makeParser(buffer).parse()
+    if stmt_list == None or Flags.hadError:
+        sys.exit(65)
+    # the module is one program, imported modules are part of it
+    Modules.loader.executed.add(os.path.abspath(path))
+    if not loadImports(stmt_list, os.path.dirname(os.path.abspath(path))):
+        sys.exit(65)
+    stmt_list = Modules.loader.inline(stmt_list)
+
+    transpiler = Transpiler.Transpiler()
+    if Resolver.Resolver(transpiler).firstResolve(stmt_list) or Flags.hadError:
+        sys.exit(65)
+    if Flags.optimize:
+        import Optimizer
+        stmt_list = Optimizer.Optimizer().optimize(stmt_list)
+
+    if out is None:
+        out = os.path.splitext(path)[0] + ".py"
+    outfile = open(out, "w")
+    outfile.write(transpiler.transpile(stmt_list, path))
+    outfile.close()
+    # the module imports its runtime from its own directory, it runs wherever the three go
+    import shutil
+    here = os.path.dirname(os.path.abspath(__file__))
+    for name in Transpiler.runtimeFiles:
+        target = os.path.join(os.path.dirname(os.path.abspath(out)), name)
+        if os.path.abspath(os.path.join(here, name)) != target:
+            shutil.copyfile(os.path.join(here, name), target)
+
+
 def runPrompt():
     while True:
         print("> ", end="")
@@ -70,27 +280,29 @@ def runPrompt():
             break
 
 
-def run(source, REPLmode = False):
-    scanner = Scanner.Scanner(source)
-    tokens:'list[Token]' = scanner.scanTokens()
-
-    # for token in tokens:
-    #     print(token)
-
-    stmt_list = Parser.Parser(tokens, inREPLmode = REPLmode).parse()
+def run(source, REPLmode = False, path = None):
+    import Resolver
+    stmt_list = makeParser(source, REPLmode).parse()
 
     if stmt_list == None:
         return
 
     resolver = Resolver.Resolver(interpreter)
     resolver_had_error = resolver.firstResolve(stmt_list)
+    if Flags.optimize and not resolver_had_error:
+        import Optimizer
+        stmt_list = Optimizer.Optimizer().optimize(stmt_list)
 
     # hopefully catch errors made inside the Resolver
     # FIXME could make it so it returns an error value if something went wrong
     # so everytime pylox.error is called
     if Flags.hadRuntimeError or resolver_had_error:
         return
+    # imports are relative to the script, in the REPL to the current directory
+    if not loadImports(stmt_list, os.path.dirname(os.path.abspath(path)) if path else os.getcwd()):
+        return
 
+    startupMark()
     out_str = interpreter.interpret(stmt_list)
     if Flags.hadRuntimeError or out_str is None:
         return
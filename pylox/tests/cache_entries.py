@@ -0,0 +1,40 @@
+# __loxcache__ entries are only used for the source and CACHE_VERSION they were made
+# with, and writing one never fails a run or leaves a temporary file behind
+import os
+import sys
+import shutil
+import tempfile
+import subprocess
+here = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, here)
+import LoxCache
+
+directory = tempfile.mkdtemp()
+script = os.path.join(directory, "script.lox")
+
+def run(source: str):
+    with open(script, "w") as outfile:
+        outfile.write(source)
+    subprocess.run([sys.executable, os.path.join(here, "pylox.py"), script])
+    sys.stdout.flush()
+
+try:
+    run('print "one";\n')
+    # same length, a stale key has to be noticed by its checksum
+    run('print "two";\n')
+    source = open(script).read()
+    print(LoxCache.load(script, False, LoxCache.sourceKey(source)) is not None)
+    LoxCache.CACHE_VERSION += 1
+    print(LoxCache.load(script, False, LoxCache.sourceKey(source)) is None)
+
+    # a program that can not be pickled (a TypeError here) is not cached, and nothing is raised
+    LoxCache.store(script, False, "key", (value for value in ()))
+    entries = os.listdir(os.path.join(directory, LoxCache.CACHE_DIR))
+    print([name for name in entries if name.endswith(".tmp") or f"-{LoxCache.CACHE_VERSION}" in name])
+finally:
+    shutil.rmtree(directory)
+# expect: one
+# expect: two
+# expect: True
+# expect: True
+# expect: []
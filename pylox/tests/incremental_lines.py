@@ -0,0 +1,21 @@
+# a reused declaration below an edit that adds lines reports errors on its new line,
+# after it was interpreted and its operator nodes were quickened
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import pylox
+import Incremental
+
+source = """var x = 3;
+fun f(a, b) {
+  return a - b;
+}
+print f(x, 1);
+"""
+pylox.interpreter = pylox.makeInterpreter("tree")
+session = Incremental.Incremental(pylox.interpreter)
+pylox.interpreter.interpret(session.update(source))
+# the edit adds two lines above f, which is reused with its quickened "a - b"
+pylox.interpreter.interpret(session.update('var x = "x";\n\n\n' + source[source.index("\n") + 1:]))
+# expect: 2
+# expect: [line 5] Operands must be numbers
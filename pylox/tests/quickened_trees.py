@@ -0,0 +1,51 @@
+# a tree the tree walker ran, with its operator nodes quickened, can still be resolved,
+# optimized, compiled for the closure backend and the vm and transpiled by pylox build
+import io
+import os
+import sys
+import contextlib
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import pylox
+import Resolver
+
+source = """fun f(a, b, s) {
+  print a * b - -a;
+  print s + "!";
+  print !(a < b);
+}
+f(2, 3, "hi");
+"""
+statements = pylox.makeParser(source).parse()
+tree = pylox.makeInterpreter("tree")
+Resolver.Resolver(tree).firstResolve(statements)
+tree.interpret(statements)
+# expect: 8
+# expect: hi!
+# expect: False
+print(tree.quickened)
+# expect: 6
+
+import Optimizer
+statements = Optimizer.Optimizer().optimize(statements)
+for backend in ("closure", "vm"):
+    interpreter = pylox.makeInterpreter(backend)
+    Resolver.Resolver(interpreter).firstResolve(statements)
+    interpreter.interpret(statements)
+# expect: 8
+# expect: hi!
+# expect: False
+# expect: 8
+# expect: hi!
+# expect: False
+
+import Transpiler
+transpiler = Transpiler.Transpiler()
+Resolver.Resolver(transpiler).firstResolve(statements)
+module = transpiler.transpile(statements, "quickened.lox")
+output = io.StringIO()
+with contextlib.redirect_stdout(output):
+    exec(compile(module, "quickened.py", "exec"), {"__name__": "__main__"})
+print(output.getvalue(), end="")
+# expect: 8
+# expect: hi!
+# expect: False